@@ -3,12 +3,36 @@ MacVoice AI Agent - OpenAI GPT-4o-mini 기반 스타일 변환
 타이핑 전용 모드
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from openai import OpenAI
 from config import get_openai_api_key
-
-# OpenAI 설정
+from tracing import tracer
+from speculative import SpeculativeTransform
+from prompts import CompiledPrompt, prompts, prompt_stats
+from tiering import TieringPolicy, MAX_MAX_TOKENS
+from style_preview import TransformCache, parse_preview
+from resilience import CircuitBreaker, CircuitOpenError, bind, call_with_retry
+
+# OpenAI 설정 (기본 모델 - 실제 요청 모델은 TieringPolicy가 입력 길이로 고름)
 MODEL = "gpt-4o-mini"
 
+# 추측 변환 동시 요청 수
+SPECULATIVE_WORKERS = 4
+
+# 시도당 타임아웃 (받아쓰기 마감 시간이 더 짧으면 그만큼)
+LLM_TIMEOUT = 8.0
+PREVIEW_TIMEOUT = 20.0  # 미리보기는 백그라운드 - 마감 시간 없음
+
+
+def _strip_quotes(text: str) -> str:
+    """모델이 감싼 따옴표 제거"""
+    if text.startswith('"') and text.endswith('"'):
+        text = text[1:-1]
+    if text.startswith("'") and text.endswith("'"):
+        text = text[1:-1]
+    return text
+
 
 class AIAgent:
     """OpenAI GPT-4o-mini 기반 스타일 변환 에이전트"""
@@ -19,99 +43,167 @@ class AIAgent:
             print("⚠️  OpenAI API 키가 설정되지 않았습니다!")
             self.client = None
         else:
-            self.client = OpenAI(api_key=api_key)
+            # 재시도/타임아웃은 resilience가 받아쓰기 마감 시간 안에서 직접 한다
+            self.client = OpenAI(api_key=api_key, max_retries=0)
+        self.breaker = CircuitBreaker("OpenAI LLM")
+        self._pool = None
+        self.policy = TieringPolicy()
+        self.cache = TransformCache()
+
+    def speculative(self, style: str) -> SpeculativeTransform:
+        """스트리밍 인식용 추측 변환 세션"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=SPECULATIVE_WORKERS, thread_name_prefix="style")
+        # 풀 스레드에서도 이 받아쓰기의 마감 시간을 따르도록
+        return SpeculativeTransform(bind(self.transform_style), style, self._pool)
 
     def transform_style(self, text: str, style: str) -> str:
-        """텍스트 스타일 변환"""
+        """텍스트 스타일 변환 (그대로 입력/모르는 스타일이면 맞춤법만 수정)"""
+        return self._complete(prompts.get(style), text, "스타일 변환")
+
+    def _correct_spelling_only(self, text: str) -> str:
+        """맞춤법만 수정 (내부용)"""
+        return self._complete(prompts.get("normal"), text, "맞춤법 수정")
+
+    def _complete(self, prompt: CompiledPrompt, text: str, label: str) -> str:
+        """컴파일된 프롬프트로 요청"""
         if not self.client:
             return text
 
-        # 그대로 입력이면 맞춤법만 수정
-        if style == "normal":
-            return self._correct_spelling_only(text)
-
-        style_prompts = {
-            "formal": "격식체 존댓말로 바꿔줘. (예: ~습니다, ~합니다)",
-            "polite": "공손한 존댓말로 바꿔줘. (예: ~해요, ~세요)",
-            "casual": "친구한테 하는 반말로 바꿔줘. (예: ~야, ~어, ~지)",
-            "cute": "귀여운 말투로 바꿔줘. (예: ~요, ~용, ~당, ~해용)",
-            "aegyo": "애교 섞인 말투로 바꿔줘. (예: ~잉, ~쪄, ~행, 응응)",
-            "romantic": "다정하고 따뜻한 말투로 바꿔줘. (예: ~해줄게, ~고 싶어)",
-            "cold": "쿨하고 담담한 말투로 바꿔줘. (예: ~임, ~ㅇㅇ, 짧게)",
-            "humor": "재미있고 유머러스하게 바꿔줘. 약간의 드립이나 재치 추가.",
-            "pro": "비즈니스 전문가 말투로 바꿔줘. (예: ~드립니다, ~하겠습니다)",
-        }
-
-        style_instruction = style_prompts.get(style, "")
-        if not style_instruction:
-            return self._correct_spelling_only(text)
+        # 숫자/짧은 한 단어는 LLM 없이 그대로
+        plan = self.policy.plan(text, prompt.style)
+        if plan.skip:
+            return text
+
+        cached = self.cache.get(prompt.style, text)
+        if cached is not None:
+            return cached
 
         try:
-            response = self.client.chat.completions.create(
-                model=MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"텍스트의 말투만 바꿔줘. 내용은 절대 바꾸지 마. {style_instruction} 맞춤법도 수정해. 변환된 텍스트만 출력하고 다른 설명은 하지 마."
-                    },
-                    {
-                        "role": "user",
-                        "content": text
-                    }
-                ],
-                temperature=0.2,
-                max_tokens=500
-            )
-            result = response.choices[0].message.content.strip()
-            # 따옴표 제거
-            if result.startswith('"') and result.endswith('"'):
-                result = result[1:-1]
-            if result.startswith("'") and result.endswith("'"):
-                result = result[1:-1]
+            max_tokens = plan.max_tokens
+            while True:
+                with tracer.span("style_request"):
+                    response = call_with_retry(
+                        lambda timeout: self.client.chat.completions.create(
+                            model=plan.model,
+                            messages=prompt.messages(text),
+                            temperature=prompt.temperature,
+                            max_tokens=max_tokens,
+                            timeout=timeout
+                        ),
+                        breaker=self.breaker, timeout=LLM_TIMEOUT
+                    )
+                usage = getattr(response, "usage", None)
+                prompt_stats.record(prompt.style, usage)
+                truncated = response.choices[0].finish_reason == "length"
+                if usage is not None:
+                    self.policy.learn(prompt.style, plan.input_tokens, usage.completion_tokens, truncated)
+                if not truncated or max_tokens >= MAX_MAX_TOKENS:
+                    break
+                # 출력이 잘림 - 한도를 늘려 다시 요청 (비율도 크게 올려 다음부턴 안 잘리게)
+                max_tokens = min(MAX_MAX_TOKENS, max_tokens * 2)
+            result = _strip_quotes(response.choices[0].message.content.strip())
+            self.cache.put(prompt.style, text, result)
             return result
+        except CircuitOpenError:
+            # 제공자 장애 - 기다리지 않고 변환 없이 입력
+            print(f"{label} 생략 (서킷 열림)")
+            return text
         except Exception as e:
-            print(f"스타일 변환 오류: {e}")
+            print(f"{label} 오류: {e}")
             return text
 
-    def _correct_spelling_only(self, text: str) -> str:
-        """맞춤법만 수정 (내부용)"""
-        if not self.client:
-            return text
+    def preview_styles(self, text: str) -> dict:
+        """모든 스타일 변환을 한 번의 요청(JSON 응답)으로 만들어 캐시에 채움
+
+        Returns:
+            {스타일: 텍스트} - 요청이 실패한 스타일은 빠짐 (선택 시 개별 요청)
+        """
+        styles = prompts.styles
+        if not self.client or not text.strip():
+            return {}
 
+        plan = self.policy.plan(text, "normal")
+        missing = self.cache.missing(text, styles)
+        if plan.skip or not missing:
+            return {style: self.transform_style(text, style) for style in styles}
+
+        prompt = prompts.preview
         try:
-            response = self.client.chat.completions.create(
-                model=MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "다음 한국어 텍스트의 맞춤법과 띄어쓰기를 수정해줘. 원래 의미를 유지하면서 올바른 맞춤법으로 수정해. 수정된 텍스트만 출력하고 다른 설명은 하지 마."
-                    },
-                    {
-                        "role": "user",
-                        "content": text
-                    }
-                ],
-                temperature=0.1,
-                max_tokens=500
-            )
-            corrected = response.choices[0].message.content.strip()
-            # 따옴표 제거
-            if corrected.startswith('"') and corrected.endswith('"'):
-                corrected = corrected[1:-1]
-            if corrected.startswith("'") and corrected.endswith("'"):
-                corrected = corrected[1:-1]
-            return corrected
+            with tracer.span("style_preview"):
+                response = call_with_retry(
+                    lambda timeout: self.client.chat.completions.create(
+                        model=plan.model,
+                        messages=prompt.messages(text),
+                        temperature=prompt.temperature,
+                        max_tokens=self.policy.batch_max_tokens(plan.input_tokens, styles),
+                        response_format={"type": "json_object"},
+                        timeout=timeout
+                    ),
+                    breaker=self.breaker, timeout=PREVIEW_TIMEOUT, attempts=2
+                )
+            prompt_stats.record(prompt.style, getattr(response, "usage", None))
+            results = parse_preview(response.choices[0].message.content, styles)
         except Exception as e:
-            print(f"맞춤법 수정 오류: {e}")
-            return text
+            print(f"스타일 미리보기 오류: {e}")
+            results = {}
+
+        # 이미 입력된(캐시된) 결과는 바꾸지 않는다 - 버튼을 다시 눌러도 같은 텍스트
+        for style, result in results.items():
+            self.cache.put(style, text, _strip_quotes(result), overwrite=False)
+        return {style: cached for style in styles
+                if (cached := self.cache.get(style, text)) is not None}
 
     def correct_spelling(self, text: str) -> str:
         """맞춤법 수정 (하위 호환용)"""
         return self._correct_spelling_only(text)
 
 
+def measure_prompt_cache(agent: AIAgent, rounds: int = 3,
+                         text: str = "오늘 회의 자료 정리해서 공유드릴게요"):
+    """스타일별 캐시된 토큰 비율과 첫 토큰까지 시간(TTFT) 측정 (API 호출)"""
+    import time
+    from prompts import STYLES
+
+    print(f"프롬프트 v{prompts.version}, 스타일별 {rounds}회")
+    print(f"{'style':<10}{'cached':>10}{'TTFT p50':>12}{'total p50':>12}")
+    for style in STYLES:
+        prompt = prompts.get(style)
+        ratios, ttfts, totals = [], [], []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            first = None
+            stream = agent.client.chat.completions.create(
+                model=MODEL,
+                messages=prompt.messages(text),
+                temperature=prompt.temperature,
+                max_tokens=prompt.max_tokens,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            for chunk in stream:
+                if first is None and chunk.choices and chunk.choices[0].delta.content:
+                    first = time.perf_counter() - start
+                if chunk.usage is not None:
+                    ratio = prompt_stats.record(style, chunk.usage)
+                    ratios.append(ratio or 0.0)
+            totals.append(time.perf_counter() - start)
+            ttfts.append(first or totals[-1])
+        ttfts.sort()
+        totals.sort()
+        mid = rounds // 2
+        cached = sum(ratios) / len(ratios) if ratios else 0.0
+        print(f"{style:<10}{cached:>9.0%}{ttfts[mid] * 1000:>10.0f}ms{totals[mid] * 1000:>10.0f}ms")
+
+
 if __name__ == "__main__":
+    import sys
+
     agent = AIAgent()
+    if "--measure-cache" in sys.argv and agent.client:
+        measure_prompt_cache(agent)
+        sys.exit(0)
+
     test_text = "안녕하세요 오늘 날씨가 좋네요"
 
     print(f"원본: {test_text}")
@@ -0,0 +1,479 @@
+"""
+ZZABIS 설치된 앱 색인 - "카톡 열어"의 "카톡"을 실제 앱(KakaoTalk.app)으로 찾음
+
+응용 프로그램 폴더의 .app 번들을 백그라운드 스레드에서 훑어서 별칭 → 앱 사전을
+만든다. 별칭은 앱 이름/표시 이름, 번들 ID 끝부분, 한국어 현지화 이름
+(ko.lproj/InfoPlist.strings), 자주 부르는 한글 이름(_KNOWN_ALIASES), 한글 이름의
+로마자 표기. 공백/기호를 뺀 소문자로 정규화해서 사전 조회 한 번(O(1))으로 찾고,
+없으면 자모 SymSpell 색인(vocabulary.FuzzyIndex)으로 가까운 별칭을 찾는다.
+
+훑은 결과는 디스크에 캐시해서 다음 실행 때 바로 쓰고, 감시 스레드가 폴더
+수정 시각만 주기적으로 확인해서 바뀐 폴더만 다시 읽는다 (Info.plist 파싱은
+새로 생기거나 바뀐 번들만). 색인은 통째로 바꿔 끼우므로 조회 쪽은 잠금이 필요 없다.
+"""
+
+import json
+import os
+import plistlib
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from command_match import MIN_CONFIDENCE
+from vocabulary import FuzzyIndex, to_jamo
+
+APP_DIRS = [
+    "/Applications",
+    "~/Applications",
+    "/System/Applications",
+    "/System/Applications/Utilities",
+    "/System/Library/CoreServices",  # Finder
+]
+CACHE_PATH = os.path.expanduser("~/.macvoice_apps.json")
+RESCAN_SECONDS = 30.0  # 폴더 수정 시각 확인 주기 (stat 몇 번 - 받아쓰기 경로 밖)
+MAX_DEPTH = 2  # /Applications/Utilities, /Applications/Microsoft Office 같은 하위 폴더까지
+CACHE_VERSION = 1
+
+# 자주 부르는 한글 이름 (번들 ID 기준 - 설치된 앱에만 붙음)
+_KNOWN_ALIASES = {
+    "com.kakao.KakaoTalkMac": ["카카오톡", "카톡"],
+    "com.google.Chrome": ["크롬", "구글 크롬"],
+    "com.apple.Safari": ["사파리"],
+    "com.apple.finder": ["파인더"],
+    "com.apple.Terminal": ["터미널"],
+    "com.apple.Notes": ["메모", "노트"],
+    "com.apple.Music": ["음악", "뮤직"],
+    "com.apple.systempreferences": ["설정", "시스템 설정", "시스템 환경설정"],
+    "com.apple.mail": ["메일"],
+    "com.apple.iCal": ["캘린더", "달력"],
+    "com.apple.calculator": ["계산기"],
+    "com.apple.Photos": ["사진"],
+    "com.apple.Preview": ["미리보기"],
+    "com.apple.MobileSMS": ["메시지"],
+    "com.apple.FaceTime": ["페이스타임"],
+    "com.apple.AppStore": ["앱스토어", "앱 스토어"],
+    "com.apple.dt.Xcode": ["엑스코드"],
+    "com.tinyspeck.slackmacgap": ["슬랙"],
+    "com.microsoft.VSCode": ["비주얼 스튜디오 코드", "비주얼 스튜디오", "브이에스 코드", "vs code", "코드"],
+    "com.microsoft.Word": ["워드"],
+    "com.microsoft.Excel": ["엑셀"],
+    "com.microsoft.Powerpoint": ["파워포인트", "피피티"],
+    "notion.id": ["노션"],
+    "com.figma.Desktop": ["피그마"],
+    "us.zoom.xos": ["줌"],
+    "com.hnc.Discord": ["디스코드"],
+    "com.spotify.client": ["스포티파이"],
+    "com.naver.Whale": ["웨일", "네이버 웨일"],
+    "com.openai.chat": ["챗지피티", "챗 gpt"],
+}
+
+_KEY_NOISE = re.compile(r'[\s\W_]+')
+_OBJECT_PARTICLE = re.compile(r'(을|를)$')
+_STRINGS_ENTRY = re.compile(r'"?([A-Za-z]\w*)"?\s*=\s*"((?:[^"\\]|\\.)*)"\s*;')
+_LOCALIZATIONS = ("ko.lproj", "Korean.lproj", "ko-KR.lproj")
+
+# 로마자 표기 (국어의 로마자 표기법, 음운 변화는 무시)
+_RR_INITIALS = ["g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj",
+                "ch", "k", "t", "p", "h"]
+_RR_VOWELS = ["a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo",
+              "u", "wo", "we", "wi", "yu", "eu", "ui", "i"]
+_RR_FINALS = ["", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "l", "l", "l", "p", "l",
+              "m", "p", "p", "t", "t", "ng", "t", "t", "k", "t", "p", "t"]
+
+
+class AppEntry(NamedTuple):
+    name: str
+    path: str
+    bundle_id: str = ""
+
+
+def normalize(text: str) -> str:
+    """별칭 키 - 소문자, 공백/기호 제거 ("Visual Studio Code" → "visualstudiocode")"""
+    return _KEY_NOISE.sub("", text.lower())
+
+
+def romanize(text: str) -> str:
+    """한글 음절 → 로마자 ("계산기" → "gyesangi"), 나머지 글자는 그대로"""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_RR_INITIALS[code // 588] + _RR_VOWELS[code % 588 // 28] + _RR_FINALS[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _read_strings(path: str) -> Dict[str, str]:
+    """InfoPlist.strings - 바이너리 plist 또는 "키" = "값"; 텍스트 (UTF-16/UTF-8)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(b"bplist") or data.lstrip().startswith(b"<?xml"):
+        return plistlib.loads(data)
+    if data.startswith((b"\xff\xfe", b"\xfe\xff")):
+        text = data.decode("utf-16")
+    else:
+        text = data.decode("utf-8-sig", errors="replace")
+    return {key: value.replace('\\"', '"') for key, value in _STRINGS_ENTRY.findall(text)}
+
+
+def read_bundle(path: str) -> dict:
+    """앱 번들 정보 (이름, 표시 이름, 번들 ID, 한국어 이름) - Info.plist가 없으면 폴더 이름"""
+    info = {}
+    try:
+        with open(os.path.join(path, "Contents", "Info.plist"), "rb") as f:
+            info = plistlib.load(f)
+    except Exception:
+        pass
+    ko_name = ""
+    resources = os.path.join(path, "Contents", "Resources")
+    for folder in _LOCALIZATIONS:
+        try:
+            strings = _read_strings(os.path.join(resources, folder, "InfoPlist.strings"))
+        except Exception:
+            continue
+        ko_name = strings.get("CFBundleDisplayName") or strings.get("CFBundleName") or ""
+        if ko_name:
+            break
+    return {
+        "name": os.path.basename(path)[:-len(".app")],
+        "display_name": info.get("CFBundleDisplayName") or info.get("CFBundleName") or "",
+        "bundle_id": info.get("CFBundleIdentifier") or "",
+        "ko_name": ko_name,
+    }
+
+
+def aliases_for(bundle: dict) -> List[str]:
+    """번들 하나의 별칭 (앞쪽일수록 우선)"""
+    names = [bundle["name"], bundle["display_name"], bundle["ko_name"]]
+    bundle_id = bundle["bundle_id"]
+    if bundle_id:
+        names.append(bundle_id.rsplit(".", 1)[-1])
+        names += _KNOWN_ALIASES.get(bundle_id, [])
+    names += [romanize(name) for name in names if name and name != romanize(name)]
+    return [name for name in names if name]
+
+
+class AppIndex:
+    """별칭 → 설치된 앱 (정확 조회 + 자모 유사 조회), 백그라운드 증분 갱신
+
+    dirs: 훑을 응용 프로그램 폴더 (기본 APP_DIRS)
+    cache_path: 훑은 결과 캐시 (None이면 저장 안 함)
+    """
+
+    def __init__(self, dirs: Iterable[str] = None, cache_path: Optional[str] = CACHE_PATH,
+                 interval: float = RESCAN_SECONDS):
+        self.dirs = [os.path.expanduser(d) for d in (dirs or APP_DIRS)]
+        self.cache_path = cache_path
+        self.interval = interval
+        self._folders: Dict[str, dict] = {}  # 폴더 → {"mtime", "bundles", "subdirs"}
+        self._bundles: Dict[str, dict] = {}  # 번들 경로 → read_bundle() + "mtime"
+        self._aliases: Dict[str, AppEntry] = {}
+        self._fuzzy = FuzzyIndex()
+        self._stop = threading.Event()
+        self._thread = None
+        self.ready = False  # 한 번이라도 훑었거나 캐시를 읽었음
+        self._load_cache()
+
+    def __len__(self):
+        return len(self._bundles)
+
+    # === 조회 ===
+
+    def lookup(self, name: str) -> Optional[AppEntry]:
+        """별칭 하나 - 정확히 맞으면 사전 조회, 아니면 자모 편집 거리"""
+        key = normalize(name)
+        if not key:
+            return None
+        aliases = self._aliases
+        found = aliases.get(key)
+        if found is None:
+            stripped = _OBJECT_PARTICLE.sub("", key)  # "카톡을 열어"
+            found = aliases.get(stripped)
+        if found is not None:
+            return found
+        near = self._fuzzy.lookup(key)
+        if near is None:
+            return None
+        alias, distance = near
+        if 1 - distance / len(to_jamo(alias)) < MIN_CONFIDENCE:
+            return None
+        return aliases.get(alias)
+
+    def resolve(self, text: str) -> Optional[AppEntry]:
+        """말한 앱 이름 - 앞뒤에 붙은 말("자비스 카톡 좀")이 있으면 긴 단어 묶음부터"""
+        words = text.split()
+        windows = [" ".join(words[i:i + size]) for size in range(len(words), 0, -1)
+                   for i in range(len(words) - size + 1)]
+        for window in windows:
+            found = self._aliases.get(normalize(window))
+            if found is not None:
+                return found
+        for window in windows:
+            found = self.lookup(window)
+            if found is not None:
+                return found
+        return None
+
+    # === 훑기 ===
+
+    def rescan(self, verify: bool = False) -> bool:
+        """바뀐 폴더만 다시 읽기
+
+        verify: 폴더가 그대로여도 번들 Info.plist 수정 시각까지 확인 (캐시를 읽은 직후)
+
+        Returns:
+            색인이 바뀌었는지
+        """
+        folders: Dict[str, dict] = {}
+        bundles: Dict[str, dict] = {}
+        changed = False
+        pending = [(d, 1) for d in self.dirs]
+        while pending:
+            folder, depth = pending.pop(0)
+            if folder in folders:
+                continue
+            try:
+                mtime = os.stat(folder).st_mtime
+            except OSError:
+                continue
+            previous = self._folders.get(folder)
+            if previous is not None and previous["mtime"] == mtime:
+                listing = previous
+            else:
+                listing = self._list_folder(folder, mtime)
+                changed = True
+            folders[folder] = listing
+            for path in listing["bundles"]:
+                bundle = self._bundles.get(path)
+                if bundle is None or listing is not previous or verify:
+                    fresh = self._check_bundle(path, bundle)
+                    changed |= fresh is not bundle
+                    bundle = fresh
+                if bundle is not None:
+                    bundles[path] = bundle
+            if depth < MAX_DEPTH:
+                pending += [(sub, depth + 1) for sub in listing["subdirs"]]
+        changed |= folders.keys() != self._folders.keys() or bundles.keys() != self._bundles.keys()
+        self._folders = folders
+        if changed or not self.ready:
+            self._bundles = bundles
+            self._rebuild()
+        self.ready = True
+        return changed
+
+    def _list_folder(self, folder: str, mtime: float) -> dict:
+        apps, subdirs = [], []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if not entry.is_dir(follow_symlinks=True):
+                        continue
+                    if entry.name.endswith(".app"):
+                        apps.append(entry.path)
+                    elif not entry.name.startswith("."):
+                        subdirs.append(entry.path)
+        except OSError as e:
+            print(f"앱 폴더 읽기 오류 ({folder}): {e}")
+        return {"mtime": mtime, "bundles": sorted(apps), "subdirs": sorted(subdirs)}
+
+    def _check_bundle(self, path: str, cached: Optional[dict]) -> Optional[dict]:
+        """Info.plist 수정 시각이 같으면 캐시 그대로, 아니면 다시 읽기"""
+        try:
+            mtime = os.stat(os.path.join(path, "Contents", "Info.plist")).st_mtime
+        except OSError:
+            mtime = 0.0
+        if cached is not None and cached["mtime"] == mtime:
+            return cached
+        bundle = read_bundle(path)
+        bundle["mtime"] = mtime
+        return bundle
+
+    def _rebuild(self):
+        """별칭 사전 + 유사 색인을 새로 만들어 바꿔 끼움 (먼저 나온 폴더/별칭이 우선)"""
+        aliases: Dict[str, AppEntry] = {}
+        # 앱 이름/표시 이름이 먼저 - 다른 앱의 별칭("코드")이 실제 앱 이름을 가리지 않게
+        for path, bundle in self._bundles.items():
+            entry = AppEntry(bundle["name"], path, bundle["bundle_id"])
+            for name in (bundle["name"], bundle["display_name"]):
+                aliases.setdefault(normalize(name), entry)
+        for path, bundle in self._bundles.items():
+            entry = AppEntry(bundle["name"], path, bundle["bundle_id"])
+            for name in aliases_for(bundle):
+                aliases.setdefault(normalize(name), entry)
+        aliases.pop("", None)
+        fuzzy = FuzzyIndex(aliases)
+        self._aliases, self._fuzzy = aliases, fuzzy
+
+    # === 캐시 ===
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION or data.get("dirs") != self.dirs:
+                return
+            self._folders = data["folders"]
+            self._bundles = data["bundles"]
+            self._rebuild()
+            self.ready = True
+        except Exception as e:
+            print(f"앱 색인 캐시 읽기 오류: {e}")
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        data = {"version": CACHE_VERSION, "dirs": self.dirs,
+                "folders": self._folders, "bundles": self._bundles}
+        try:
+            tmp = self.cache_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.cache_path)
+        except Exception as e:
+            print(f"앱 색인 캐시 저장 오류: {e}")
+
+    # === 백그라운드 갱신 ===
+
+    def start(self):
+        """백그라운드 훑기 시작 (캐시가 있으면 그걸로 먼저 조회됨)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        verify = self.ready  # 캐시에서 읽었으면 첫 번째는 번들까지 확인
+        while not self._stop.is_set():
+            try:
+                if self.rescan(verify=verify):
+                    self.save_cache()
+                    print(f"앱 색인 갱신: {len(self)}개")
+            except Exception as e:
+                print(f"앱 색인 오류: {e}")
+            verify = False
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+# === 벤치마크 ===
+
+_BENCH_APPS = [
+    ("KakaoTalk", "com.kakao.KakaoTalkMac", "카카오톡"),
+    ("Google Chrome", "com.google.Chrome", ""),
+    ("Safari", "com.apple.Safari", "Safari"),
+    ("Slack", "com.tinyspeck.slackmacgap", ""),
+    ("Visual Studio Code", "com.microsoft.VSCode", ""),
+    ("Notion", "notion.id", ""),
+    ("Figma", "com.figma.Desktop", ""),
+    ("Calculator", "com.apple.calculator", "계산기"),
+    ("Preview", "com.apple.Preview", "미리보기"),
+    ("Notes", "com.apple.Notes", "메모"),
+    ("Microsoft Excel", "com.microsoft.Excel", ""),
+    ("Spotify", "com.spotify.client", ""),
+]
+
+# (말한 조각 - "열어" 앞부분, 기대하는 앱 이름)
+_BENCH_QUERIES = [
+    ("카톡", "KakaoTalk"), ("카카오톡", "KakaoTalk"), ("카카오 톡", "KakaoTalk"), ("카톡을", "KakaoTalk"),
+    ("kakaotalk", "KakaoTalk"), ("자비스 카톡 좀", "KakaoTalk"), ("크롬", "Google Chrome"),
+    ("구글 크롬", "Google Chrome"), ("chrome", "Google Chrome"), ("사파리", "Safari"),
+    ("슬랙", "Slack"), ("비주얼 스튜디오 코드", "Visual Studio Code"), ("vs code", "Visual Studio Code"),
+    ("노션", "Notion"), ("피그마", "Figma"), ("계산기", "Calculator"), ("gyesangi", "Calculator"),
+    ("미리 보기", "Preview"), ("메모", "Notes"), ("엑셀", "Microsoft Excel"), ("스포티파이", "Spotify"),
+]
+
+
+def _make_app(root: str, name: str, bundle_id: str, ko_name: str = "", binary: bool = False):
+    """가짜 .app 번들 (Info.plist + ko.lproj/InfoPlist.strings)"""
+    contents = os.path.join(root, name + ".app", "Contents")
+    os.makedirs(os.path.join(contents, "Resources"), exist_ok=True)
+    with open(os.path.join(contents, "Info.plist"), "wb") as f:
+        plistlib.dump({"CFBundleName": name, "CFBundleIdentifier": bundle_id}, f)
+    if ko_name:
+        folder = os.path.join(contents, "Resources", "ko.lproj")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "InfoPlist.strings"), "wb") as f:
+            if binary:
+                f.write(plistlib.dumps({"CFBundleDisplayName": ko_name}, fmt=plistlib.FMT_BINARY))
+            else:
+                f.write(f'"CFBundleDisplayName" = "{ko_name}";\n'.encode("utf-16"))
+
+
+def benchmark(filler_apps: int = 400, lookups: int = 20000, seed: int = 0):
+    """가짜 응용 프로그램 폴더: 처음 훑기 / 캐시 시작 / 증분 갱신, 조회 정확도와 지연"""
+    import random
+    import tempfile
+    import time
+
+    from vocabulary import _misrecognize
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        root = os.path.join(directory, "Applications")
+        utilities = os.path.join(root, "Utilities")
+        os.makedirs(utilities)
+        for i, (name, bundle_id, ko_name) in enumerate(_BENCH_APPS):
+            _make_app(utilities if name == "Calculator" else root, name, bundle_id, ko_name, binary=i % 2 == 0)
+        for i in range(filler_apps):
+            _make_app(root, f"Filler App {i}", f"com.example.filler{i}")
+        cache = os.path.join(directory, "apps.json")
+
+        start = time.perf_counter()
+        index = AppIndex([root], cache_path=cache)
+        index.rescan()
+        index.save_cache()
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        warm = AppIndex([root], cache_path=cache)
+        warm_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        warm.rescan(verify=True)
+        verify_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        unchanged = index.rescan()
+        idle_ms = (time.perf_counter() - start) * 1000
+        time.sleep(0.01)  # 폴더 수정 시각이 달라지게
+        _make_app(root, "Discord", "com.hnc.Discord")
+        start = time.perf_counter()
+        added = index.rescan()
+        added_ms = (time.perf_counter() - start) * 1000
+
+        queries = _BENCH_QUERIES + [("디스코드", "Discord")]
+        right = sum(1 for q, expected in queries if (index.resolve(q) or AppEntry("", "")).name == expected)
+        raw_right = sum(1 for q, expected in queries if q == expected)  # 기존: 조각을 그대로 앱 이름으로
+
+        misheard = [(_misrecognize(q, rng), expected) for q, expected in queries if re.search('[가-힣]', q)
+                    for _ in range(20)]
+        fuzzy_right = sum(1 for q, expected in misheard
+                          if (index.resolve(q) or AppEntry("", "")).name == expected)
+
+        start = time.perf_counter()
+        for _ in range(lookups):
+            index.resolve("카톡")
+        exact_us = (time.perf_counter() - start) / lookups * 1e6
+        times = []
+        for q, _ in misheard:
+            index._fuzzy._memo.clear()
+            begin = time.perf_counter()
+            index.resolve(q)
+            times.append(time.perf_counter() - begin)
+        times.sort()
+
+    total = len(_BENCH_APPS) + filler_apps
+    print(f"가짜 앱 {total}개: 처음 훑기 {cold_ms:.0f}ms, 캐시로 시작 {warm_ms:.0f}ms "
+          f"(+ 번들 확인 {verify_ms:.0f}ms), 별칭 {len(index._aliases):,}개")
+    print(f"증분 갱신: 변화 없음 {idle_ms:.2f}ms (바뀜={unchanged}), 앱 하나 추가 {added_ms:.1f}ms (바뀜={added})")
+    print(f"말한 앱 이름 {len(queries)}개: 그대로 실행 {raw_right}개 정답 → 색인 {right}개 정답")
+    print(f"오인식된 앱 이름 {len(misheard)}개: 색인 정답 {fuzzy_right / len(misheard):.1%}")
+    print(f"조회 지연: 정확 {exact_us:.1f} µs, 유사 p50 {times[len(times) // 2] * 1e6:.0f} µs, "
+          f"p99 {times[int(len(times) * 0.99)] * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    benchmark()
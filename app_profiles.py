@@ -0,0 +1,262 @@
+"""
+ZZABIS 앱별 스타일 프로필 - 맨 앞 앱(번들 ID)에 따라 스타일/자동 엔터를 고름
+
+프로필은 JarvisDB(app_profiles 테이블)에 있고, 실행 중에는 번들 ID → 프로필
+사전으로 메모리에 올려 둔다. 맨 앞 앱은 앱 전환 감시자가 바뀔 때마다 알려 주므로
+받아쓰기 때는 osascript를 부르지 않고 사전 조회 한 번으로 끝난다 (µs 단위).
+
+감시자는 pyobjc(AppKit, requirements.txt에 있음)의 NSWorkspace 앱 활성화 알림을
+쓰고, pyobjc가 없을 때만 백그라운드 스레드에서 osascript로 주기적으로 확인한다
+(받아쓰기 경로 밖).
+"""
+
+import os
+import subprocess
+import sys
+import threading
+from typing import Callable, Dict, NamedTuple, Optional
+
+POLL_SECONDS = 1.0  # AppKit이 없을 때 맨 앞 앱 확인 주기
+
+_FRONTMOST_SCRIPT = (
+    'tell application "System Events" to get '
+    '{bundle identifier, unix id, name} of first process whose frontmost is true'
+)
+
+
+class AppProfile(NamedTuple):
+    bundle_id: str
+    style: str
+    auto_enter: bool = True  # 입력 후 엔터 (메신저는 전송, 메일/문서는 보통 끔)
+    app_name: str = ""
+
+
+class WorkspaceWatcher:
+    """NSWorkspace 앱 활성화 알림 (pyobjc-framework-Cocoa 필요)
+
+    알림은 메인 스레드 런루프(Qt 이벤트 루프)에서 온다.
+    """
+
+    def __init__(self, on_switch: Callable[[str, str], None]):
+        import AppKit  # 선택 의존성
+        self.AppKit = AppKit
+        self.on_switch = on_switch
+        self._observer = None
+
+    def start(self):
+        AppKit = self.AppKit
+        workspace = AppKit.NSWorkspace.sharedWorkspace()
+        self._report(workspace.frontmostApplication())
+        self._observer = workspace.notificationCenter().addObserverForName_object_queue_usingBlock_(
+            AppKit.NSWorkspaceDidActivateApplicationNotification, None,
+            AppKit.NSOperationQueue.mainQueue(), self._on_activate
+        )
+
+    def _on_activate(self, notification):
+        self._report(notification.userInfo()[self.AppKit.NSWorkspaceApplicationKey])
+
+    def _report(self, app):
+        # ZZABIS 창을 누른 건 앱 전환으로 치지 않음
+        if app is None or app.processIdentifier() == os.getpid():
+            return
+        self.on_switch(app.bundleIdentifier() or "", app.localizedName() or "")
+
+    def stop(self):
+        if self._observer is not None:
+            self.AppKit.NSWorkspace.sharedWorkspace().notificationCenter().removeObserver_(self._observer)
+            self._observer = None
+
+
+class PollingWatcher:
+    """osascript로 맨 앞 앱을 주기적으로 확인 (AppKit이 없을 때)"""
+
+    def __init__(self, on_switch: Callable[[str, str], None], interval: float = POLL_SECONDS):
+        self.on_switch = on_switch
+        self.interval = interval
+        self._stop = threading.Event()
+        self._last = None
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                result = subprocess.run(['osascript', '-e', _FRONTMOST_SCRIPT],
+                                        capture_output=True, text=True, timeout=5)
+                bundle_id, pid, name = result.stdout.strip().split(", ", 2)
+                if int(pid) != os.getpid() and bundle_id != self._last:
+                    self._last = bundle_id
+                    self.on_switch(bundle_id, name)
+            except Exception:
+                pass  # 권한 없음/잠금 화면 등 - 다음 주기에 다시
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+def create_watcher(on_switch: Callable[[str, str], None]):
+    """플랫폼에 맞는 앱 전환 감시자 (macOS가 아니면 None)"""
+    if sys.platform != "darwin":
+        return None
+    try:
+        return WorkspaceWatcher(on_switch)
+    except ImportError:
+        print("AppKit 사용 불가 (pyobjc 미설치, pip install -r requirements.txt) - osascript로 앱 전환 확인")
+        return PollingWatcher(on_switch)
+
+
+class AppProfileIndex:
+    """번들 ID → 프로필 메모리 인덱스 + 현재 맨 앞 앱
+
+    db: get_app_profiles(), set_app_profile(...)을 가진 저장소 (JarvisDB)
+    on_change: on_change(bundle_id, 프로필 또는 None) - 맨 앞 앱이 바뀔 때
+    """
+
+    def __init__(self, db, on_change: Callable = None):
+        self.db = db
+        self.on_change = on_change
+        self._profiles: Dict[str, AppProfile] = {}
+        self.frontmost = None  # 번들 ID
+        self.frontmost_name = ""
+        self._watcher = None
+        self.reload()
+
+    def reload(self):
+        """DB에서 다시 읽기 - 사전을 통째로 바꿔서 조회 쪽은 잠금이 필요 없음"""
+        self._profiles = {
+            row["bundle_id"]: AppProfile(row["bundle_id"], row["style"], bool(row["auto_enter"]),
+                                         row["app_name"] or "")
+            for row in self.db.get_app_profiles()
+        }
+
+    def resolve(self, bundle_id: str = None) -> Optional[AppProfile]:
+        """앱 프로필 (없으면 None) - 기본은 현재 맨 앞 앱"""
+        return self._profiles.get(bundle_id or self.frontmost)
+
+    def find(self, name: str) -> Optional[AppProfile]:
+        """번들 ID 또는 앱 이름으로 프로필 찾기 (대소문자 무시)"""
+        profile = self._profiles.get(name)
+        if profile is None:
+            lowered = name.lower()
+            profile = next((p for p in self._profiles.values() if p.app_name.lower() == lowered), None)
+        return profile
+
+    def profiles(self):
+        return sorted(self._profiles.values(), key=lambda p: (p.app_name or p.bundle_id).lower())
+
+    def set_profile(self, bundle_id: str, style: str, auto_enter: bool = None, app_name: str = None):
+        """프로필 저장 (auto_enter/app_name을 생략하면 기존 값 유지)"""
+        current = self._profiles.get(bundle_id)
+        if auto_enter is None:
+            auto_enter = current.auto_enter if current else True
+        if app_name is None:
+            app_name = current.app_name if current else (self.frontmost_name if bundle_id == self.frontmost else "")
+        self.db.set_app_profile(bundle_id, style, auto_enter, app_name)
+        profiles = dict(self._profiles)
+        profiles[bundle_id] = AppProfile(bundle_id, style, auto_enter, app_name)
+        self._profiles = profiles
+
+    def _on_switch(self, bundle_id: str, name: str):
+        if not bundle_id or bundle_id == self.frontmost:
+            return
+        # CLI(--set/--enter)로 바뀐 프로필 반영 - 앱 전환 때만이라 받아쓰기 경로 밖
+        self.reload()
+        self.frontmost = bundle_id
+        self.frontmost_name = name
+        if self.on_change:
+            self.on_change(bundle_id, self._profiles.get(bundle_id))
+
+    def start(self):
+        """앱 전환 감시 시작"""
+        if self._watcher is None:
+            self._watcher = create_watcher(self._on_switch)
+            if self._watcher is not None:
+                self._watcher.start()
+
+    def stop(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+
+def benchmark(apps: int = 200, lookups: int = 200000):
+    """받아쓰기 1회당 앱 프로필 조회 - 인덱스 vs 프로세스 실행 (osascript 대신 `true`)"""
+    import time
+
+    class _MemoryDB:
+        def __init__(self):
+            self.rows = {}
+
+        def get_app_profiles(self):
+            return list(self.rows.values())
+
+        def set_app_profile(self, bundle_id, style, auto_enter=True, app_name=None):
+            self.rows[bundle_id] = {"bundle_id": bundle_id, "style": style,
+                                    "auto_enter": int(auto_enter), "app_name": app_name}
+
+    db = _MemoryDB()
+    for i in range(apps):
+        db.set_app_profile(f"com.example.app{i}", "formal" if i % 2 else "casual", i % 3 != 0, f"App {i}")
+    index = AppProfileIndex(db)
+    index._on_switch("com.example.app7", "App 7")
+
+    start = time.perf_counter()
+    for _ in range(lookups):
+        index.resolve()
+    lookup_us = (time.perf_counter() - start) / lookups * 1e6
+
+    # osascript는 여기에 없을 수도 있음 - 프로세스 하나 띄우는 비용이 하한선
+    spawns = []
+    for _ in range(20):
+        start = time.perf_counter()
+        subprocess.run(['true'])
+        spawns.append((time.perf_counter() - start) * 1000)
+    spawns.sort()
+
+    print(f"프로필 {apps}개, 맨 앞 앱 {index.frontmost} → {index.resolve().style}")
+    print(f"인덱스 조회: {lookup_us:.3f} µs/회")
+    print(f"프로세스 실행 (osascript 하한): p50 {spawns[len(spawns) // 2]:.2f} ms/회 "
+          f"({spawns[len(spawns) // 2] * 1000 / lookup_us:,.0f}배)")
+
+
+def _print_profiles(index: AppProfileIndex):
+    from config import STYLE_MODES
+    for profile in index.profiles():
+        print(f"{profile.app_name or '-':<20} {profile.bundle_id:<36} "
+              f"{STYLE_MODES.get(profile.style, profile.style):<8} 자동 엔터 {'켬' if profile.auto_enter else '끔'}")
+    if not index.profiles():
+        print("(앱 프로필 없음)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] in ("--set", "--enter", "--remove", "--list"):
+        from config import STYLE_MODES, get_style_mode
+        from database import get_db
+
+        index = AppProfileIndex(get_db())
+        usage = ("사용법: --set <번들 ID> <스타일> | --enter <번들 ID 또는 앱 이름> on|off | "
+                 "--remove <번들 ID 또는 앱 이름> | --list")
+        command, rest = args[0], args[1:]
+        if command == "--set" and len(rest) == 2 and rest[1] in STYLE_MODES:
+            existing = index.find(rest[0])
+            index.set_profile(existing.bundle_id if existing else rest[0], rest[1])
+        elif command == "--enter" and len(rest) == 2 and rest[1] in ("on", "off"):
+            existing = index.find(rest[0])
+            bundle_id = existing.bundle_id if existing else rest[0]
+            index.set_profile(bundle_id, existing.style if existing else get_style_mode(),
+                              auto_enter=rest[1] == "on")
+        elif command == "--remove" and len(rest) == 1:
+            existing = index.find(rest[0])
+            index.db.delete_app_profile(existing.bundle_id if existing else rest[0])
+            index.reload()
+        elif command != "--list":
+            print(usage)
+            print(f"스타일: {', '.join(STYLE_MODES)}")
+            sys.exit(1)
+        _print_profiles(index)
+        sys.exit(0)
+
+    benchmark()
@@ -0,0 +1,417 @@
+"""
+ZZABIS 오디오 장치 관리 - 장치 목록 캐시, 끊김 없는 마이크 전환, 연결 끊김 복구
+
+장치 목록은 백그라운드 스레드에서 조회해 캐시하고(UI 스레드에서 PortAudio를
+직접 부르지 않음), 마이크를 바꿀 때는 새 스트림을 먼저 열어 첫 블록이 들어온
+뒤에 이전 스트림을 닫는다. 감시 스레드는 블록이 끊기면(장치 분리 등) 장치를
+다시 검색해서 같은 이름의 장치나 시스템 기본 마이크로 자동 재연결한다.
+"""
+
+import contextlib
+import io
+import threading
+import time
+from typing import Callable, List, Optional
+
+# 스트림 감시
+STALL_TIMEOUT = 1.0  # 이 시간(초) 동안 블록이 없으면 끊긴 것으로 판단
+WATCH_INTERVAL = 0.25
+RETRY_MAX_INTERVAL = 2.0
+SWITCH_TIMEOUT = 2.0  # 새 스트림 첫 블록 대기 한도
+
+# 캡처 샘플 형식 - 업로드(16-bit WAV)와 같아서 변환이 없고 버퍼 메모리가 float32의 절반
+CAPTURE_DTYPE = "int16"
+
+
+class InputDevice:
+    """입력 장치 정보 (index=None은 시스템 기본)"""
+
+    __slots__ = ("index", "name", "channels", "default_samplerate")
+
+    def __init__(self, index: Optional[int], name: str, channels: int, default_samplerate: float):
+        self.index = index
+        self.name = name
+        self.channels = channels
+        self.default_samplerate = default_samplerate
+
+    def __repr__(self):
+        return f"InputDevice({self.index}, {self.name!r}, {self.default_samplerate:.0f}Hz)"
+
+
+class SounddeviceBackend:
+    """PortAudio(sounddevice) 백엔드
+
+    PortAudio 호출은 모두 한 잠금 안에서 - rescan()이 PortAudio를 내렸다 올리는 동안
+    설정 창의 장치 조회(refresh_async)나 스트림 열기가 끼어들지 않게 한다.
+    """
+
+    def __init__(self):
+        import sounddevice as sd
+        self.sd = sd
+        self.lock = threading.RLock()
+
+    def query_devices(self) -> List[InputDevice]:
+        with self.lock:
+            devices = self.sd.query_devices()
+        return [
+            InputDevice(i, dev['name'], dev['max_input_channels'], dev['default_samplerate'])
+            for i, dev in enumerate(devices)
+            if dev['max_input_channels'] > 0
+        ]
+
+    def default_device(self) -> Optional[InputDevice]:
+        try:
+            with self.lock:
+                dev = self.sd.query_devices(kind='input')
+        except Exception:
+            return None
+        return InputDevice(None, dev['name'], dev['max_input_channels'], dev['default_samplerate'])
+
+    def rescan(self):
+        """PortAudio 장치 목록 갱신 - 열린 스트림이 없을 때 감시 스레드에서만 호출
+
+        sounddevice에 공개 API가 없어서 내부 함수로 PortAudio를 다시 초기화한다.
+        """
+        with self.lock:
+            self.sd._terminate()
+            self.sd._initialize()
+
+    def open(self, device: Optional[int], samplerate: int, blocksize: int, callback):
+        with self.lock:
+            stream = self.sd.InputStream(
+                samplerate=samplerate,
+                channels=1,
+                dtype=CAPTURE_DTYPE,
+                callback=callback,
+                blocksize=blocksize,
+                device=device
+            )
+            stream.start()
+        return stream
+
+    def close(self, stream):
+        with self.lock:
+            stream.stop()
+            stream.close()
+
+
+class AudioDeviceManager:
+    """입력 스트림 하나를 관리
+
+    on_block(indata, samplerate): 활성 스트림 블록마다 (오디오 콜백 스레드)
+    on_open(device): 스트림이 열려 전환이 끝났을 때
+    on_error(message): 열기 실패/연결 끊김
+    """
+
+    def __init__(self, on_block: Optional[Callable] = None, backend=None, block_seconds: float = 0.1,
+                 on_open: Optional[Callable] = None, on_error: Optional[Callable] = None):
+        self.backend = backend or SounddeviceBackend()
+        self.on_block = on_block or (lambda indata, samplerate: None)
+        self.on_open = on_open or (lambda device: None)
+        self.on_error = on_error or (lambda message: None)
+        self.block_seconds = block_seconds
+
+        self._lock = threading.RLock()  # 스트림 열기/닫기/전환 직렬화
+        self._devices = None  # 장치 목록 캐시
+        self._stream = None
+        self.current = None  # 현재 InputDevice
+        self.preferred_name = None  # 사용자가 고른 장치 이름 (None = 시스템 기본)
+        self._generation = 0  # 연 스트림 번호
+        self._active = 0  # 블록을 전달 중인 스트림 번호
+        self._switched = threading.Event()
+        self._last_block = 0.0
+        self.overflows = 0  # 장치 입력 오버플로 (콜백이 늦어 버려진 오디오) 횟수
+        self.running = False
+        self._watch_thread = None  # PortAudio 재초기화(rescan)는 이 스레드에서만
+
+    # ── 장치 목록 ──
+
+    def cached_devices(self) -> Optional[List[InputDevice]]:
+        """캐시된 장치 목록 (아직 조회 전이면 None)"""
+        return self._devices
+
+    def refresh(self) -> List[InputDevice]:
+        """장치 목록 조회 후 캐시 (블로킹)"""
+        try:
+            devices = self.backend.query_devices()
+        except Exception as e:
+            print(f"장치 목록 조회 오류: {e}")
+            devices = []
+        self._devices = devices
+        return devices
+
+    def refresh_async(self, callback: Optional[Callable] = None):
+        """백그라운드에서 장치 목록 조회 - 끝나면 callback(devices) (조회 스레드에서 호출)"""
+        def worker():
+            devices = self.refresh()
+            if callback:
+                callback(devices)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _resolve(self, device: Optional[int]) -> Optional[InputDevice]:
+        """장치 인덱스 → InputDevice (None이면 시스템 기본)"""
+        if device is None:
+            return self.backend.default_device()
+        for dev in self._devices if self._devices is not None else self.refresh():
+            if dev.index == device:
+                return dev
+        return None
+
+    def _find_by_name(self, name: str) -> Optional[InputDevice]:
+        for dev in self._devices or []:
+            if dev.name == name:
+                return dev
+        return None
+
+    # ── 스트림 ──
+
+    def start(self, device: Optional[int] = None):
+        """스트림 열고 감시 스레드 시작 - 처음 열기에 실패해도 감시 스레드가 재시도"""
+        self.running = True
+        target = self._resolve(device)
+        self.preferred_name = target.name if target and device is not None else None
+        if target is None or not self._switch_to(target):
+            self._last_block = 0.0
+        self._watch_thread = threading.Thread(target=self._watchdog, daemon=True)
+        self._watch_thread.start()
+
+    def stop(self):
+        self.running = False
+        with self._lock:
+            self._close(self._stream)
+            self._stream = None
+            self.current = None
+
+    def switch(self, device: Optional[int], make_before_break: bool = True) -> bool:
+        """
+        마이크 전환 (호출 스레드에서 블로킹 - UI 스레드에서 부르지 말 것)
+
+        Args:
+            device: 장치 인덱스 (None = 시스템 기본)
+            make_before_break: 새 스트림 첫 블록을 받은 뒤 이전 스트림을 닫음.
+                False면 닫고 여는 기존 방식 (비교용)
+
+        Returns:
+            전환 성공 여부 (실패하면 이전 스트림 유지)
+        """
+        target = self._resolve(device)
+        if target is None:
+            self.on_error(f"마이크를 찾을 수 없음: {device}")
+            return False
+        self.preferred_name = target.name if device is not None else None
+        return self._switch_to(target, make_before_break)
+
+    def _switch_to(self, target: InputDevice, make_before_break: bool = True) -> bool:
+        with self._lock:
+            if self._stream is not None and self.current is not None \
+                    and self.current.index == target.index and self.current.name == target.name:
+                return True
+
+            old = self._stream
+            if not make_before_break:
+                self._close(old)
+                old = self._stream = None
+
+            rate = int(target.default_samplerate)
+            self._generation += 1
+            self._switched.clear()
+            try:
+                stream = self.backend.open(
+                    target.index, rate, int(rate * self.block_seconds),
+                    self._make_callback(self._generation, rate)
+                )
+            except Exception as e:
+                print(f"마이크 열기 실패 ({target.name}): {e}")
+                self.on_error(f"마이크 열기 실패: {e}")
+                return False
+
+            # 새 스트림이 실제로 블록을 내기 시작할 때까지 이전 스트림 유지
+            if old is not None and not self._switched.wait(SWITCH_TIMEOUT):
+                # 블록이 한 번도 안 옴 - 새 스트림을 버리고 이전 마이크 그대로
+                print(f"새 마이크에서 오디오가 들어오지 않음: {target.name}")
+                self._close(stream)
+                self.on_error(f"마이크 전환 실패 (오디오 없음): {target.name}")
+                return False
+            self._close(old)
+
+            self._stream = stream
+            self.current = target
+            self._last_block = time.monotonic()
+        print(f"마이크: {target.name} ({rate}Hz)")
+        self.on_open(target)
+        return True
+
+    def _make_callback(self, generation: int, rate: int):
+        def callback(indata, frames, time_info, status):
+            if generation < self._active:
+                return  # 전환 중인 이전 스트림의 블록
+            if generation > self._active:
+                self._active = generation
+                self._switched.set()
+            self._last_block = time.monotonic()
+            if status and getattr(status, "input_overflow", False):
+                self.overflows += 1
+            self.on_block(indata, rate)
+        return callback
+
+    def _close(self, stream):
+        if stream is None:
+            return
+        try:
+            self.backend.close(stream)
+        except Exception as e:
+            print(f"스트림 닫기 오류: {e}")
+
+    # ── 연결 끊김 복구 ──
+
+    def _watchdog(self):
+        retry_interval = WATCH_INTERVAL
+        next_retry = 0.0
+        while self.running:
+            time.sleep(WATCH_INTERVAL)
+            if self._last_block and time.monotonic() - self._last_block < STALL_TIMEOUT:
+                retry_interval = WATCH_INTERVAL
+                continue
+
+            now = time.monotonic()
+            if now < next_retry:
+                continue
+            if self._recover():
+                retry_interval = WATCH_INTERVAL
+            else:
+                retry_interval = min(retry_interval * 2, RETRY_MAX_INTERVAL)
+                next_retry = now + retry_interval
+
+    def _recover(self) -> bool:
+        """끊긴 스트림을 닫고 장치를 다시 찾아 재연결"""
+        with self._lock:
+            if not self.running:
+                return True
+            if self.current is not None:
+                print(f"마이크 연결 끊김: {self.current.name}")
+                self.on_error("마이크 연결 끊김 - 재연결 중...")
+            self._close(self._stream)
+            self._stream = None
+            self.current = None
+            self._last_block = 0.0
+
+            if threading.current_thread() is self._watch_thread:
+                try:
+                    self.backend.rescan()
+                except Exception as e:
+                    print(f"장치 재검색 오류: {e}")
+            self.refresh()
+
+            # 사용자가 고른 장치가 다시 보이면 그 장치, 아니면 시스템 기본
+            target = self._find_by_name(self.preferred_name) if self.preferred_name else None
+            if target is None:
+                target = self.backend.default_device()
+            if target is None:
+                return False
+            return self._switch_to(target)
+
+
+class FakeBackend:
+    """벤치마크용 가짜 장치 - 스레드가 실시간 간격으로 블록을 만든다"""
+
+    def __init__(self, devices: List[InputDevice], open_latency: float = 0.08):
+        self.devices = list(devices)
+        self.open_latency = open_latency  # CoreAudio 스트림 열기 지연 흉내
+        self.unplugged = set()
+
+    def query_devices(self) -> List[InputDevice]:
+        return [dev for dev in self.devices if dev.name not in self.unplugged]
+
+    def default_device(self) -> Optional[InputDevice]:
+        available = self.query_devices()
+        return InputDevice(None, available[0].name, available[0].channels, available[0].default_samplerate) \
+            if available else None
+
+    def rescan(self):
+        pass
+
+    def open(self, device, samplerate, blocksize, callback):
+        import numpy as np
+
+        name = self.devices[device].name if device is not None else self.default_device().name
+        if name in self.unplugged:
+            raise OSError(f"장치 없음: {name}")
+        time.sleep(self.open_latency)
+
+        stream = {"active": True}
+        block = np.zeros((blocksize, 1), dtype=CAPTURE_DTYPE)
+
+        def run():
+            interval = blocksize / samplerate
+            next_at = time.perf_counter()
+            while stream["active"] and name not in self.unplugged:
+                next_at += interval
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+                if stream["active"] and name not in self.unplugged:
+                    callback(block, blocksize, None, None)
+
+        threading.Thread(target=run, daemon=True).start()
+        return stream
+
+    def close(self, stream):
+        stream["active"] = False
+
+
+def benchmark(switches: int = 10):
+    """가짜 장치로 전환 지연/블록 공백, 연결 끊김 복구 시간 측정"""
+    devices = [
+        InputDevice(0, "내장 마이크", 1, 48000),
+        InputDevice(1, "USB 마이크", 1, 44100),
+    ]
+    block_seconds = 0.02
+
+    for make_before_break in (False, True):
+        backend = FakeBackend(devices)
+        arrivals = []
+        manager = AudioDeviceManager(
+            on_block=lambda indata, rate: arrivals.append(time.perf_counter()),
+            backend=backend, block_seconds=block_seconds
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager.start(0)
+        time.sleep(0.2)
+
+        latencies, gaps = [], []
+        for i in range(switches):
+            arrivals.clear()
+            time.sleep(0.1)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                manager.switch((i + 1) % 2, make_before_break=make_before_break)
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.1)
+            # 전환 직전 마지막 블록부터 포함해서 최대 공백 측정
+            stamps = [t for t in arrivals if t >= start - block_seconds * 1.5]
+            gaps.append(max(b - a for a, b in zip(stamps, stamps[1:])) * 1000)
+        manager.stop()
+
+        label = "먼저 열고 닫기" if make_before_break else "닫고 열기 (기존)"
+        print(f"{label:<16} 전환 호출 {sum(latencies) / switches:6.1f} ms, "
+              f"최대 블록 공백 평균 {sum(gaps) / switches:6.1f} ms (블록 {block_seconds * 1000:.0f} ms)")
+
+    # 연결 끊김 → 시스템 기본 마이크로 자동 복구
+    backend = FakeBackend(devices)
+    arrivals = []
+    manager = AudioDeviceManager(
+        on_block=lambda indata, rate: arrivals.append((time.perf_counter(), rate)),
+        backend=backend, block_seconds=block_seconds
+    )
+    manager.start(1)
+    time.sleep(0.2)
+    unplugged_at = time.perf_counter()
+    backend.unplugged.add("USB 마이크")
+    while not arrivals or arrivals[-1][1] != 48000:
+        time.sleep(0.01)
+    recovered = (arrivals[-1][0] - unplugged_at) * 1000
+    print(f"연결 끊김 복구: {recovered:.0f} ms → {manager.current.name} "
+          f"(감지 한도 {STALL_TIMEOUT * 1000:.0f} ms + 열기 {backend.open_latency * 1000:.0f} ms)")
+    manager.stop()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,173 @@
+"""
+ZZABIS 오디오 인코딩 - 캡처 오디오 → 16-bit PCM WAV (음성 인식 업로드용)
+
+WAV 전체 크기의 버퍼를 한 번만 잡고, 44바이트 헤더를 직접 쓴 뒤 PCM은
+작은 float32 스크래치 블록을 거쳐 버퍼 안에 바로 클리핑/변환한다.
+`(audio * 32767).astype(np.int16)` + wave + BytesIO 방식이 만들던 전체 크기
+임시 배열(float32, int16, 바이트 복사)이 없다. 결과는 memoryview로 돌려주고,
+업로드는 WavPayload로 복사 없이 읽는다. 캡처가 int16이면 변환 없이 PCM을
+그대로 한 번 복사한다.
+"""
+
+import io
+import struct
+import time
+
+import numpy as np
+
+WAV_HEADER_SIZE = 44
+SCRATCH_SAMPLES = 1 << 16  # 변환 스크래치 블록 (256KB)
+
+
+def wav_header(num_samples: int, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """PCM WAV 헤더 (RIFF/fmt/data, 44바이트)"""
+    data_size = num_samples * channels * sample_width
+    block_align = channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b'data', data_size
+    )
+
+
+def encode_wav(audio_data: np.ndarray, sample_rate: int = 16000) -> memoryview:
+    """
+    int16 또는 float 오디오 (-1~1) → 16-bit 모노 WAV
+
+    float는 범위를 벗어난 샘플을 잘라낸다 (그냥 astype하면 int16이 넘쳐 부호가 뒤집힘).
+
+    Returns:
+        WAV 전체 바이트의 memoryview (헤더 + PCM)
+    """
+    audio_data = np.ravel(audio_data)
+    n = len(audio_data)
+    buffer = np.empty(WAV_HEADER_SIZE + 2 * n, dtype=np.uint8)  # 0으로 채우지 않음
+    buffer[:WAV_HEADER_SIZE] = np.frombuffer(wav_header(n, sample_rate), dtype=np.uint8)
+    pcm = buffer[WAV_HEADER_SIZE:].view('<i2')
+    if audio_data.dtype == np.int16:
+        pcm[:] = audio_data
+        return memoryview(buffer).cast('B')
+
+    scratch = np.empty(min(n, SCRATCH_SAMPLES), dtype=np.float32)
+    for start in range(0, n, SCRATCH_SAMPLES):
+        end = min(n, start + SCRATCH_SAMPLES)
+        block = scratch[:end - start]
+        np.multiply(audio_data[start:end], 32767, out=block, casting='unsafe')
+        np.clip(block, -32768, 32767, out=block)
+        np.copyto(pcm[start:end], block, casting='unsafe')  # 0 방향 버림 (astype과 같음)
+    return memoryview(buffer).cast('B')
+
+
+class WavPayload(io.RawIOBase):
+    """memoryview를 복사 없이 읽는 파일 객체 (업로드 라이브러리용)"""
+
+    def __init__(self, view: memoryview, name: str = "audio.wav"):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+        self.name = name  # OpenAI API는 파일 이름(확장자)이 필요
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        chunk = self._view[self._pos:self._pos + len(b)]
+        n = len(chunk)
+        b[:n] = chunk
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def __len__(self):
+        return len(self._view)
+
+
+def _encode_wav_legacy(audio_data: np.ndarray, sample_rate: int) -> bytes:
+    """이전 방식 (비교용)"""
+    import wave
+
+    audio_int16 = (audio_data * 32767).astype(np.int16)
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(audio_int16.tobytes())
+    wav_buffer.seek(0)
+    return wav_buffer.read()
+
+
+def benchmark(seconds: float = 60.0, sample_rate: int = 16000, rounds: int = 20):
+    """60초 녹음 인코딩 시간/추가 메모리 피크 비교 (입력 배열 제외)"""
+    import tracemalloc
+
+    rng = np.random.default_rng(0)
+    audio = (0.3 * rng.standard_normal(int(seconds * sample_rate))).astype(np.float32)
+
+    # 범위 안의 신호는 이전 방식과 바이트 단위로 같아야 한다
+    clipped = np.clip(audio, -1, 1)
+    assert bytes(encode_wav(clipped, sample_rate)) == _encode_wav_legacy(clipped, sample_rate), "이전 방식과 결과가 다름"
+
+    payload_mb = (WAV_HEADER_SIZE + 2 * len(audio)) / 1e6
+    print(f"{seconds:.0f}초 @ {sample_rate}Hz (WAV {payload_mb:.2f} MB)")
+    print(f"{'방식':<10}{'p50':>10}{'최소':>10}{'메모리 피크':>14}")
+    for label, encode in (("이전", lambda: _encode_wav_legacy(audio, sample_rate)),
+                          ("새 방식", lambda: encode_wav(audio, sample_rate))):
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            encode()
+            times.append((time.perf_counter() - start) * 1000)
+        times.sort()
+
+        tracemalloc.start()
+        payload = encode()
+        if label != "이전":
+            # 업로드 라이브러리처럼 64KB씩 끝까지 읽기
+            reader = WavPayload(payload)
+            while reader.read(1 << 16):
+                pass
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del payload
+        print(f"{label:<10}{times[len(times) // 2]:>8.2f}ms{times[0]:>8.2f}ms{peak / 1e6:>11.2f} MB")
+
+
+def benchmark_capture(minutes: float = 10.0, sample_rate: int = 16000, block_seconds: float = 0.1):
+    """긴 녹음 메모리 - 캡처 블록 버퍼 + 연결 + 인코딩 (float32 캡처 vs int16 캡처)"""
+    import tracemalloc
+
+    block_size = int(sample_rate * block_seconds)
+    rng = np.random.default_rng(0)
+    source = (0.3 * rng.standard_normal(block_size)).astype(np.float32)
+
+    print(f"\n{minutes:.0f}분 녹음 ({block_seconds * 1000:.0f}ms 블록)")
+    print(f"{'캡처':<10}{'버퍼':>10}{'피크':>10}{'연결+인코딩':>14}")
+    for dtype in (np.float32, np.int16):
+        block = source if dtype == np.float32 else (source * 32767).astype(np.int16)
+        tracemalloc.start()
+        chunks = [block.copy() for _ in range(int(minutes * 60 / block_seconds))]
+        buffered, _peak = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        payload = encode_wav(np.concatenate(chunks), sample_rate)
+        elapsed = (time.perf_counter() - start) * 1000
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del chunks, payload
+        print(f"{np.dtype(dtype).name:<10}{buffered / 1e6:>7.1f} MB{peak / 1e6:>7.1f} MB{elapsed:>11.1f}ms")
+
+
+if __name__ == "__main__":
+    benchmark()
+    benchmark_capture()
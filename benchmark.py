@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+ZZABIS 오프라인 리플레이 벤치마크 - 마이크 없이 파이프라인 처리량/지연 시간 측정
+
+녹음된 WAV 파일을 ZzabisApp과 같은 DictationPipeline에 흘려보낸다.
+STT/LLM은 지연 시간과 지터를 설정할 수 있는 결정적 로컬 대체물로 바꾸고,
+타이핑은 싱크로 보낸다. Qt/마이크/키보드 없이 리눅스 헤드리스에서 동작한다.
+
+사용법:
+    python benchmark.py [fixtures_dir] [--repeat N] [--stt-latency 0.3] [--llm-latency 0.4]
+                        [--jitter 0.05] [--seed 0] [--llm-per-char 0.01]
+                        [--streaming] [--tiering] [--preview] [--json out.json]
+
+fixtures_dir의 *.wav (16kHz mono 16-bit)를 사용하고, 같은 이름의 .txt가 있으면
+그 내용을 인식 결과로 돌려준다. 디렉토리를 주지 않으면 합성 음성을 만든다.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from audio_encoding import WavPayload, encode_wav
+from pipeline import DictationPipeline
+from prompts import prompts
+from speculative import SpeculativeTransform, split_sentences
+from style_preview import TransformCache
+from tiering import MODEL_TIERS, TieringPolicy, estimate_cost, estimate_tokens
+from tracing import tracer
+
+SAMPLE_RATE = 16000
+DEFAULT_TRANSCRIPT = "오늘 회의 자료 정리해서 공유드릴게요"
+# 합성 픽스처용 문장 (길이에 비례해 앞에서부터 사용)
+SENTENCES = [
+    "오늘 회의 자료 정리해서 공유드릴게요.",
+    "다음 주 일정은 금요일까지 확정해 주세요.",
+    "예산 관련 내용은 재무팀과 한 번 더 확인하겠습니다.",
+    "질문 있으시면 편하게 연락 주세요.",
+    "그럼 목요일 오후 세 시에 다시 뵙겠습니다.",
+]
+
+# 가짜 LLM 모델별 속도 배율 (기본 모델 = 1.0)
+FAKE_MODEL_SPEED = {"gpt-4o-mini": 1.0, "gpt-4.1-nano": 0.6}
+PREFIX_TOKENS = estimate_tokens(prompts.prefix_text)  # 캐시된 공통 접두부
+BLOCK_SIZE = int(SAMPLE_RATE * 0.1)  # 오디오 콜백 블록 (100ms)
+
+
+class FakeSpeechRecognizer:
+    """결정적 STT 대체물 - 실제 인식기처럼 WAV 인코딩 후 설정된 지연만큼 대기"""
+
+    def __init__(self, latency: float = 0.3, jitter: float = 0.05, seed: int = 0, streaming: bool = False):
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.streaming = streaming
+        self.transcript = DEFAULT_TRANSCRIPT  # 다음 호출에 돌려줄 인식 결과
+
+    def _encode(self, audio_data: np.ndarray, sample_rate: int) -> int:
+        with tracer.span("wav_encode"):
+            return len(WavPayload(encode_wav(audio_data, sample_rate)))
+
+    def transcribe(self, audio_data: np.ndarray, sample_rate: int = 16000, language: str = "ko") -> str:
+        payload_size = self._encode(audio_data, sample_rate)
+
+        with tracer.span("stt_request"):
+            # 요청 크기에 비례하는 업로드 시간도 흉내 (10MB/s)
+            _sleep_jittered(self.latency + payload_size / 10e6, self.jitter, self.random)
+
+        return self.transcript
+
+    def transcribe_stream(self, audio_data: np.ndarray, sample_rate: int = 16000, language: str = "ko"):
+        """전체 지연 시간은 transcribe()와 같고, 문장이 그 사이에 고르게 나뉘어 도착"""
+        payload_size = self._encode(audio_data, sample_rate)
+        sentences = split_sentences(self.transcript) or [""]
+
+        with tracer.span("stt_request"):
+            total = max(0.0, self.latency + payload_size / 10e6 + self.random.uniform(-self.jitter, self.jitter))
+            for i in range(len(sentences)):
+                time.sleep(total / len(sentences))
+                yield " ".join(sentences[:i + 1])
+        yield self.transcript
+
+
+class FakeAIAgent:
+    """결정적 스타일 변환 대체물"""
+
+    def __init__(self, latency: float = 0.4, jitter: float = 0.05, seed: int = 1, per_char: float = 0.0,
+                 tiering: bool = False):
+        self.latency = latency
+        self.jitter = jitter
+        self.per_char = per_char  # 출력 길이에 비례하는 생성 시간 (초/글자)
+        self.random = random.Random(seed)
+        self.policy = TieringPolicy(persist=False) if tiering else None
+        self.costs = []  # 요청별 비용 (USD, LLM 생략은 0)
+        self.cache = TransformCache()
+        self._pool = None
+
+    def _model(self, text: str, style: str):
+        """(LLM 생략 여부, 모델)"""
+        if self.policy:
+            plan = self.policy.plan(text, style)
+            return plan.skip, plan.model
+        return False, MODEL_TIERS[0][1]
+
+    def transform_style(self, text: str, style: str) -> str:
+        skip, model = self._model(text, style)
+        if skip:
+            self.costs.append(0.0)
+            return text
+        cached = self.cache.get(style, text)
+        if cached is not None:
+            return cached
+
+        with tracer.span("style_request"):
+            seconds = (self.latency + self.per_char * len(text)) * FAKE_MODEL_SPEED[model]
+            _sleep_jittered(seconds, self.jitter, self.random)
+
+        tokens = estimate_tokens(text)
+        self.costs.append(estimate_cost(model, PREFIX_TOKENS + tokens, tokens, cached_tokens=PREFIX_TOKENS))
+        if self.policy:
+            self.policy.learn(style, tokens, tokens)
+        self.cache.put(style, text, text)
+        return text
+
+    def preview_styles(self, text: str) -> dict:
+        """스타일 전부를 한 요청으로 - 출력이 스타일 수만큼 길다"""
+        styles = prompts.styles
+        skip, model = self._model(text, "normal")
+        if skip or not self.cache.missing(text, styles):
+            return {}
+
+        with tracer.span("style_preview"):
+            seconds = (self.latency + self.per_char * len(text) * len(styles)) * FAKE_MODEL_SPEED[model]
+            _sleep_jittered(seconds, self.jitter, self.random)
+
+        tokens = estimate_tokens(text)
+        self.costs.append(estimate_cost(model, PREFIX_TOKENS + tokens, tokens * len(styles),
+                                        cached_tokens=PREFIX_TOKENS))
+        for style in styles:
+            self.cache.put(style, text, text, overwrite=False)
+        return {style: text for style in styles}
+
+    def speculative(self, style: str) -> SpeculativeTransform:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=4)
+        return SpeculativeTransform(self.transform_style, style, self._pool)
+
+
+class TypingSink:
+    """타이핑/키 입력을 기록만 하는 싱크"""
+
+    def __init__(self):
+        self.typed = []
+        self.keys = []
+
+    def _type_text(self, text: str):
+        with tracer.span("paste"):
+            self.typed.append(text)
+
+    def _press_key(self, key: str):
+        with tracer.span(key.lower()):
+            self.keys.append(key)
+
+    def _replace_typed(self, old: str, new: str):
+        with tracer.span("erase"):
+            self.keys.extend(["backspace"] * len(old))
+        self._type_text(new)
+
+
+def _sleep_jittered(seconds: float, jitter: float, rng: random.Random):
+    if seconds > 0:
+        time.sleep(max(0.0, seconds + rng.uniform(-jitter, jitter)))
+
+
+def load_fixture(path: str) -> np.ndarray:
+    """WAV 파일 → int16 (캡처 형식 그대로)"""
+    with wave.open(path, 'rb') as wav_file:
+        if wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+            raise ValueError(f"16-bit mono WAV만 지원: {path}")
+        if wav_file.getframerate() != SAMPLE_RATE:
+            raise ValueError(f"{SAMPLE_RATE}Hz WAV만 지원: {path}")
+        frames = wav_file.readframes(wav_file.getnframes())
+    return np.frombuffer(frames, dtype=np.int16).copy()
+
+
+def synthetic_fixtures(seed: int = 0) -> list:
+    """음성 대역 톤 + 잡음으로 된 합성 발화 (1~8초)"""
+    rng = np.random.default_rng(seed)
+    fixtures = []
+    transcripts = [
+        (0.6, "네"),
+        (0.8, "3시 15분"),
+        (1.0, SENTENCES[0]),
+        (2.5, SENTENCES[1]),
+        (4.0, " ".join(SENTENCES[:2])),
+        (8.0, " ".join(SENTENCES[:3])),
+        (12.0, " ".join(SENTENCES)),
+        (30.0, " ".join(SENTENCES * 3)),  # 긴 받아쓰기
+    ]
+    for seconds, transcript in transcripts:
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+        voice = 0.2 * envelope * np.sin(2 * np.pi * (180 + 40 * np.sin(2 * np.pi * 0.5 * t)) * t)
+        noise = 0.01 * rng.standard_normal(t.size)
+        fixtures.append((f"synthetic_{seconds:.1f}s", ((voice + noise) * 32767).astype(np.int16), transcript))
+    return fixtures
+
+
+def to_blocks(audio: np.ndarray) -> list:
+    """오디오 콜백처럼 100ms 블록 리스트로 분할"""
+    return [audio[i:i + BLOCK_SIZE].copy() for i in range(0, len(audio), BLOCK_SIZE)]
+
+
+def summarize(values: list) -> dict:
+    ordered = sorted(values)
+    n = len(ordered)
+
+    def pct(p):
+        return ordered[max(0, int(np.ceil(p / 100 * n)) - 1)]
+
+    return {
+        "count": n,
+        "mean_ms": round(sum(ordered) / n, 3),
+        "p50_ms": round(pct(50), 3),
+        "p95_ms": round(pct(95), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def summarize_cost(costs: list) -> dict:
+    """LLM 요청 비용 분포 (USD, 100만 회 기준으로도 표시)"""
+    if not costs:
+        return {"requests": 0, "skipped": 0, "total_usd": 0.0, "mean_usd": 0.0, "p95_usd": 0.0}
+    ordered = sorted(costs)
+    return {
+        "requests": len(costs),
+        "skipped": sum(1 for c in costs if c == 0.0),
+        "total_usd": round(sum(costs), 8),
+        "mean_usd": round(sum(costs) / len(costs), 8),
+        "p95_usd": round(ordered[max(0, int(np.ceil(0.95 * len(costs))) - 1)], 8),
+    }
+
+
+def run_benchmark(fixtures: list, repeat: int = 3, stt_latency: float = 0.3, llm_latency: float = 0.4,
+                  jitter: float = 0.05, seed: int = 0, style: str = "formal",
+                  llm_per_char: float = 0.0, streaming: bool = False, tiering: bool = False,
+                  preview: bool = False) -> dict:
+    """픽스처를 repeat회 재생하고 결과 요약 반환
+
+    preview: 받아쓰기마다 미리보기가 준비되길 기다렸다가 나머지 스타일로 전부 바꿔 본다
+    """
+    stt = FakeSpeechRecognizer(stt_latency, jitter, seed, streaming=streaming)
+    ai = FakeAIAgent(llm_latency, jitter, seed + 1, per_char=llm_per_char, tiering=tiering)
+    sink = TypingSink()
+    pipeline = DictationPipeline(stt, ai, sink, sample_rate=SAMPLE_RATE, enter_delay=0.0, preview=preview)
+    switch_styles = [s for s in prompts.styles if s != style] if preview else []
+
+    tracer.traces = deque(maxlen=len(fixtures) * repeat * (1 + len(switch_styles)))
+    audio_seconds = 0.0
+    preview_ready = []  # 입력 후 미리보기가 준비될 때까지 (ms)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            for _name, audio, transcript in fixtures:
+                stt.transcript = transcript or DEFAULT_TRANSCRIPT
+                blocks = to_blocks(audio)
+                pipeline.run(blocks, style, time.perf_counter_ns())
+                audio_seconds += len(audio) / SAMPLE_RATE
+                if preview:
+                    typed_at = time.perf_counter()
+                    pipeline.wait_preview()
+                    preview_ready.append((time.perf_counter() - typed_at) * 1000)
+                    for other in switch_styles:
+                        pipeline.restyle(other)
+    elapsed = time.perf_counter() - start
+    _current, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stages = {}
+    totals = []
+    restyles = []
+    for trace in tracer.traces:
+        if trace.name == "restyle":
+            restyles.append(trace.duration_ms)
+            continue
+        for stage, ms in trace.stage_ms().items():
+            stages.setdefault(stage, []).append(ms)
+        totals.append(trace.duration_ms)
+
+    # ru_maxrss: 리눅스는 KB, macOS는 바이트
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+    if sys.platform != "darwin":
+        max_rss *= 1024
+
+    utterances = len(totals)
+    return {
+        "utterances": utterances,
+        "audio_seconds": round(audio_seconds, 3),
+        "elapsed_s": round(elapsed, 3),
+        "utterances_per_s": round(utterances / elapsed, 3),
+        "stages": {stage: summarize(values) for stage, values in stages.items()},
+        "total": summarize(totals),
+        "cost": summarize_cost(ai.costs),
+        "preview": {
+            "ready": summarize(preview_ready),
+            "restyle": summarize(restyles),
+        } if preview else None,
+        "memory": {
+            "traced_peak_mb": round(traced_peak / 1e6, 3),
+            "max_rss_mb": round(max_rss / 1e6, 1),
+        },
+        "config": {
+            "repeat": repeat, "stt_latency": stt_latency, "llm_latency": llm_latency,
+            "jitter": jitter, "seed": seed, "style": style,
+            "llm_per_char": llm_per_char, "streaming": streaming, "tiering": tiering,
+            "preview": preview,
+        },
+    }
+
+
+def print_report(result: dict):
+    print(f"발화 {result['utterances']}개 / 오디오 {result['audio_seconds']:.1f}초 / "
+          f"경과 {result['elapsed_s']:.2f}초 → {result['utterances_per_s']:.2f} utt/s")
+    print()
+    print(f"{'stage':<14}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}  (ms)")
+    for stage, s in list(result["stages"].items()) + [("total", result["total"])]:
+        print(f"{stage:<14}{s['mean_ms']:>10.2f}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['max_ms']:>10.2f}")
+    print()
+    cost = result["cost"]
+    if cost["requests"]:
+        print(f"LLM 비용: 요청 {cost['requests']}회 (생략 {cost['skipped']}), "
+              f"평균 ${cost['mean_usd'] * 1e6:.0f} / p95 ${cost['p95_usd'] * 1e6:.0f} (100만 회당)")
+    preview = result.get("preview")
+    if preview:
+        ready, restyle = preview["ready"], preview["restyle"]
+        print(f"스타일 전환: 미리보기 p50 {restyle['p50_ms']:.2f} / p95 {restyle['p95_ms']:.2f} ms "
+              f"(다시 말하기 p50 {result['total']['p50_ms']:.0f} ms), "
+              f"미리보기 준비 p50 {ready['p50_ms']:.0f} / p95 {ready['p95_ms']:.0f} ms")
+    mem = result["memory"]
+    print(f"메모리: tracemalloc 피크 {mem['traced_peak_mb']:.2f} MB, 최대 RSS {mem['max_rss_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ZZABIS 오프라인 리플레이 벤치마크")
+    parser.add_argument("fixtures", nargs="?", help="WAV 픽스처 디렉토리 (없으면 합성 음성)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stt-latency", type=float, default=0.3)
+    parser.add_argument("--llm-latency", type=float, default=0.4)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--style", default="formal")
+    parser.add_argument("--llm-per-char", type=float, default=0.0, help="출력 글자당 LLM 생성 시간 (초)")
+    parser.add_argument("--streaming", action="store_true", help="스트리밍 인식 + 추측 스타일 변환")
+    parser.add_argument("--tiering", action="store_true", help="입력 길이 기반 LLM 생략/모델 선택")
+    parser.add_argument("--preview", action="store_true", help="스타일 미리보기 (일괄 변환 후 버튼 전환)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장 (커밋별 추적용)")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures = []
+        for path in sorted(glob.glob(os.path.join(args.fixtures, "*.wav"))):
+            transcript_path = os.path.splitext(path)[0] + ".txt"
+            transcript = None
+            if os.path.exists(transcript_path):
+                with open(transcript_path, encoding="utf-8") as f:
+                    transcript = f.read().strip()
+            fixtures.append((os.path.basename(path), load_fixture(path), transcript))
+        if not fixtures:
+            print(f"WAV 픽스처가 없습니다: {args.fixtures}")
+            sys.exit(1)
+    else:
+        fixtures = synthetic_fixtures(args.seed)
+
+    result = run_benchmark(
+        fixtures, repeat=args.repeat,
+        stt_latency=args.stt_latency, llm_latency=args.llm_latency,
+        jitter=args.jitter, seed=args.seed, style=args.style,
+        llm_per_char=args.llm_per_char, streaming=args.streaming, tiering=args.tiering,
+        preview=args.preview
+    )
+    print_report(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
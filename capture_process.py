@@ -0,0 +1,383 @@
+"""
+ZZABIS 캡처 프로세스 - 오디오 캡처를 별도 프로세스에서 실행 (선택 사항)
+
+PortAudio 콜백, Qt UI, pynput 리스너, 네트워크 호출이 한 프로세스의 GIL을
+나눠 쓰면 화면 갱신이나 큰 JSON 파싱 동안 오디오 콜백이 밀려 오버플로가 난다.
+캡처 + 16kHz 변환 + 레벨 계산을 자식 프로세스에서 하고, 결과는 공유 메모리
+링 버퍼(multiprocessing.shared_memory)로 넘긴다. 메인 프로세스는 링에서
+복사 없이 뷰로 읽는다. VAD/녹음 버퍼링은 핫키 상태와 묶여 있어 메인의
+캡처 스레드에 그대로 둔다 (오디오 1초당 0.2ms 수준).
+"""
+
+import json
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from audio_meter import compute_levels
+from resample import StreamingResampler
+
+SAMPLE_RATE = 16000
+
+# 링 헤더 (int64): 예약 (발행한 블록 수는 published 값으로), 기록한 샘플 수, 장치 오버플로 수, 예약
+_HDR_SAMPLES, _HDR_OVERFLOWS = 1, 2
+HEADER_FIELDS = 4
+# 블록 레코드 (float64): 블록 끝 샘플 위치, rms, peak
+RECORD_FIELDS = 3
+
+
+class SharedAudioRing:
+    """단일 생산자/단일 소비자 공유 메모리 링 - int16 샘플 + 블록 레코드
+
+    생산자는 샘플과 레코드를 쓴 뒤 블록 수/샘플 위치를 published(잠금 있는
+    multiprocessing.Value)의 잠금 안에서 발행하고, 소비자는 같은 잠금 안에서
+    읽은 블록 수 전까지만 읽는다. 공유 메모리에 그냥 쓰는 순서는 ARM(Apple
+    Silicon)에서 다른 코어에 같은 순서로 보인다는 보장이 없어서, 잠금의
+    획득/해제를 메모리 장벽으로 쓴다. 소비자가 링 용량 이상 밀리면 덮어써진
+    블록은 건너뛰고 overflows로 센다.
+
+    published: 만든 쪽의 ring.published를 자식 프로세스에 인자로 넘겨서 연다
+    """
+
+    def __init__(self, name: Optional[str] = None, capacity: int = SAMPLE_RATE * 30,
+                 max_blocks: int = 4096, create: bool = False, published=None):
+        self.capacity = capacity
+        self.max_blocks = max_blocks
+        header_bytes = HEADER_FIELDS * 8
+        record_bytes = max_blocks * RECORD_FIELDS * 8
+        size = header_bytes + record_bytes + capacity * 2
+
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self.shm.name
+        buf = self.shm.buf
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buf)
+        self.records = np.ndarray((max_blocks, RECORD_FIELDS), dtype=np.float64, buffer=buf,
+                                  offset=header_bytes)
+        self.data = np.ndarray((capacity,), dtype=np.int16, buffer=buf,
+                               offset=header_bytes + record_bytes)
+        if create:
+            self.header[:] = 0
+            if published is None:
+                published = mp.get_context("spawn").Value("q", 0)
+        elif published is None:
+            raise ValueError("기존 링을 열 때는 만든 쪽의 published 값이 필요합니다")
+        self.published = published
+
+        # 소비자 상태 (프로세스별)
+        self._read_blocks = 0
+        self._read_pos = 0
+        self.overflows = 0
+
+    # ── 생산자 ──
+
+    def write(self, samples: np.ndarray, rms: float, peak: float):
+        n = len(samples)
+        pos = int(self.header[_HDR_SAMPLES])
+        start = pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        if first < n:
+            self.data[:n - first] = samples[first:]
+
+        end = pos + n
+        blocks = self.published.value  # 생산자는 하나 - 자기가 쓴 값
+        self.records[blocks % self.max_blocks] = (end, rms, peak)
+        # 발행 - 잠금 해제가 장벽이라 소비자가 새 블록 수를 보면 샘플/레코드도 보임
+        with self.published.get_lock():
+            self.header[_HDR_SAMPLES] = end
+            self.published.value = blocks + 1
+
+    def set_device_overflows(self, count: int):
+        self.header[_HDR_OVERFLOWS] = count
+
+    # ── 소비자 ──
+
+    @property
+    def device_overflows(self) -> int:
+        return int(self.header[_HDR_OVERFLOWS])
+
+    def _written(self) -> Tuple[int, int]:
+        """(발행된 블록 수, 기록된 샘플 수) - 생산자와 같은 잠금 안에서"""
+        with self.published.get_lock():
+            return self.published.value, int(self.header[_HDR_SAMPLES])
+
+    def read(self) -> List[Tuple[np.ndarray, float, float]]:
+        """새 블록들을 (샘플, rms, peak)로 반환
+
+        샘플은 링의 뷰라서 다음 한 바퀴가 돌기 전까지만 유효하다 (링 끝에 걸친
+        블록만 복사본). 오래 보관하려면 호출자가 복사해야 한다.
+        """
+        published, _ = self._written()
+        if published - self._read_blocks > self.max_blocks:
+            # 레코드까지 덮어써짐 - 남아 있는 블록부터 다시 시작
+            skipped = published - self._read_blocks - self.max_blocks
+            self.overflows += skipped
+            self._read_blocks = published - self.max_blocks
+            self._read_pos = int(self.records[(self._read_blocks - 1) % self.max_blocks][0])
+
+        blocks = []
+        while self._read_blocks < published:
+            end, rms, peak = self.records[self._read_blocks % self.max_blocks]
+            end = int(end)
+            start = self._read_pos
+            self._read_blocks += 1
+            self._read_pos = end
+            if self._written()[1] - start > self.capacity:
+                self.overflows += 1  # 읽기 전에 샘플이 덮어써짐
+                continue
+
+            a, b = start % self.capacity, end % self.capacity
+            if a < b or end == start:
+                view = self.data[a:b]
+            else:
+                view = np.concatenate((self.data[a:], self.data[:b]))
+            blocks.append((view, float(rms), float(peak)))
+        return blocks
+
+    def close(self, unlink: bool = False):
+        # numpy 뷰가 버퍼를 잡고 있으면 close가 실패하므로 먼저 놓는다
+        self.header = self.records = self.data = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _capture_main(shm_name: str, published, capacity: int, max_blocks: int, device, block_seconds: float,
+                  commands, events):
+    """자식 프로세스 - 장치 관리자로 캡처하고 16kHz로 변환해서 링에 기록"""
+    from audio_devices import AudioDeviceManager
+
+    ring = SharedAudioRing(shm_name, capacity, max_blocks, published=published)
+    resamplers = {}
+    manager = None
+
+    def on_block(indata, samplerate):
+        resampler = resamplers.get(samplerate)
+        if resampler is None:
+            resampler = resamplers[samplerate] = StreamingResampler(samplerate, SAMPLE_RATE)
+        samples = resampler.process(indata.reshape(-1))
+        rms, peak = compute_levels(samples)
+        ring.write(samples, rms, peak)
+        ring.set_device_overflows(manager.overflows)
+
+    manager = AudioDeviceManager(
+        on_block=on_block, block_seconds=block_seconds,
+        on_open=lambda dev: events.put(("open", dev)),
+        on_error=lambda message: events.put(("error", message))
+    )
+    manager.start(device)
+    try:
+        while True:
+            command = commands.get()
+            if command[0] == "switch":
+                resamplers.clear()
+                manager.switch(command[1])
+            elif command[0] == "stop":
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop()
+        ring.close()
+
+
+class CaptureProcess:
+    """메인 프로세스 쪽 핸들 - 자식 프로세스 시작/정지, 마이크 전환, 링 읽기
+
+    on_open(device), on_error(message)는 이벤트 스레드에서 호출된다.
+    """
+
+    def __init__(self, device=None, block_seconds: float = 0.1, ring_seconds: float = 30.0,
+                 on_open=None, on_error=None):
+        self.device = device
+        self.block_seconds = block_seconds
+        self.capacity = int(SAMPLE_RATE * ring_seconds)
+        self.max_blocks = max(64, int(ring_seconds / block_seconds) * 2)
+        self.on_open = on_open or (lambda device: None)
+        self.on_error = on_error or (lambda message: None)
+        self.ring = None
+        self.process = None
+        self.running = False
+
+    def start(self):
+        # macOS 기본과 같은 spawn - Qt/PortAudio 상태를 fork로 물려받지 않음
+        ctx = mp.get_context("spawn")
+        self.ring = SharedAudioRing(capacity=self.capacity, max_blocks=self.max_blocks, create=True,
+                                    published=ctx.Value("q", 0))
+        self.commands = ctx.Queue()
+        self.events = ctx.Queue()
+        self.process = ctx.Process(
+            target=_capture_main,
+            args=(self.ring.name, self.ring.published, self.capacity, self.max_blocks, self.device, self.block_seconds,
+                  self.commands, self.events),
+            daemon=True
+        )
+        self.process.start()
+        self.running = True
+        threading.Thread(target=self._event_loop, daemon=True).start()
+        print(f"캡처 프로세스 시작 (pid {self.process.pid})")
+
+    def _event_loop(self):
+        while self.running:
+            try:
+                kind, payload = self.events.get(timeout=0.5)
+            except queue.Empty:
+                if self.process is not None and not self.process.is_alive() and self.running:
+                    self.on_error("캡처 프로세스 종료됨")
+                    return
+                continue
+            if kind == "open":
+                self.on_open(payload)
+            elif kind == "error":
+                self.on_error(payload)
+
+    def switch(self, device):
+        self.device = device
+        self.commands.put(("switch", device))
+
+    def read(self) -> List[Tuple[np.ndarray, float, float]]:
+        return self.ring.read() if self.ring is not None else []
+
+    @property
+    def overflows(self) -> int:
+        """장치 오버플로 + 메인이 늦게 읽어 놓친 블록 수"""
+        if self.ring is None:
+            return 0
+        return self.ring.device_overflows + self.ring.overflows
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.commands.put(("stop",))
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.ring.close(unlink=True)
+        self.ring = None
+
+
+# ── 벤치마크: 합성 CPU 부하에서 오버플로 수 비교 ──
+
+def _fake_device(on_block, block_seconds: float, seconds: float, slack_blocks: int) -> Tuple[int, float]:
+    """실시간 간격으로 블록을 내는 가짜 장치
+
+    콜백이 예정 시각보다 slack_blocks 블록 이상 늦게 불리면 호스트 버퍼가
+    넘친 것으로 보고 오버플로로 센다 (PortAudio input_overflow에 해당).
+
+    Returns:
+        (오버플로 수, 최대 지연 ms)
+    """
+    rate = 48000
+    block = (1600 * np.random.default_rng(0).standard_normal(int(rate * block_seconds))).astype(np.int16)
+    overflows, worst = 0, 0.0
+    start = time.perf_counter()
+    for k in range(int(seconds / block_seconds)):
+        scheduled = start + (k + 1) * block_seconds
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        late = time.perf_counter() - scheduled
+        worst = max(worst, late)
+        if late > slack_blocks * block_seconds:
+            overflows += 1
+        on_block(block.reshape(-1, 1), rate)
+    return overflows, worst * 1000
+
+
+def _fake_capture_main(shm_name, published, capacity, max_blocks, block_seconds, seconds, slack_blocks, results):
+    """벤치마크용 자식 프로세스 - 가짜 장치 → 리샘플 → 링"""
+    ring = SharedAudioRing(shm_name, capacity, max_blocks, published=published)
+    resampler = StreamingResampler(48000, SAMPLE_RATE)
+
+    def on_block(indata, samplerate):
+        samples = resampler.process(indata.reshape(-1))
+        rms, peak = compute_levels(samples)
+        ring.write(samples, rms, peak)
+
+    results.put(_fake_device(on_block, block_seconds, seconds, slack_blocks))
+    ring.close()
+
+
+def _cpu_load(stop: threading.Event):
+    """GIL을 오래 잡는 작업 - 큰 JSON 파싱 (C 구현이라 파싱 중 GIL을 놓지 않음)"""
+    payload = json.dumps([{"text": "안녕하세요 " * 5, "n": i, "f": [1.5, 2.5]} for i in range(30000)])
+    while not stop.is_set():
+        json.loads(payload)
+
+
+def _python_load(stop: threading.Event):
+    """순수 파이썬 루프 - 다른 스레드와 GIL 경쟁"""
+    while not stop.is_set():
+        sum(i * i for i in range(10000))
+
+
+def benchmark(seconds: float = 5.0, block_seconds: float = 0.02, slack_blocks: int = 2):
+    """같은 프로세스 캡처 vs 캡처 프로세스 - 부하 중 오버플로 수"""
+    print(f"가짜 48kHz 장치, 블록 {block_seconds * 1000:.0f}ms, 호스트 버퍼 {slack_blocks}블록, {seconds:.0f}초")
+
+    for load_name, loads in (("부하 없음", ()), ("JSON 파싱 + 파이썬 루프", (_cpu_load, _python_load, _python_load))):
+        # 같은 프로세스: 캡처 스레드가 부하 스레드들과 GIL 경쟁
+        captured = queue.Queue()
+        resampler = StreamingResampler(48000, SAMPLE_RATE)
+
+        def on_block(indata, samplerate):
+            samples = resampler.process(indata.reshape(-1))
+            captured.put((samples, compute_levels(samples)))
+
+        stop = threading.Event()
+        workers = [threading.Thread(target=load, args=(stop,), daemon=True) for load in loads]
+        for worker in workers:
+            worker.start()
+        result = {}
+        capture = threading.Thread(
+            target=lambda: result.update(r=_fake_device(on_block, block_seconds, seconds, slack_blocks)))
+        capture.start()
+        capture.join()
+        stop.set()
+        for worker in workers:
+            worker.join()
+        in_process = result["r"]
+
+        # 캡처 프로세스: 부하는 메인에만, 메인은 링을 주기적으로 읽음
+        ctx = mp.get_context("spawn")
+        ring = SharedAudioRing(capacity=SAMPLE_RATE * 10, max_blocks=2048, create=True,
+                               published=ctx.Value("q", 0))
+        results = ctx.Queue()
+        child = ctx.Process(target=_fake_capture_main, args=(
+            ring.name, ring.published, ring.capacity, ring.max_blocks, block_seconds, seconds, slack_blocks, results))
+        child.start()
+
+        stop = threading.Event()
+        workers = [threading.Thread(target=load, args=(stop,), daemon=True) for load in loads]
+        for worker in workers:
+            worker.start()
+        received = 0
+        isolated = None
+        while isolated is None:
+            received += len(ring.read())
+            try:
+                isolated = results.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        received += len(ring.read())
+        stop.set()
+        for worker in workers:
+            worker.join()
+        child.join()
+        ring_overflows = ring.overflows
+        ring.close(unlink=True)
+
+        print(f"  {load_name}")
+        print(f"    같은 프로세스   오버플로 {in_process[0]:>4}회, 최대 지연 {in_process[1]:7.1f} ms")
+        print(f"    캡처 프로세스   오버플로 {isolated[0]:>4}회, 최대 지연 {isolated[1]:7.1f} ms "
+              f"(메인 수신 {received}블록, 링 유실 {ring_overflows})")
+
+
+if __name__ == "__main__":
+    benchmark()
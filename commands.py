@@ -6,9 +6,13 @@ MacVoice 명령어 시스템
 import subprocess
 import re
 import time
+import threading
 from typing import Optional, Callable
 import pyautogui
 import pyperclip
+from tracing import tracer
+from command_match import CommandResolver
+from app_index import AppIndex
 
 # 마우스 안전 설정
 pyautogui.FAILSAFE = True
@@ -20,6 +24,25 @@ class CommandExecutor:
 
     def __init__(self):
         self.commands = self._build_commands()
+        self.resolver = CommandResolver(self.commands)
+        # 정확 일치는 긴 문구부터 ("닫아"보다 "탭 닫아", "클릭"보다 "오른쪽 클릭")
+        self._exact_order = sorted(self.commands, key=len, reverse=True)
+        # 설치된 앱 색인 - 처음 "~ 열어"를 처리할 때 만든다 (캐시로 바로 조회, 백그라운드에서 훑어서 갱신)
+        self.apps = None
+        self._apps_lock = threading.Lock()
+
+    def _app_index(self) -> AppIndex:
+        """앱 색인 (처음 부를 때 캐시를 읽고 백그라운드 훑기 시작)"""
+        with self._apps_lock:
+            if self.apps is None:
+                self.apps = AppIndex()
+                self.apps.start()
+            return self.apps
+
+    def stop(self):
+        """앱 색인 백그라운드 훑기 정지 (만든 적이 있으면)"""
+        if self.apps is not None:
+            self.apps.stop()
 
     def _run_applescript(self, script: str) -> str:
         """AppleScript 실행"""
@@ -156,6 +179,14 @@ class CommandExecutor:
         self._run_applescript(f'tell application "{app_name}" to activate')
         print(f"  → {app_name} 실행")
 
+    def _open_app_path(self, path: str):
+        """앱 번들 경로로 열기 (색인에서 찾은 앱)"""
+        try:
+            subprocess.run(['open', path], capture_output=True, timeout=10)
+            print(f"  → {path} 실행")
+        except Exception as e:
+            print(f"앱 실행 오류: {e}")
+
     # === 볼륨 제어 ===
     def _volume_up(self, amount: int = 10):
         self._run_applescript(f'set volume output volume ((output volume of (get volume settings)) + {amount})')
@@ -347,11 +378,12 @@ class CommandExecutor:
             old_clipboard = ""
 
         try:
-            # 텍스트를 클립보드에 복사
-            pyperclip.copy(text)
-            # 붙여넣기
-            pyautogui.hotkey('command', 'v')
-            time.sleep(0.1)
+            with tracer.span("paste"):
+                # 텍스트를 클립보드에 복사
+                pyperclip.copy(text)
+                # 붙여넣기
+                pyautogui.hotkey('command', 'v')
+                time.sleep(0.1)
         finally:
             # 클립보드 복원
             try:
@@ -360,6 +392,13 @@ class CommandExecutor:
             except:
                 pass
 
+    def _replace_typed(self, old: str, new: str):
+        """방금 입력한 텍스트를 지우고 새 텍스트 입력 (스타일 미리보기)"""
+        with tracer.span("erase"):
+            # 붙여넣은 한글은 완성된 음절이라 글자당 백스페이스 한 번
+            pyautogui.press('backspace', presses=len(old), interval=0.0)
+        self._type_text(new)
+
     def _press_key(self, key: str):
         """단일 키 누르기"""
         key_map = {
@@ -381,7 +420,8 @@ class CommandExecutor:
             'pagedown': 'pagedown',
         }
         mapped_key = key_map.get(key.lower(), key.lower())
-        pyautogui.press(mapped_key)
+        with tracer.span(key.lower()):
+            pyautogui.press(mapped_key)
 
     def _select_all(self):
         """전체 선택 (Cmd+A)"""
@@ -451,16 +491,34 @@ class CommandExecutor:
         text_lower = text.lower().strip()
 
         # 정확히 일치하는 명령어 찾기
-        for cmd, action in self.commands.items():
+        for cmd in self._exact_order:
             if cmd in text_lower:
                 print(f"명령어 감지: {cmd}")
-                action()
+                self.commands[cmd]()
                 return True
 
+        # 유사 매칭 - 말 전체가 조금 틀린 명령어일 때만 ("볼륨 올러", "사파리 여러 줘")
+        found = self.resolver.resolve(text_lower)
+        if found:
+            cmd, confidence = found
+            print(f"명령어 감지 (유사도 {confidence:.2f}): {cmd}")
+            self.commands[cmd]()
+            return True
+
         # 동적 앱 열기 처리 ("~~ 열어" 패턴)
         app_match = re.search(r'(.+?)\s*(열어|실행|켜)', text_lower)
         if app_match:
             app_name = app_match.group(1).strip()
+            apps = self._app_index()
+            app = apps.resolve(app_name)
+            if app is not None:
+                print(f"앱 열기: {app_name} → {app.name}")
+                self._open_app_path(app.path)
+                return True
+            if apps.ready:
+                # 설치된 앱에 없음 - 그대로 넘기면 "~을 찾을 수 없음" 대화상자만 뜸
+                print(f"설치된 앱에서 찾지 못함: {app_name}")
+                return False
             print(f"앱 열기 시도: {app_name}")
             self._open_app(app_name)
             return True
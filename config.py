@@ -4,9 +4,14 @@ MacVoice 설정 파일
 
 import os
 import json
+import tempfile
+import threading
 
 CONFIG_FILE = os.path.expanduser("~/.macvoice_config.json")
 
+# 설정 읽고-바꾸고-쓰기를 한 번에 (설정 창, 스타일 길이 학습, 잡음 캘리브레이션이 서로 덮어쓰지 않게)
+_config_lock = threading.RLock()
+
 def load_config():
     """설정 파일 로드"""
     if os.path.exists(CONFIG_FILE):
@@ -15,9 +20,18 @@ def load_config():
     return {}
 
 def save_config(config):
-    """설정 파일 저장"""
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config, f, indent=2)
+    """설정 파일 저장 (임시 파일에 쓰고 바꿔치기 - 쓰다 죽어도 이전 설정이 남음)"""
+    with _config_lock:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(CONFIG_FILE), prefix=".macvoice_config.")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(config, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, CONFIG_FILE)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
 
 def get_api_key():
     """Gemini API 키 가져오기"""
@@ -45,16 +59,18 @@ def get_openai_api_key():
 
 def set_openai_api_key(key):
     """OpenAI API 키 저장"""
-    config = load_config()
-    config["openai_api_key"] = key
-    save_config(config)
+    with _config_lock:
+        config = load_config()
+        config["openai_api_key"] = key
+        save_config(config)
     print("OpenAI API 키가 저장되었습니다.")
 
 def set_api_key(key):
     """Gemini API 키 저장"""
-    config = load_config()
-    config["gemini_api_key"] = key
-    save_config(config)
+    with _config_lock:
+        config = load_config()
+        config["gemini_api_key"] = key
+        save_config(config)
     print("✅ API 키가 저장되었습니다.")
 
 
@@ -66,9 +82,24 @@ def get_microphone():
 
 def set_microphone(device_index):
     """마이크 장치 설정"""
+    with _config_lock:
+        config = load_config()
+        config["microphone_device"] = device_index
+        save_config(config)
+
+
+def get_noise_floor(mic_id: str):
+    """마이크별로 캘리브레이션된 잡음 바닥 RMS 가져오기 (없으면 None)"""
     config = load_config()
-    config["microphone_device"] = device_index
-    save_config(config)
+    return config.get("noise_floors", {}).get(mic_id)
+
+
+def set_noise_floor(mic_id: str, floor: float):
+    """마이크별 잡음 바닥 RMS 저장"""
+    with _config_lock:
+        config = load_config()
+        config.setdefault("noise_floors", {})[mic_id] = round(floor, 6)
+        save_config(config)
 
 
 def get_screen():
@@ -79,9 +110,10 @@ def get_screen():
 
 def set_screen(screen_index):
     """UI 표시 화면 설정"""
-    config = load_config()
-    config["screen_index"] = screen_index
-    save_config(config)
+    with _config_lock:
+        config = load_config()
+        config["screen_index"] = screen_index
+        save_config(config)
 
 
 def get_hotkey():
@@ -100,9 +132,119 @@ def set_hotkey(hotkey_config):
     - {"type": "keyboard", "key": "f5"}  # F5 키
     - {"type": "keyboard", "key": "space"}  # 스페이스바
     """
+    with _config_lock:
+        config = load_config()
+        config["hotkey"] = hotkey_config
+        save_config(config)
+
+
+def get_hotkey_backend():
+    """키보드 핫키 백엔드 가져오기 ("pynput" 또는 macOS "quartz")"""
+    config = load_config()
+    return config.get("hotkey_backend", "pynput")
+
+
+def set_hotkey_backend(backend: str):
+    """키보드 핫키 백엔드 설정"""
+    with _config_lock:
+        config = load_config()
+        config["hotkey_backend"] = backend
+        save_config(config)
+
+
+def get_dictation_mode():
+    """녹음 방식 가져오기 ("push_to_talk" 또는 "continuous")"""
+    config = load_config()
+    return config.get("dictation_mode", "push_to_talk")
+
+
+def set_dictation_mode(mode: str):
+    """녹음 방식 설정
+
+    - "push_to_talk": 핫키를 누르고 있는 동안만 녹음
+    - "continuous": 핫키로 켜고 끄며, 말을 멈출 때마다 자동으로 인식
+    """
+    with _config_lock:
+        config = load_config()
+        config["dictation_mode"] = mode
+        save_config(config)
+
+
+def get_stt_streaming():
+    """스트리밍 음성 인식 사용 여부 가져오기 (부분 결과로 스타일 변환을 미리 시작)"""
+    config = load_config()
+    return config.get("stt_streaming", False)
+
+
+def set_stt_streaming(enabled: bool):
+    """스트리밍 음성 인식 설정"""
+    with _config_lock:
+        config = load_config()
+        config["stt_streaming"] = bool(enabled)
+        save_config(config)
+
+
+def get_capture_process():
+    """오디오 캡처를 별도 프로세스에서 실행할지 여부 가져오기"""
     config = load_config()
-    config["hotkey"] = hotkey_config
-    save_config(config)
+    return config.get("capture_process", False)
+
+
+def set_capture_process(enabled: bool):
+    """오디오 캡처 프로세스 분리 설정 (UI/네트워크 작업이 오디오 콜백을 밀어내지 않도록)"""
+    with _config_lock:
+        config = load_config()
+        config["capture_process"] = bool(enabled)
+        save_config(config)
+
+
+def get_style_preview():
+    """스타일 미리보기 모드 여부 가져오기 (자동 엔터 대신 스타일 버튼으로 바꿔 보고 확정)
+
+    켜면 자동 엔터(앱 프로필 포함)는 항상 꺼진다 - 확정은 "엔터"라고 말해서.
+    """
+    config = load_config()
+    return config.get("style_preview", False)
+
+
+def set_style_preview(enabled: bool):
+    """스타일 미리보기 모드 설정"""
+    with _config_lock:
+        config = load_config()
+        config["style_preview"] = bool(enabled)
+        save_config(config)
+
+
+def get_pre_roll_ms():
+    """녹음 시작 전 포함할 오디오 길이 (ms) 가져오기 - 핫키보다 먼저 시작한 첫 음절 보호"""
+    config = load_config()
+    return config.get("pre_roll_ms", 300)
+
+
+def set_pre_roll_ms(ms: int):
+    """녹음 시작 전 포함할 오디오 길이 (ms) 설정 (0이면 사용 안 함)"""
+    with _config_lock:
+        config = load_config()
+        config["pre_roll_ms"] = int(ms)
+        save_config(config)
+
+
+def get_trace_export_path():
+    """지연 시간 트레이스 JSONL 기록 경로 가져오기 (None이면 기록 안 함, 바꾸면 재시작 후 적용)"""
+    path = os.environ.get("ZZABIS_TRACE_FILE")
+    if path:
+        return path
+
+    config = load_config()
+    return config.get("trace_export_path")
+
+
+def set_trace_export_path(path):
+    """지연 시간 트레이스 JSONL 기록 경로 설정"""
+    with _config_lock:
+        config = load_config()
+        config["trace_export_path"] = path
+        save_config(config)
 
 
 # 스타일 모드 정의
@@ -120,6 +262,20 @@ STYLE_MODES = {
 }
 
 
+def get_style_length_ratios():
+    """스타일별 출력/입력 토큰 비율 (학습값) 가져오기"""
+    config = load_config()
+    return config.get("style_length_ratios", {})
+
+
+def set_style_length_ratios(ratios: dict):
+    """스타일별 출력/입력 토큰 비율 저장"""
+    with _config_lock:
+        config = load_config()
+        config["style_length_ratios"] = ratios
+        save_config(config)
+
+
 def get_style_mode():
     """스타일 모드 가져오기"""
     config = load_config()
@@ -128,9 +284,10 @@ def get_style_mode():
 
 def set_style_mode(mode: str):
     """스타일 모드 설정"""
-    config = load_config()
-    config["style_mode"] = mode
-    save_config(config)
+    with _config_lock:
+        config = load_config()
+        config["style_mode"] = mode
+        save_config(config)
 
 
 def setup_api_key():
@@ -158,8 +315,11 @@ WHISPER_MODEL = "turbo"  # tiny, base, small, medium, large, turbo
 # 언어 설정
 LANGUAGE = "ko"  # ko, en, ja, zh, etc.
 
-# 음성 감지 설정
-SILENCE_THRESHOLD = 0.008
+# 음성 감지 설정 - 고정 임계값 대신 잡음 바닥 추정치 × 배율 (vad.NoiseFloorEstimator)
+DEFAULT_NOISE_FLOOR = 0.005
+SPEECH_START_RATIO = 3.0
+SPEECH_STOP_RATIO = 2.0
+MIN_SPEECH_THRESHOLD = 0.004
 SILENCE_DURATION = 1.0
 MIN_AUDIO_LENGTH = 0.3
 SAMPLE_RATE = 16000
@@ -1,5 +1,5 @@
 """
-MacVoice 데이터베이스 - 단축 명령어 및 사용 기록 저장
+MacVoice 데이터베이스 - 단축 명령어, 사용 기록, 앱별 스타일 프로필, 사용자 어휘 저장
 """
 
 import sqlite3
@@ -58,6 +58,36 @@ class JarvisDB:
             )
         """)
 
+        # 받아쓰기 기록 테이블 (오프라인 대기열에서 나중에 처리된 것 포함)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dictation_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text TEXT NOT NULL,
+                source TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # 앱별 스타일 프로필 테이블 (번들 ID 기준)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS app_profiles (
+                bundle_id TEXT PRIMARY KEY,
+                app_name TEXT,
+                style TEXT NOT NULL,
+                auto_enter INTEGER DEFAULT 1,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # 사용자 어휘 테이블 (제품명, 사람 이름 - 음성 인식 프롬프트/교정용)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS vocabulary (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                term TEXT UNIQUE NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
         self.conn.commit()
 
     # === 단축 명령어 관리 ===
@@ -151,6 +181,94 @@ class JarvisDB:
         """, (limit,))
         return [dict(row) for row in cursor.fetchall()]
 
+    # === 받아쓰기 기록 ===
+
+    def log_dictation(self, text: str, source: str):
+        """받아쓰기 결과 저장 (source: "offline" - 대기열에서 나중에 처리됨)"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO dictation_history (text, source) VALUES (?, ?)
+            """, (text, source))
+            self.conn.commit()
+        except Exception as e:
+            print(f"받아쓰기 기록 오류: {e}")
+
+    def get_recent_dictations(self, limit: int = 20) -> List[Dict]:
+        """최근 받아쓰기 조회"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT text, source, created_at
+            FROM dictation_history
+            ORDER BY id DESC
+            LIMIT ?
+        """, (limit,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    # === 앱별 스타일 프로필 ===
+
+    def set_app_profile(self, bundle_id: str, style: str, auto_enter: bool = True,
+                        app_name: str = None) -> bool:
+        """앱 프로필 추가/업데이트"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO app_profiles (bundle_id, app_name, style, auto_enter, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, (bundle_id, app_name, style, 1 if auto_enter else 0))
+            self.conn.commit()
+            return True
+        except Exception as e:
+            print(f"앱 프로필 저장 오류: {e}")
+            return False
+
+    def get_app_profiles(self) -> List[Dict]:
+        """모든 앱 프로필 조회"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT bundle_id, app_name, style, auto_enter FROM app_profiles")
+        return [dict(row) for row in cursor.fetchall()]
+
+    def delete_app_profile(self, bundle_id: str) -> bool:
+        """앱 프로필 삭제"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM app_profiles WHERE bundle_id = ?", (bundle_id,))
+            self.conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            print(f"앱 프로필 삭제 오류: {e}")
+            return False
+
+    # === 사용자 어휘 ===
+
+    def add_vocabulary_term(self, term: str) -> bool:
+        """어휘 추가 (이미 있으면 무시)"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("INSERT OR IGNORE INTO vocabulary (term) VALUES (?)", (term.strip(),))
+            self.conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            print(f"어휘 추가 오류: {e}")
+            return False
+
+    def get_vocabulary_terms(self) -> List[str]:
+        """모든 어휘 (최근 추가 순 - 인식 프롬프트 예산이 모자라면 앞쪽이 들어감)"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT term FROM vocabulary ORDER BY id DESC")
+        return [row["term"] for row in cursor.fetchall()]
+
+    def delete_vocabulary_term(self, term: str) -> bool:
+        """어휘 삭제"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM vocabulary WHERE term = ?", (term.strip(),))
+            self.conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            print(f"어휘 삭제 오류: {e}")
+            return False
+
     def get_learning_summary(self) -> str:
         """AI 학습용 사용 패턴 요약"""
         frequent = self.get_frequent_commands(5)
@@ -0,0 +1,368 @@
+"""
+ZZABIS 핫키 엔진 - 설정된 핫키를 한 번 컴파일해서 키 이벤트마다 O(1)로 판정
+시스템 전체의 모든 키 입력이 거쳐가는 경로이므로 이벤트당 할 일을 최소화한다.
+"""
+
+import sys
+import threading
+from pynput import keyboard
+
+# 수정자 비트마스크
+MOD_CTRL = 1
+MOD_ALT = 2
+MOD_SHIFT = 4
+MOD_CMD = 8
+
+MODIFIER_BITS = {
+    "ctrl": MOD_CTRL,
+    "alt": MOD_ALT,
+    "shift": MOD_SHIFT,
+    "cmd": MOD_CMD,
+}
+
+# pynput 키 → 수정자 비트 (모듈 로드 시 한 번만 생성)
+_PYNPUT_MODIFIERS = {
+    keyboard.Key.ctrl_l: MOD_CTRL,
+    keyboard.Key.ctrl_r: MOD_CTRL,
+    keyboard.Key.alt_l: MOD_ALT,
+    keyboard.Key.alt_r: MOD_ALT,
+    keyboard.Key.shift_l: MOD_SHIFT,
+    keyboard.Key.shift_r: MOD_SHIFT,
+    keyboard.Key.cmd_l: MOD_CMD,
+    keyboard.Key.cmd_r: MOD_CMD,
+}
+
+# 설정 키 이름 → 허용되는 pynput 키 집합
+_PYNPUT_KEYS = {
+    "space": frozenset([keyboard.Key.space]),
+    "ctrl": frozenset([keyboard.Key.ctrl_l, keyboard.Key.ctrl_r]),
+    "ctrl_l": frozenset([keyboard.Key.ctrl_l]),
+    "ctrl_r": frozenset([keyboard.Key.ctrl_r]),
+    "alt": frozenset([keyboard.Key.alt_l, keyboard.Key.alt_r]),
+    "alt_l": frozenset([keyboard.Key.alt_l]),
+    "alt_r": frozenset([keyboard.Key.alt_r]),
+    "shift": frozenset([keyboard.Key.shift_l, keyboard.Key.shift_r]),
+    "shift_l": frozenset([keyboard.Key.shift_l]),
+    "shift_r": frozenset([keyboard.Key.shift_r]),
+    "cmd": frozenset([keyboard.Key.cmd_l, keyboard.Key.cmd_r]),
+    "cmd_l": frozenset([keyboard.Key.cmd_l]),
+    "cmd_r": frozenset([keyboard.Key.cmd_r]),
+    "enter": frozenset([keyboard.Key.enter]),
+    "tab": frozenset([keyboard.Key.tab]),
+    "esc": frozenset([keyboard.Key.esc]),
+    "backspace": frozenset([keyboard.Key.backspace]),
+}
+for _i in range(1, 13):
+    _PYNPUT_KEYS[f"f{_i}"] = frozenset([getattr(keyboard.Key, f"f{_i}")])
+
+# macOS 가상 키코드 (kVK_*) - Alt 조합 시 문자 대신 vk로 판정, 네이티브 백엔드용
+MAC_KEYCODES = {
+    "a": 0, "s": 1, "d": 2, "f": 3, "h": 4, "g": 5, "z": 6, "x": 7, "c": 8, "v": 9,
+    "b": 11, "q": 12, "w": 13, "e": 14, "r": 15, "y": 16, "t": 17, "o": 31, "u": 32,
+    "i": 34, "p": 35, "l": 37, "j": 38, "k": 40, "n": 45, "m": 46,
+    "1": 18, "2": 19, "3": 20, "4": 21, "6": 22, "5": 23, "9": 25, "7": 26, "8": 28, "0": 29,
+    "enter": 36, "tab": 48, "space": 49, "backspace": 51, "esc": 53,
+    "f1": 122, "f2": 120, "f3": 99, "f4": 118, "f5": 96, "f6": 97,
+    "f7": 98, "f8": 100, "f9": 101, "f10": 109, "f11": 103, "f12": 111,
+}
+
+# macOS 수정자 키코드 → 비트
+MAC_MODIFIER_KEYCODES = {
+    59: MOD_CTRL, 62: MOD_CTRL,
+    58: MOD_ALT, 61: MOD_ALT,
+    56: MOD_SHIFT, 60: MOD_SHIFT,
+    55: MOD_CMD, 54: MOD_CMD,
+}
+
+_MAC_MODIFIER_NAMES = {
+    "ctrl": (59, 62), "ctrl_l": (59,), "ctrl_r": (62,),
+    "alt": (58, 61), "alt_l": (58,), "alt_r": (61,),
+    "shift": (56, 60), "shift_l": (56,), "shift_r": (60,),
+    "cmd": (55, 54), "cmd_l": (55,), "cmd_r": (54,),
+}
+
+
+class HotkeyMatcher:
+    """핫키 설정을 컴파일한 매처
+
+    설정 dict를 한 번 해석해서 허용 키 집합, 문자, vk 코드, 필요한 수정자
+    비트마스크를 만들어 두고, 이벤트마다 집합 조회와 정수 비교만 한다.
+    """
+
+    def __init__(self, hotkey_config: dict):
+        key = hotkey_config.get("key", "space")
+
+        self.required = 0
+        for mod in hotkey_config.get("modifiers", []):
+            self.required |= MODIFIER_BITS.get(mod, 0)
+        self.pressed = 0
+
+        self._keys = _PYNPUT_KEYS.get(key, frozenset())
+        self._char = None if key in _PYNPUT_KEYS else key.lower()
+        # Alt가 눌리면 문자가 특수문자로 바뀌므로 알파벳은 vk로도 확인
+        self._vk = MAC_KEYCODES.get(self._char) if self._char and self._char.isalpha() else None
+
+        # 네이티브 백엔드용 키코드 집합
+        if key in _MAC_MODIFIER_NAMES:
+            self._native_keycodes = frozenset(_MAC_MODIFIER_NAMES[key])
+        elif key in MAC_KEYCODES:
+            self._native_keycodes = frozenset([MAC_KEYCODES[key]])
+        else:
+            self._native_keycodes = frozenset()
+
+        # 수정자 자체가 핫키면 그 비트는 조합 비교에서 제외
+        self._own_bit = MODIFIER_BITS.get(key.split("_")[0], 0) if key in _MAC_MODIFIER_NAMES else 0
+
+    def is_target(self, key) -> bool:
+        """pynput 키가 설정된 핫키인지 확인"""
+        if key in self._keys:
+            return True
+        if self._char is None:
+            return False
+
+        char = getattr(key, "char", None)
+        if char and char.lower() == self._char:
+            return True
+        return self._vk is not None and getattr(key, "vk", None) == self._vk
+
+    def is_target_keycode(self, keycode: int) -> bool:
+        """네이티브 키코드가 설정된 핫키인지 확인"""
+        return keycode in self._native_keycodes
+
+    def track_modifier(self, key, pressed: bool):
+        """pynput 수정자 키 추적"""
+        bit = _PYNPUT_MODIFIERS.get(key)
+        if bit:
+            if pressed:
+                self.pressed |= bit
+            else:
+                self.pressed &= ~bit
+
+    def set_modifiers(self, mask: int):
+        """네이티브 백엔드가 읽은 수정자 상태로 덮어쓰기"""
+        self.pressed = mask
+
+    def modifiers_match(self) -> bool:
+        """현재 수정자 조합이 설정과 일치하는지 확인"""
+        pressed = self.pressed & ~self._own_bit
+        required = self.required
+
+        # macOS에서 cmd와 ctrl을 동일하게 처리
+        if required & MOD_CTRL and pressed & MOD_CMD:
+            pressed = (pressed & ~MOD_CMD) | MOD_CTRL
+        if required & MOD_CMD and pressed & MOD_CTRL:
+            pressed = (pressed & ~MOD_CTRL) | MOD_CMD
+
+        return pressed == required
+
+
+class PynputBackend:
+    """pynput 키보드 리스너 백엔드 (모든 플랫폼)"""
+
+    def __init__(self, on_press, on_release):
+        self._listener = keyboard.Listener(on_press=on_press, on_release=on_release)
+
+    def start(self):
+        self._listener.start()
+
+    def stop(self):
+        self._listener.stop()
+
+
+class QuartzBackend:
+    """macOS CGEventTap 백엔드 - pynput의 키 객체 변환 없이 키코드/플래그만 전달
+
+    pyobjc-framework-Quartz가 필요하다. 리슨 전용 탭이라 입력을 막지 않는다.
+    """
+
+    def __init__(self, on_event):
+        import Quartz  # 선택 의존성
+        self.Quartz = Quartz
+        self.on_event = on_event
+        self._tap = None
+        self._loop = None
+        self._flag_bits = (
+            (Quartz.kCGEventFlagMaskControl, MOD_CTRL),
+            (Quartz.kCGEventFlagMaskAlternate, MOD_ALT),
+            (Quartz.kCGEventFlagMaskShift, MOD_SHIFT),
+            (Quartz.kCGEventFlagMaskCommand, MOD_CMD),
+        )
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        Q = self.Quartz
+        mask = (
+            Q.CGEventMaskBit(Q.kCGEventKeyDown)
+            | Q.CGEventMaskBit(Q.kCGEventKeyUp)
+            | Q.CGEventMaskBit(Q.kCGEventFlagsChanged)
+        )
+        self._tap = Q.CGEventTapCreate(
+            Q.kCGSessionEventTap, Q.kCGHeadInsertEventTap,
+            Q.kCGEventTapOptionListenOnly, mask, self._callback, None
+        )
+        if self._tap is None:
+            print("이벤트 탭 생성 실패 - 손쉬운 사용 권한을 확인하세요")
+            return
+
+        source = Q.CFMachPortCreateRunLoopSource(None, self._tap, 0)
+        self._loop = Q.CFRunLoopGetCurrent()
+        Q.CFRunLoopAddSource(self._loop, source, Q.kCFRunLoopCommonModes)
+        Q.CGEventTapEnable(self._tap, True)
+        Q.CFRunLoopRun()
+
+    def _callback(self, proxy, event_type, event, refcon):
+        Q = self.Quartz
+        if event_type in (Q.kCGEventTapDisabledByTimeout, Q.kCGEventTapDisabledByUserInput):
+            Q.CGEventTapEnable(self._tap, True)
+            return event
+
+        keycode = Q.CGEventGetIntegerValueField(event, Q.kCGKeyboardEventKeycode)
+        flags = Q.CGEventGetFlags(event)
+        mask = 0
+        for flag, bit in self._flag_bits:
+            if flags & flag:
+                mask |= bit
+
+        if event_type == Q.kCGEventFlagsChanged:
+            pressed = bool(mask & MAC_MODIFIER_KEYCODES.get(keycode, 0))
+        elif Q.CGEventGetIntegerValueField(event, Q.kCGKeyboardEventAutorepeat):
+            return event
+        else:
+            pressed = event_type == Q.kCGEventKeyDown
+
+        self.on_event(keycode, mask, pressed)
+        return event
+
+    def stop(self):
+        if self._loop is not None:
+            self.Quartz.CFRunLoopStop(self._loop)
+
+
+class HotkeyListener:
+    """키보드 핫키 리스너 - 백엔드 이벤트를 매처로 판정해 눌림/뗌 콜백 호출"""
+
+    def __init__(self, hotkey_config: dict, on_activate, on_deactivate, backend: str = "pynput"):
+        self.matcher = HotkeyMatcher(hotkey_config)
+        self.on_activate = on_activate
+        self.on_deactivate = on_deactivate
+        self.backend_name = backend
+        self.backend = self._create_backend(backend)
+
+    def _create_backend(self, backend: str):
+        if backend == "quartz" and sys.platform == "darwin":
+            try:
+                return QuartzBackend(self._on_native_event)
+            except ImportError:
+                print("Quartz 백엔드 사용 불가 (pyobjc 미설치) - pynput 사용")
+        self.backend_name = "pynput"
+        return PynputBackend(self._on_press, self._on_release)
+
+    def start(self):
+        self.backend.start()
+
+    def stop(self):
+        self.backend.stop()
+
+    def _on_press(self, key):
+        matcher = self.matcher
+        matcher.track_modifier(key, True)
+        if matcher.is_target(key) and matcher.modifiers_match():
+            self.on_activate()
+
+    def _on_release(self, key):
+        matcher = self.matcher
+        matcher.track_modifier(key, False)
+        if matcher.is_target(key):
+            self.on_deactivate()
+
+    def _on_native_event(self, keycode: int, mask: int, pressed: bool):
+        matcher = self.matcher
+        matcher.set_modifiers(mask)
+        if not matcher.is_target_keycode(keycode):
+            return
+        if pressed:
+            if matcher.modifiers_match():
+                self.on_activate()
+        else:
+            self.on_deactivate()
+
+
+def _legacy_is_target_key(target_key: str, key) -> bool:
+    """기존 main.py의 판정 방식 (벤치마크 비교용) - 이벤트마다 dict를 새로 만듦"""
+    key_mapping = {
+        "space": keyboard.Key.space, "f1": keyboard.Key.f1, "f2": keyboard.Key.f2,
+        "f3": keyboard.Key.f3, "f4": keyboard.Key.f4, "f5": keyboard.Key.f5,
+        "f6": keyboard.Key.f6, "f7": keyboard.Key.f7, "f8": keyboard.Key.f8,
+        "f9": keyboard.Key.f9, "f10": keyboard.Key.f10, "f11": keyboard.Key.f11,
+        "f12": keyboard.Key.f12, "ctrl": keyboard.Key.ctrl_l, "ctrl_l": keyboard.Key.ctrl_l,
+        "ctrl_r": keyboard.Key.ctrl_r, "alt": keyboard.Key.alt_l, "alt_l": keyboard.Key.alt_l,
+        "alt_r": keyboard.Key.alt_r, "shift": keyboard.Key.shift_l, "shift_l": keyboard.Key.shift_l,
+        "shift_r": keyboard.Key.shift_r, "cmd": keyboard.Key.cmd_l, "cmd_l": keyboard.Key.cmd_l,
+        "cmd_r": keyboard.Key.cmd_r, "enter": keyboard.Key.enter, "tab": keyboard.Key.tab,
+        "esc": keyboard.Key.esc, "backspace": keyboard.Key.backspace,
+    }
+    expected_key = key_mapping.get(target_key)
+    if expected_key is not None:
+        if key == expected_key:
+            return True
+        if target_key in ["ctrl", "alt", "shift", "cmd"]:
+            alt_keys = {
+                "ctrl": [keyboard.Key.ctrl_l, keyboard.Key.ctrl_r],
+                "alt": [keyboard.Key.alt_l, keyboard.Key.alt_r],
+                "shift": [keyboard.Key.shift_l, keyboard.Key.shift_r],
+                "cmd": [keyboard.Key.cmd_l, keyboard.Key.cmd_r],
+            }
+            return key in alt_keys.get(target_key, [])
+        return False
+
+    if hasattr(key, 'char') and key.char:
+        if key.char.lower() == target_key.lower():
+            return True
+    if hasattr(key, 'vk') and key.vk is not None:
+        vk_map = {
+            'z': 6, 'a': 0, 's': 1, 'd': 2, 'f': 3, 'g': 5,
+            'h': 4, 'j': 38, 'k': 40, 'l': 37, 'q': 12, 'w': 13,
+            'e': 14, 'r': 15, 't': 17, 'y': 16, 'u': 32, 'i': 34,
+            'o': 31, 'p': 35, 'x': 7, 'c': 8, 'v': 9, 'b': 11,
+            'n': 45, 'm': 46
+        }
+        if len(target_key) == 1 and target_key.lower() in vk_map:
+            if key.vk == vk_map[target_key.lower()]:
+                return True
+    return False
+
+
+def benchmark(events: int = 200000):
+    """이벤트당 판정 오버헤드 측정
+
+    헤드리스 리눅스에서는 PYNPUT_BACKEND=dummy python hotkey.py 로 실행.
+    """
+    import time
+
+    stream = [keyboard.KeyCode.from_char(c) for c in "hello world, typing everywhere "]
+    stream += [keyboard.Key.shift_l, keyboard.Key.space, keyboard.Key.enter, keyboard.Key.backspace]
+
+    for config in ({"key": "f5"}, {"key": "z", "modifiers": ["alt"]}):
+        target = config["key"]
+        listener = HotkeyListener(config, lambda: None, lambda: None)
+        n = len(stream)
+
+        start = time.perf_counter()
+        for i in range(events):
+            key = stream[i % n]
+            _legacy_is_target_key(target, key)
+        legacy = (time.perf_counter() - start) / events * 1e6
+
+        start = time.perf_counter()
+        for i in range(events):
+            listener._on_press(stream[i % n])
+        compiled = (time.perf_counter() - start) / events * 1e6
+
+        print(f"{target:>3}: legacy {legacy:.2f} µs/event, compiled {compiled:.2f} µs/event "
+              f"({legacy / compiled:.1f}x)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,264 @@
+"""
+ZZABIS 긴 받아쓰기 - 무음 경계에서 나눠 병렬로 인식하고 순서대로 이어 붙임
+
+5분짜리 녹음을 WAV 하나로 보내면 인식이 오래 걸리고 업로드 크기 한도(25MB)에도
+걸린다. LONG_AUDIO_SECONDS보다 긴 오디오는 SEGMENT_SECONDS 근처의 가장 조용한
+지점에서 자르고, 단어가 잘리지 않게 앞뒤로 조금씩 겹쳐서 제한된 스레드 풀로
+동시에 보낸다. 결과는 원래 순서로 잇고, 겹친 구간에서 두 번 나온 단어는 뺀다.
+말소리가 있는 구간이 빈 결과로 오면(오류) 한 번 더 보내고, 그래도 비면 그 자리에
+"[인식 실패 0:30~1:00]" 표시를 넣어 구멍이 조용히 사라지지 않게 한다.
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+
+from resilience import bind
+from tracing import tracer
+
+LONG_AUDIO_SECONDS = 45.0  # 이보다 길면 나눠서 인식
+SEGMENT_SECONDS = 30.0  # 목표 구간 길이
+SEARCH_SECONDS = 5.0  # 목표 지점 앞뒤로 이 범위에서 가장 조용한 곳을 찾음
+OVERLAP_SECONDS = 0.3  # 구간 앞뒤로 겹치는 길이
+FRAME_SECONDS = 0.02  # 에너지 계산 프레임
+SMOOTH_FRAMES = 10  # 쉼 길이 판단 (200ms)
+MAX_WORKERS = 4  # 동시 업로드 수
+MAX_OVERLAP_WORDS = 6  # 중복 제거 시 비교할 최대 단어 수
+VOICED_RMS = 0.02  # 프레임 RMS(최대 1.0)가 이보다 크면 말소리가 있는 구간
+SEGMENT_ATTEMPTS = 2  # 말소리가 있는데 빈 결과면 다시 보내는 횟수 포함
+
+_PUNCTUATION = re.compile(r'[^\w]+')
+
+
+def _frame_energy(audio: np.ndarray, frame: int) -> np.ndarray:
+    """프레임별 평균 제곱 (int16도 float32로 올려서 계산)"""
+    n = len(audio) // frame
+    frames = audio[:n * frame].reshape(n, frame).astype(np.float32)
+    return np.einsum('ij,ij->i', frames, frames) / frame
+
+
+def split_segments(audio: np.ndarray, sample_rate: int = 16000, segment: float = SEGMENT_SECONDS,
+                   search: float = SEARCH_SECONDS, overlap: float = OVERLAP_SECONDS) -> List[Tuple[int, int]]:
+    """
+    무음 경계 기준 구간 나누기
+
+    Returns:
+        [(시작 샘플, 끝 샘플)] - 겹침 포함, 순서대로
+    """
+    n = len(audio)
+    if n <= int((segment + search) * sample_rate):
+        return [(0, n)]
+
+    frame = max(1, int(FRAME_SECONDS * sample_rate))
+    energy = _frame_energy(audio, frame)
+    # 짧은 틈보다 긴 쉼을 고르도록 SMOOTH_FRAMES 프레임 평균
+    smoothed = np.convolve(energy, np.ones(SMOOTH_FRAMES) / SMOOTH_FRAMES, mode='same')
+    cuts = [0]
+    while n - cuts[-1] > (segment + search) * sample_rate:
+        lo = (cuts[-1] + int((segment - search) * sample_rate)) // frame
+        hi = min(len(energy), (cuts[-1] + int((segment + search) * sample_rate)) // frame)
+        target = (cuts[-1] + int(segment * sample_rate)) // frame
+        # 가장 조용한 쉼 중에서 목표 지점에 가장 가까운 곳
+        window = smoothed[lo:hi]
+        quiet = np.flatnonzero(window <= window.min() * 1.1 + 1e-3) + lo
+        cut = int(quiet[np.argmin(np.abs(quiet - target))])
+        cuts.append(cut * frame + frame // 2)
+    cuts.append(n)
+
+    pad = int(overlap * sample_rate)
+    return [(max(0, start - pad), min(n, end + pad)) for start, end in zip(cuts, cuts[1:])]
+
+
+def is_voiced(audio: np.ndarray, sample_rate: int = 16000) -> bool:
+    """말소리가 있는 구간인지 (가장 큰 프레임 RMS 기준)"""
+    frame = max(1, int(FRAME_SECONDS * sample_rate))
+    if len(audio) < frame:
+        return False
+    scale = 32767.0 if audio.dtype == np.int16 else 1.0
+    return float(_frame_energy(audio, frame).max()) > (VOICED_RMS * scale) ** 2
+
+
+def _clock(seconds: float) -> str:
+    return f"{int(seconds) // 60}:{int(seconds) % 60:02d}"
+
+
+def _normalize(word: str) -> str:
+    return _PUNCTUATION.sub("", word).lower()
+
+
+def merge_overlap(previous: str, text: str, max_words: int = MAX_OVERLAP_WORDS) -> str:
+    """뒤 구간 앞머리에서 앞 구간 끝과 겹치는 단어를 뺀 텍스트"""
+    if not previous:
+        return text
+    tail = [_normalize(w) for w in previous.split()[-max_words:]]
+    words = text.split()
+    head = [_normalize(w) for w in words[:max_words]]
+    for k in range(min(len(tail), len(head)), 0, -1):
+        if tail[-k:] == head[:k]:
+            return " ".join(words[k:])
+    return text
+
+
+class ChunkedTranscriber:
+    """긴 오디오를 구간별로 병렬 인식하는 래퍼
+
+    stt: transcribe(audio, sample_rate, language) -> str
+    """
+
+    def __init__(self, stt, workers: int = MAX_WORKERS, threshold: float = LONG_AUDIO_SECONDS):
+        self.stt = stt
+        self.workers = workers
+        self.threshold = threshold
+        self._pool = None
+
+    def is_long(self, audio: np.ndarray, sample_rate: int) -> bool:
+        return len(audio) > self.threshold * sample_rate
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int = 16000, language: str = "ko") -> str:
+        if not self.is_long(audio, sample_rate):
+            return self.stt.transcribe(audio, sample_rate, language)
+
+        with tracer.span("segment"):
+            segments = split_segments(audio, sample_rate)
+        print(f"긴 받아쓰기: {len(audio) / sample_rate:.1f}초 → {len(segments)}개 구간")
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stt")
+        # 구간은 원본의 뷰라서 복사 없음 - 업로드 인코딩이 각자 int16을 바로 읽는다
+        # bind: 풀 스레드도 받아쓰기 마감 시간 안에서 재시도
+        with tracer.span("stt_request"):
+            texts = list(self._pool.map(
+                bind(lambda span: self._transcribe_segment(audio[span[0]:span[1]], sample_rate, language)),
+                segments
+            ))
+
+        merged = ""
+        lost = 0
+        for (start, end), text in zip(segments, texts):
+            if text is None:
+                # 말소리가 있는데 인식 실패 - 빈칸으로 넘기지 않고 위치를 표시
+                lost += 1
+                text = f"[인식 실패 {_clock(start / sample_rate)}~{_clock(end / sample_rate)}]"
+            else:
+                text = merge_overlap(merged, text.strip())
+            if text:
+                merged = f"{merged} {text}" if merged else text
+        if lost:
+            print(f"긴 받아쓰기: {len(segments)}개 구간 중 {lost}개 인식 실패 - 결과에 표시")
+        return merged
+
+    def _transcribe_segment(self, audio: np.ndarray, sample_rate: int, language: str):
+        """구간 하나 인식 - 말소리가 있는데 계속 빈 결과면 None (실패)"""
+        for _ in range(SEGMENT_ATTEMPTS):
+            text = self.stt.transcribe(audio, sample_rate, language)
+            if text.strip() or not is_voiced(audio, sample_rate):
+                return text
+        return None
+
+
+class _FakeServer:
+    """벤치마크용 가짜 인식 서버
+
+    단어마다 주파수가 다른 톤 버스트로 된 오디오를 받아, 버스트 주파수로 단어를
+    알아낸다. 지연 시간은 기본 + 오디오 길이 비례 (실제 STT와 비슷하게).
+    """
+
+    def __init__(self, base: float = 0.3, per_second: float = 0.02, sample_rate: int = 16000):
+        self.base = base
+        self.per_second = per_second
+        self.sample_rate = sample_rate
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int = 16000, language: str = "ko") -> str:
+        time.sleep(self.base + self.per_second * len(audio) / sample_rate)
+        frame = int(FRAME_SECONDS * sample_rate)
+        voiced = _frame_energy(audio, frame) > (0.05 * 32767) ** 2
+        words = []
+        # 유성 프레임이 이어진 구간 = 단어 하나 (구간 경계에서 반 이상 잘린 단어는 버림)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+        for start, end in zip(edges[::2], edges[1::2]):
+            if (end - start) * frame < _WORD_SECONDS * sample_rate / 2:
+                continue
+            burst = audio[start * frame:end * frame].astype(np.float32)
+            spectrum = np.abs(np.fft.rfft(burst))
+            freq = np.argmax(spectrum) * sample_rate / len(burst)
+            words.append(f"단어{round((freq - _BASE_HZ) / _STEP_HZ)}")
+        return " ".join(words)
+
+
+_WORD_SECONDS = 0.4
+_BASE_HZ = 200.0
+_STEP_HZ = 12.0
+
+
+def _speech_fixture(seconds: float, sample_rate: int = 16000) -> Tuple[np.ndarray, str]:
+    """단어 버스트(0.4초) + 단어 사이 0.15초 + 8단어마다 0.7초 쉼"""
+    audio = []
+    words = []
+    t = np.arange(int(_WORD_SECONDS * sample_rate)) / sample_rate
+    envelope = np.minimum(1.0, np.minimum(t, t[::-1]) / 0.02)
+    total = 0
+    index = 0
+    while total < seconds * sample_rate:
+        tone = 0.3 * envelope * np.sin(2 * np.pi * (_BASE_HZ + _STEP_HZ * (index % 500)) * t)
+        audio.append((tone * 32767).astype(np.int16))
+        words.append(f"단어{index % 500}")
+        gap = 0.7 if index % 8 == 7 else 0.15
+        audio.append(np.zeros(int(gap * sample_rate), dtype=np.int16))
+        total += len(t) + int(gap * sample_rate)
+        index += 1
+    return np.concatenate(audio), " ".join(words)
+
+
+def benchmark(seconds: float = 300.0, sample_rate: int = 16000):
+    """5분 받아쓰기 - 한 번에 vs 구간 병렬 (동시 요청 수별 지연/정확도)"""
+    import contextlib
+    import io
+
+    audio, reference = _speech_fixture(seconds, sample_rate)
+    server = _FakeServer(sample_rate=sample_rate)
+    print(f"{seconds:.0f}초 받아쓰기, 단어 {len(reference.split())}개, "
+          f"구간 {len(split_segments(audio, sample_rate))}개 (가짜 서버: 0.3초 + 오디오 1초당 20ms)")
+    print(f"{'방식':<12}{'지연':>10}{'배속':>8}  결과")
+
+    start = time.perf_counter()
+    text = server.transcribe(audio, sample_rate)
+    single = time.perf_counter() - start
+    print(f"{'한 번에':<12}{single * 1000:>8.0f}ms{1.0:>7.1f}x  {'일치' if text == reference else '불일치'}")
+
+    for workers in (1, 2, 4, 8):
+        transcriber = ChunkedTranscriber(server, workers=workers)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            text = transcriber.transcribe(audio, sample_rate)
+        elapsed = time.perf_counter() - start
+        ok = "일치" if text == reference else f"불일치 ({len(text.split())}/{len(reference.split())}단어)"
+        print(f"{f'병렬 {workers}':<12}{elapsed * 1000:>8.0f}ms{single / elapsed:>7.1f}x  {ok}")
+
+    # 구간 인식 오류 (인식기는 오류 때 빈 결과를 돌려줌) - 한 번 실패 / 계속 실패
+    class _Failing:
+        def __init__(self, failures):
+            self.failures = failures  # 구간 길이(샘플) → 실패 횟수
+            self.calls = {}
+
+        def transcribe(self, clip, sample_rate=16000, language="ko"):
+            key = len(clip)
+            self.calls[key] = self.calls.get(key, 0) + 1
+            if self.calls[key] <= self.failures.get(key, 0):
+                return ""
+            return server.transcribe(clip, sample_rate, language)
+
+    lengths = [end - start for start, end in split_segments(audio, sample_rate)]
+    for label, failures in (("한 번 실패", 1), ("계속 실패", SEGMENT_ATTEMPTS)):
+        transcriber = ChunkedTranscriber(_Failing({lengths[2]: failures}), workers=4)
+        with contextlib.redirect_stdout(io.StringIO()):
+            text = transcriber.transcribe(audio, sample_rate)
+        marker = re.search(r'\[인식 실패 [^\]]+\]', text)
+        print(f"구간 3 {label}: {'일치' if text == reference else '불일치'}"
+              + (f", 표시 {marker.group(0)}" if marker else ""))
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -13,11 +13,12 @@ import pyperclip
 import time
 
 from commands import CommandExecutor
+from config import SPEECH_START_RATIO, SPEECH_STOP_RATIO, MIN_SPEECH_THRESHOLD
+from vad import NoiseFloorEstimator
 
 # 설정
 SAMPLE_RATE = 16000
 MODEL_SIZE = "large"  # tiny, base, small, medium, large
-SILENCE_THRESHOLD = 0.01  # 무음 감지 임계값
 SILENCE_DURATION = 1.5  # 이 시간(초) 동안 무음이면 인식 시작
 MIN_AUDIO_LENGTH = 0.5  # 최소 오디오 길이 (초)
 
@@ -27,6 +28,7 @@ class MacVoice:
         self.audio_buffer = []
         self.is_speaking = False
         self.silence_start = None
+        self.noise = NoiseFloorEstimator()  # 무음 임계값은 잡음 바닥 기준으로 적응
         self.keyboard_controller = Controller()
         self.model = None
         self.command_executor = CommandExecutor()
@@ -81,7 +83,10 @@ class MacVoice:
         audio_chunk = indata.copy().flatten()
         level = self.get_audio_level(audio_chunk)
 
-        if level > SILENCE_THRESHOLD:
+        # 말하는 중에는 낮은 종료 임계값 사용 (히스테리시스)
+        floor = self.noise.update(level)
+        threshold = floor * (SPEECH_STOP_RATIO if self.is_speaking else SPEECH_START_RATIO)
+        if level > max(MIN_SPEECH_THRESHOLD, threshold):
             # 소리 감지됨
             if not self.is_speaking:
                 self.is_speaking = True
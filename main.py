@@ -6,20 +6,36 @@ Gemini + Whisper + 멋진 UI
 """
 
 import sys
+import multiprocessing
+import queue
 import threading
 import time
-import numpy as np
-import sounddevice as sd
 from PyQt6.QtWidgets import QApplication, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QFrame
 from PyQt6.QtCore import Qt
-from pynput import keyboard, mouse
+from pynput import mouse
 
 from ui import MacVoiceUI
 from ai_agent import AIAgent
 from commands import CommandExecutor
-from config import get_microphone, get_openai_api_key, set_openai_api_key, get_hotkey, get_style_mode
+from config import (
+    get_microphone, get_openai_api_key, set_openai_api_key, get_hotkey, get_hotkey_backend,
+    get_style_mode, get_dictation_mode, get_noise_floor, set_noise_floor, get_pre_roll_ms,
+    get_capture_process, get_style_preview
+)
 from settings_dialog import SettingsDialog
 from speech_openai import OpenAISpeechRecognizer
+from speech_local import LocalSpeechRecognizer
+from audio_meter import compute_levels
+from hotkey import HotkeyListener
+from pipeline import DictationPipeline
+from vad import Endpointer, NoiseFloorEstimator, PreRollBuffer, trim_silence
+from resample import StreamingResampler
+from audio_devices import AudioDeviceManager
+from capture_process import CaptureProcess
+from database import get_db
+from app_profiles import AppProfileIndex
+from vocabulary import load_vocabulary
+from offline_queue import OfflineQueue
 
 
 class APIKeyDialog(QDialog):
@@ -163,6 +179,10 @@ def check_api_keys():
 # 설정
 SAMPLE_RATE = 16000
 MIN_AUDIO_LENGTH = 0.3
+STATUS_INTERVAL = 0.25  # 녹음 시간 표시 갱신 주기 (초)
+RING_POLL_INTERVAL = 0.02  # 캡처 프로세스 링 읽기 주기 (초)
+PREVIEW_ACTIVATE_DELAY = 0.15  # 스타일 교체 전 입력 대상 앱을 앞으로 가져온 뒤 대기 (초)
+PREVIEW_QUIET_SECONDS = 0.5  # 우리가 보낸 키 입력이 리스너에 늦게 도착하는 여유 (초)
 
 
 class ZzabisApp:
@@ -175,6 +195,8 @@ class ZzabisApp:
         self.settings_dialog = None
 
         self.audio_buffer = []
+        self.level_meter = ui.level_meter
+        self._next_status_at = 0.0
         self.is_recording = False
         self.processing = False
         self.running = True
@@ -182,17 +204,56 @@ class ZzabisApp:
         self.listening_start = None
         self.current_style = get_style_mode()
         self.openai_stt = None
+        self.pipeline = None
+        self.offline_queue = None
         self.mic_device = get_microphone()
 
+        # 연속 받아쓰기 모드 (핫키로 켜고 끄며, 발화가 끝날 때마다 처리)
+        self.dictation_mode = get_dictation_mode()
+        self.continuous_active = False
+        self._endpointing = False  # 캡처 스레드 전용
+        self.noise = NoiseFloorEstimator()
+        pre_roll = get_pre_roll_ms() / 1000
+        self.endpointer = Endpointer(SAMPLE_RATE, pre_roll=pre_roll, noise=self.noise)
+
+        # 핫키 누르기 직전 오디오 (캡처 스레드 전용) - 녹음 시작 시 앞에 붙임
+        self.pre_roll = PreRollBuffer(SAMPLE_RATE, pre_roll)
+        self._was_recording = False
+        self._pre_roll_samples = 0  # 녹음 버퍼 앞쪽의 프리롤 샘플 수
+        self.mic_id = None  # 열린 마이크 이름 (잡음 바닥 캘리브레이션 키)
+        self._saved_noise_floor = None
+        self.utterance_queue = queue.Queue()
+
+        # 장치 기본 레이트로 캡처 → 캡처 스레드에서 SAMPLE_RATE로 변환
+        self.capture_queue = queue.Queue()
+        self.resampler = StreamingResampler(SAMPLE_RATE, SAMPLE_RATE)
+        self.device_manager = AudioDeviceManager(
+            on_block=self.audio_callback,
+            on_open=self._on_stream_open,
+            on_error=self.ui.signals.update_status.emit
+        )
+        self.device_manager.refresh_async()  # 설정 창용 장치 목록 미리 캐시
+
+        # 선택 사항: 캡처를 자식 프로세스에서 실행하고 공유 메모리 링으로 받음
+        self.capture_process = None
+        self._ring_lock = threading.Lock()
+
         # 핫키 설정 로드
         self.hotkey_config = get_hotkey()
         self.mouse_listener = None
         self.keyboard_listener = None
-        self.pressed_modifiers = set()
+
+        # 미리보기 감시 - 입력 뒤 사용자가 직접 치거나 클릭하면 미리보기 상태를 버림
+        self._preview_guard = []
+        self._preview_quiet_until = 0.0  # 우리가 보낸 키 이벤트는 무시 (입력/교체 중 + 잠깐)
 
         # 스타일 변경 시그널 연결
         self.ui.signals.style_changed.connect(self.on_style_changed)
 
+        # 앱별 스타일 프로필 - 앱 전환 때 갱신되는 메모리 인덱스 (받아쓰기 때 osascript 없음)
+        self.app_profiles = AppProfileIndex(get_db(), on_change=self._on_app_switched)
+        self.app_profiles.start()
+
         # 설정 버튼 연결
         self.ui.settings_btn.mousePressEvent = lambda e: self.open_settings()
 
@@ -206,6 +267,34 @@ class ZzabisApp:
         # 핫키 리스너 시작
         self._start_hotkey_listener()
 
+        self._utterance_thread = None
+        if self.dictation_mode == "continuous":
+            self._start_utterance_worker()
+
+    def _start_utterance_worker(self):
+        """연속 모드 발화 처리 스레드 (한 번 시작하면 앱 종료까지 큐를 비움)"""
+        if self._utterance_thread is None:
+            self._utterance_thread = threading.Thread(target=self._utterance_worker, daemon=True)
+            self._utterance_thread.start()
+
+    def _on_dictation_mode_changed(self, mode: str):
+        """설정에서 녹음 방식 변경 - 재시작 없이 바로 적용"""
+        if mode == self.dictation_mode:
+            return
+        if mode == "continuous":
+            if self.is_recording:
+                # 누르고 있던 녹음은 마저 처리 (연속 모드에서는 뗌을 기다리지 않음)
+                self.is_recording = False
+                threading.Thread(target=self._process_recorded_audio, daemon=True).start()
+            self._start_utterance_worker()
+        elif self.continuous_active:
+            # 듣던 중이면 끔 - 말하던 발화는 오디오 스레드가 flush해서 워커가 마저 처리
+            self.continuous_active = False
+            self.ui.signals.set_listening.emit(False)
+        self.dictation_mode = mode
+        self.ui.signals.update_status.emit(self._idle_status())
+        print(f"녹음 방식 변경: {mode}")
+
     def _start_hotkey_listener(self):
         """핫키 리스너 시작"""
         hotkey_type = self.hotkey_config.get("type", "mouse")
@@ -216,13 +305,15 @@ class ZzabisApp:
             self.mouse_listener.start()
             print(f"마우스 핫키 리스너 시작: {self.hotkey_config.get('button', 'side')}")
         else:
-            # 키보드 리스너
-            self.keyboard_listener = keyboard.Listener(
-                on_press=self.on_key_press,
-                on_release=self.on_key_release
+            # 키보드 리스너 (핫키는 한 번 컴파일해서 이벤트마다 O(1) 판정)
+            self.keyboard_listener = HotkeyListener(
+                self.hotkey_config,
+                on_activate=self.on_hotkey_press,
+                on_deactivate=self.on_hotkey_release,
+                backend=get_hotkey_backend()
             )
             self.keyboard_listener.start()
-            print(f"키보드 핫키 리스너 시작: {self.hotkey_config.get('key', 'space')}")
+            print(f"키보드 핫키 리스너 시작: {self.hotkey_config.get('key', 'space')} ({self.keyboard_listener.backend_name})")
 
     def _get_hotkey_name(self) -> str:
         """현재 핫키 이름 반환"""
@@ -283,130 +374,28 @@ class ZzabisApp:
 
         return False
 
-    def _is_target_key(self, key) -> bool:
-        """설정된 키보드 키인지 확인"""
-        target_key = self.hotkey_config.get("key", "space")
-
-        # 키 매핑
-        key_mapping = {
-            "space": keyboard.Key.space,
-            "f1": keyboard.Key.f1,
-            "f2": keyboard.Key.f2,
-            "f3": keyboard.Key.f3,
-            "f4": keyboard.Key.f4,
-            "f5": keyboard.Key.f5,
-            "f6": keyboard.Key.f6,
-            "f7": keyboard.Key.f7,
-            "f8": keyboard.Key.f8,
-            "f9": keyboard.Key.f9,
-            "f10": keyboard.Key.f10,
-            "f11": keyboard.Key.f11,
-            "f12": keyboard.Key.f12,
-            "ctrl": keyboard.Key.ctrl_l,
-            "ctrl_l": keyboard.Key.ctrl_l,
-            "ctrl_r": keyboard.Key.ctrl_r,
-            "alt": keyboard.Key.alt_l,
-            "alt_l": keyboard.Key.alt_l,
-            "alt_r": keyboard.Key.alt_r,
-            "shift": keyboard.Key.shift_l,
-            "shift_l": keyboard.Key.shift_l,
-            "shift_r": keyboard.Key.shift_r,
-            "cmd": keyboard.Key.cmd_l,
-            "cmd_l": keyboard.Key.cmd_l,
-            "cmd_r": keyboard.Key.cmd_r,
-            "enter": keyboard.Key.enter,
-            "tab": keyboard.Key.tab,
-            "esc": keyboard.Key.esc,
-            "backspace": keyboard.Key.backspace,
-        }
-
-        expected_key = key_mapping.get(target_key)
-
-        if expected_key is not None:
-            # 특수 키 매핑에 있는 경우
-            if key == expected_key:
-                return True
-            # ctrl_l과 ctrl_r 모두 ctrl로 처리
-            if target_key in ["ctrl", "alt", "shift", "cmd"]:
-                alt_keys = {
-                    "ctrl": [keyboard.Key.ctrl_l, keyboard.Key.ctrl_r],
-                    "alt": [keyboard.Key.alt_l, keyboard.Key.alt_r],
-                    "shift": [keyboard.Key.shift_l, keyboard.Key.shift_r],
-                    "cmd": [keyboard.Key.cmd_l, keyboard.Key.cmd_r],
-                }
-                return key in alt_keys.get(target_key, [])
-            return False
+    def _idle_status(self) -> str:
+        """대기 상태 안내 문구"""
+        if self.continuous_active:
+            return f"연속 받아쓰기 중... ({self._get_hotkey_name()}으로 종료)"
+        return f"{self._get_hotkey_name()}으로 녹음"
 
-        # 일반 문자 키 (a-z, 0-9 등) 처리
-        try:
-            if hasattr(key, 'char') and key.char:
-                # 직접 비교
-                if key.char.lower() == target_key.lower():
-                    return True
-
-            # vk 코드로 확인 (Alt가 눌려있으면 특수문자로 변환됨)
-            if hasattr(key, 'vk') and key.vk is not None:
-                # macOS에서 z의 vk 코드는 6 (kVK_ANSI_Z)
-                vk_map = {
-                    'z': 6, 'a': 0, 's': 1, 'd': 2, 'f': 3, 'g': 5,
-                    'h': 4, 'j': 38, 'k': 40, 'l': 37, 'q': 12, 'w': 13,
-                    'e': 14, 'r': 15, 't': 17, 'y': 16, 'u': 32, 'i': 34,
-                    'o': 31, 'p': 35, 'x': 7, 'c': 8, 'v': 9, 'b': 11,
-                    'n': 45, 'm': 46
-                }
-                if len(target_key) == 1 and target_key.lower() in vk_map:
-                    if key.vk == vk_map[target_key.lower()]:
-                        return True
-        except Exception as e:
-            print(f"[DEBUG] key check error: {e}")
-
-        return False
-
-    def _track_modifier(self, key, pressed: bool):
-        """수정자 키 추적"""
-        modifier_map = {
-            keyboard.Key.ctrl_l: "ctrl",
-            keyboard.Key.ctrl_r: "ctrl",
-            keyboard.Key.alt_l: "alt",
-            keyboard.Key.alt_r: "alt",
-            keyboard.Key.shift_l: "shift",
-            keyboard.Key.shift_r: "shift",
-            keyboard.Key.cmd_l: "cmd",
-            keyboard.Key.cmd_r: "cmd",
-        }
-        mod = modifier_map.get(key)
-        if mod:
-            if pressed:
-                self.pressed_modifiers.add(mod)
-            else:
-                self.pressed_modifiers.discard(mod)
-
-    def _check_modifiers(self) -> bool:
-        """현재 수정자 조합이 설정과 일치하는지 확인"""
-        required_modifiers = set(self.hotkey_config.get("modifiers", []))
-        pressed = self.pressed_modifiers.copy()
-
-        # macOS에서 cmd와 ctrl을 동일하게 처리
-        if "ctrl" in required_modifiers and "cmd" in pressed:
-            pressed.discard("cmd")
-            pressed.add("ctrl")
-        if "cmd" in required_modifiers and "ctrl" in pressed:
-            pressed.discard("ctrl")
-            pressed.add("cmd")
-
-        return pressed == required_modifiers
-
-    def on_key_press(self, key):
-        """키보드 키 누름 - 녹음 시작"""
-        # 수정자 키 추적
-        self._track_modifier(key, True)
-
-        # 타겟 키인지 확인
-        if not self._is_target_key(key):
+    def _toggle_continuous(self):
+        """연속 받아쓰기 켜기/끄기"""
+        if self.openai_stt is None:
+            self.ui.signals.update_status.emit("초기화 중... 잠시만 기다려주세요")
             return
 
-        # 수정자 조합 확인
-        if not self._check_modifiers():
+        # 엔드포인터 정리는 오디오 스레드가 다음 블록에서 처리
+        self.continuous_active = not self.continuous_active
+        self.ui.signals.set_listening.emit(self.continuous_active)
+        self.ui.signals.update_status.emit(self._idle_status())
+        print(f"연속 받아쓰기 {'시작' if self.continuous_active else '종료'}! ({self._get_hotkey_name()})")
+
+    def on_hotkey_press(self):
+        """키보드 핫키 누름 - 녹음 시작"""
+        if self.dictation_mode == "continuous":
+            self._toggle_continuous()
             return
 
         if self.processing:
@@ -425,12 +414,9 @@ class ZzabisApp:
             self.ui.signals.update_status.emit("녹음 중... (키 떼면 인식)")
             print(f"녹음 시작! ({self._get_hotkey_name()})")
 
-    def on_key_release(self, key):
-        """키보드 키 뗌 - 녹음 종료"""
-        # 수정자 키 추적
-        self._track_modifier(key, False)
-
-        if not self._is_target_key(key):
+    def on_hotkey_release(self):
+        """키보드 핫키 뗌 - 녹음 종료"""
+        if self.dictation_mode == "continuous":
             return
 
         if self.is_recording and not self.processing:
@@ -443,6 +429,11 @@ class ZzabisApp:
         if not self._is_target_mouse_button(button):
             return
 
+        if self.dictation_mode == "continuous":
+            if pressed:
+                self._toggle_continuous()
+            return
+
         if self.processing:
             return
 
@@ -469,8 +460,13 @@ class ZzabisApp:
 
     def _process_recorded_audio(self):
         """녹음된 오디오 처리"""
+        # 콜백이 넘긴 블록이 모두 변환되어 버퍼에 들어갈 때까지 대기
+        if self.capture_process is not None:
+            self._poll_capture_ring()
+        self.capture_queue.join()
         if len(self.audio_buffer) > 0:
-            total_samples = sum(len(c) for c in self.audio_buffer)
+            # 최소 길이는 핫키를 누르고 있던 구간만으로 판단 (프리롤 제외)
+            total_samples = sum(len(c) for c in self.audio_buffer) - self._pre_roll_samples
             audio_length = total_samples / SAMPLE_RATE
 
             if audio_length >= MIN_AUDIO_LENGTH:
@@ -478,8 +474,8 @@ class ZzabisApp:
                 audio_data = self.audio_buffer.copy()
                 self.audio_buffer = []
                 threading.Thread(
-                    target=self.process_audio,
-                    args=(audio_data,),
+                    target=self._process_ptt_audio,
+                    args=(audio_data, time.perf_counter_ns()),
                     daemon=True
                 ).start()
             else:
@@ -491,19 +487,133 @@ class ZzabisApp:
             self.ui.signals.set_listening.emit(False)
             self.ui.signals.update_status.emit(f"{self._get_hotkey_name()}으로 녹음")
 
+    def _process_ptt_audio(self, audio_chunks, capture_end_ns):
+        """푸시투토크 녹음 - 앞뒤 무음을 잘라내고 처리 (음성이 없으면 업로드 생략)"""
+        trimmed = trim_silence(audio_chunks, self.endpointer.stop_threshold, SAMPLE_RATE)
+        if not trimmed:
+            print("음성이 감지되지 않아 업로드 생략")
+            self.ui.signals.set_listening.emit(False)
+            self.ui.signals.update_status.emit(self._idle_status())
+            return
+
+        if len(trimmed) < len(audio_chunks):
+            print(f"무음 제거: {len(audio_chunks)} → {len(trimmed)} 블록")
+        self.process_audio(trimmed, capture_end_ns)
+
     def on_style_changed(self, style_code: str):
-        """스타일 모드 변경 처리"""
+        """스타일 모드 변경 처리
+
+        기본 스타일을 바꾸고, 맨 앞 앱이 있으면 그 앱의 프로필로도 저장한다.
+        미리보기 중인 입력이 있으면 버튼은 바꿔 보기일 뿐이라 저장하지 않는다.
+        """
         from config import STYLE_MODES
-        self.current_style = style_code
         style_name = STYLE_MODES.get(style_code, style_code)
-        print(f"스타일 변경: {style_name}")
+        app = self.app_profiles.frontmost
+        if self.pipeline is not None and self.pipeline.last_transcript is not None:
+            print(f"스타일 미리보기: {style_name}")
+        elif app:
+            self.current_style = style_code
+            self.app_profiles.set_profile(app, style_code)
+            print(f"스타일 변경: {style_name} ({self.app_profiles.frontmost_name or app})")
+        else:
+            self.current_style = style_code
+            print(f"스타일 변경: {style_name}")
         self.ui.signals.update_console.emit(f"스타일: {style_name}")
 
+        # 미리보기 모드 - 확정 전 입력을 새 스타일로 바로 교체
+        if self.pipeline and self.pipeline.last_transcript is not None and not self.processing:
+            threading.Thread(target=self._restyle, args=(style_code,), daemon=True).start()
+
+    def _on_app_switched(self, bundle_id: str, profile):
+        """맨 앞 앱 변경 - 그 앱의 스타일을 버튼에 표시 (프로필이 없으면 기본 스타일)"""
+        if self.pipeline is not None:
+            self.pipeline.clear_preview()  # 다른 앱에서 지우면 안 됨
+        style = profile.style if profile else self.current_style
+        self.ui.signals.select_style.emit(style)
+
+    def _dictation_profile(self):
+        """이번 받아쓰기의 (스타일, 자동 엔터) - 메모리 인덱스 조회만"""
+        profile = self.app_profiles.resolve()
+        if profile is None:
+            return self.current_style, True
+        return profile.style, profile.auto_enter
+
+    def _restyle(self, style_code: str):
+        """마지막 입력을 다른 스타일로 교체 (캐시에 있으면 네트워크 없음)"""
+        replacing = []
+
+        def before_replace():
+            # 교체 키 입력은 사용자 입력이 아님 - 변환을 기다리는 동안의 사용자 입력은 그대로 감시
+            replacing.append(True)
+            self._preview_quiet_until = float("inf")
+            # 버튼 클릭으로 ZZABIS가 앞으로 왔을 수 있음 - 입력했던 앱을 다시 앞으로
+            app = self.app_profiles.frontmost
+            if app:
+                self.commands._run_applescript(f'tell application id "{app}" to activate')
+                time.sleep(PREVIEW_ACTIVATE_DELAY)
+
+        try:
+            transformed_text = self.pipeline.restyle(style_code, before_replace=before_replace)
+            if transformed_text is not None:
+                self.ui.signals.update_response.emit(transformed_text)
+        except Exception as e:
+            print(f"스타일 교체 오류: {e}")
+        finally:
+            if replacing:
+                self._preview_quiet_until = time.monotonic() + PREVIEW_QUIET_SECONDS
+
+    def _start_preview_guard(self):
+        """미리보기 감시 리스너 시작 (미리보기 모드일 때만)"""
+        from pynput import keyboard
+        self._preview_guard = [
+            keyboard.Listener(on_press=lambda key: self._on_user_activity()),
+            mouse.Listener(on_click=self._on_preview_click),
+        ]
+        for listener in self._preview_guard:
+            listener.start()
+
+    def _on_preview_click(self, x, y, button, pressed):
+        # ZZABIS 창(스타일 버튼) 클릭은 미리보기 조작
+        if pressed and not self.ui.frameGeometry().contains(int(x), int(y)):
+            self._on_user_activity()
+
+    def _on_user_activity(self):
+        """미리보기 입력 뒤 사용자가 직접 입력/클릭함 - 커서가 옮겨졌을 수 있어서 교체 중단"""
+        if self.pipeline is None or self.pipeline.last_transcript is None:
+            return
+        if time.monotonic() < self._preview_quiet_until:
+            return
+        self.pipeline.clear_preview()
+
     def load_model(self):
         """OpenAI Whisper API 초기화"""
         try:
             print("OpenAI Whisper 음성 인식 초기화 중...")
-            self.openai_stt = OpenAISpeechRecognizer()
+            # 사용자 어휘 - 인식 프롬프트 + 인식 후 로컬 교정
+            vocabulary = load_vocabulary(get_db())
+            if len(vocabulary):
+                print(f"사용자 어휘 {len(vocabulary)}개")
+            # 서킷이 열렸을 때 넘어갈 로컬 Whisper (설치돼 있고 모델을 내려받아 둔 경우만)
+            # 첫 폴백에서 모델을 불러오느라 발화 시간 제한을 넘기지 않게 미리 로딩
+            fallback = LocalSpeechRecognizer(vocabulary=vocabulary) if LocalSpeechRecognizer.available() else None
+            if fallback is not None:
+                fallback.warm()
+            self.openai_stt = OpenAISpeechRecognizer(fallback=fallback, vocabulary=vocabulary)
+            self.pipeline = DictationPipeline(
+                self.openai_stt, self.ai, self.commands,
+                sample_rate=SAMPLE_RATE,
+                language=self.language,
+                on_status=self.ui.signals.update_status.emit,
+                on_response=self.ui.signals.update_response.emit,
+                preview=get_style_preview(),
+                offline_queue=self._open_offline_queue(),
+                vocabulary=vocabulary
+            )
+            if self.pipeline.preview:
+                self._start_preview_guard()
+            if self.offline_queue is not None:
+                # 연결이 돌아오면 백그라운드에서 처리 (이전 실행에서 남은 녹음 포함)
+                self.offline_queue.start(self.pipeline.recover, self._on_offline_recovered)
             print("OpenAI Whisper 준비 완료!")
 
             hotkey_name = self._get_hotkey_name()
@@ -517,115 +627,233 @@ class ZzabisApp:
             print(f"초기화 실패: {e}")
             self.ui.signals.update_status.emit(f"오류: {e}")
 
-    def start_audio(self):
-        """오디오 스트림 시작 - Push-to-Talk"""
-        def audio_thread():
-            print("오디오 스트림 시작...")
-            try:
-                # 마이크 장치 설정
-                device = self.mic_device
-                print(f"마이크 장치: {device if device else '시스템 기본'}")
-
-                with sd.InputStream(
-                    samplerate=SAMPLE_RATE,
-                    channels=1,
-                    dtype=np.float32,
-                    callback=self.audio_callback,
-                    blocksize=int(SAMPLE_RATE * 0.1),
-                    device=device
-                ):
-                    print("오디오 스트림 준비 완료!")
-                    while self.running:
-                        time.sleep(0.1)
-            except Exception as e:
-                print(f"오디오 오류: {e}")
-                self.ui.signals.update_status.emit(f"마이크 오류: {e}")
+    def _open_offline_queue(self):
+        try:
+            self.offline_queue = OfflineQueue()
+            pending = self.offline_queue.pending()
+            if pending:
+                print(f"오프라인 대기열: 처리 안 된 녹음 {pending}개")
+        except Exception as e:
+            print(f"오프라인 대기열 열기 실패: {e}")
+            self.offline_queue = None
+        return self.offline_queue
+
+    def _on_offline_recovered(self, texts):
+        """대기열에서 나중에 처리된 받아쓰기 - 기록 + 클립보드 (포커스가 바뀌었으니 입력하지 않음)"""
+        import pyperclip
+        db = get_db()
+        for text in texts:
+            db.log_dictation(text, source="offline")
+        try:
+            pyperclip.copy("\n".join(texts))
+        except Exception as e:
+            print(f"클립보드 복사 오류: {e}")
+        self.ui.signals.update_response.emit(f"오프라인 받아쓰기 {len(texts)}개 → 클립보드에 복사됨")
 
-        threading.Thread(target=audio_thread, daemon=True).start()
+    def start_audio(self):
+        """오디오 스트림 시작 - Push-to-Talk
+
+        장치 관리자가 스트림을 열고, 연결이 끊기면 알아서 다시 연결한다.
+        """
+        print("오디오 스트림 시작...")
+        device = self.mic_device
+        print(f"마이크 장치: {device if device is not None else '시스템 기본'}")
+        threading.Thread(target=self._capture_worker, daemon=True).start()
+
+        if get_capture_process():
+            self.capture_process = CaptureProcess(
+                device,
+                on_open=self._on_stream_open,
+                on_error=self.ui.signals.update_status.emit
+            )
+            self.capture_process.start()
+            threading.Thread(target=self._ring_reader, daemon=True).start()
+        else:
+            self.device_manager.start(device)
+
+    def _ring_reader(self):
+        """캡처 프로세스 링을 주기적으로 읽어 캡처 큐로 넘김"""
+        while self.running:
+            self._poll_capture_ring()
+            time.sleep(RING_POLL_INTERVAL)
+
+    def _poll_capture_ring(self):
+        """링의 새 블록 처리 - 이미 16kHz로 변환되어 있음"""
+        with self._ring_lock:
+            for view, rms, peak in self.capture_process.read():
+                self.level_meter.write(rms, peak)
+                recording = self.is_recording and not self.processing
+                # 링 뷰는 한 바퀴 돌면 덮어써지고 캡처 스레드는 비동기로 읽으므로 블록마다 복사
+                # (녹음 중이 아니어도 프리롤/잡음 추정/연속 받아쓰기가 씀)
+                self.capture_queue.put((view.copy(), SAMPLE_RATE, rms, recording))
+
+    def _on_stream_open(self, device):
+        """새 입력 스트림이 열림 (시작, 마이크 전환, 재연결)"""
+        self._save_noise_calibration()
+        self._load_noise_calibration(device.name)
+        self.ui.signals.update_status.emit(self._idle_status())
+
+    def _on_microphone_changed(self, device):
+        """설정에서 마이크 변경 - 스트림 재시작 없이 전환 (UI 스레드를 막지 않도록 별도 스레드)"""
+        self.mic_device = device
+        if self.capture_process is not None:
+            self.capture_process.switch(device)
+        elif self.device_manager.running:
+            threading.Thread(target=self.device_manager.switch, args=(device,), daemon=True).start()
+
+    def _load_noise_calibration(self, mic_name):
+        """마이크별로 저장된 잡음 바닥으로 추정기 초기화"""
+        self.mic_id = mic_name or "default"
+        self._saved_noise_floor = None
+
+        cached = get_noise_floor(self.mic_id)
+        if cached:
+            self.noise.seed(cached)
+            self._saved_noise_floor = cached
+            print(f"잡음 바닥 캘리브레이션: {cached:.4f} ({self.mic_id})")
+
+    def _save_noise_calibration(self):
+        """잡음 바닥이 20% 이상 달라졌으면 마이크별로 저장 (오디오 스레드 밖에서 호출)"""
+        if self.mic_id is None:
+            return
+        floor = self.noise.floor
+        saved = self._saved_noise_floor
+        if saved and abs(floor - saved) <= saved * 0.2:
+            return
+        set_noise_floor(self.mic_id, floor)
+        self._saved_noise_floor = floor
 
     def get_audio_level(self, chunk):
-        return np.sqrt(np.mean(chunk ** 2))
+        return compute_levels(chunk)[0]
 
-    def audio_callback(self, indata, frames, time_info, status):
-        """오디오 콜백 - 스페이스 누르고 있을 때만 녹음"""
-        chunk = indata.copy().flatten()
-        level = self.get_audio_level(chunk)
+    def audio_callback(self, indata, samplerate):
+        """오디오 콜백 - 레벨만 기록하고 블록은 캡처 스레드로 넘김
 
-        # UI에 레벨 전달
-        self.ui.signals.update_level.emit(level)
+        실시간 스레드이므로 시그널을 매 블록 보내지 않는다. 레벨은 공유 슬롯에
+        기록만 하고 UI가 자기 프레임 주기로 읽어간다. 리샘플링과 VAD/버퍼링은
+        _capture_worker에서 한다.
+        """
+        samples = indata.reshape(-1)
 
-        # 스페이스 누르고 있을 때만 버퍼에 추가
-        if self.is_recording and not self.processing:
-            self.audio_buffer.append(chunk)
+        # UI에 레벨 전달 (락 없는 슬롯)
+        rms, peak = compute_levels(samples)
+        self.level_meter.write(rms, peak)
 
-            # 실시간 녹음 시간 표시
-            if self.listening_start:
-                elapsed = time.time() - self.listening_start
-                self.ui.signals.update_status.emit(f"녹음 중... {elapsed:.1f}초")
+        # 녹음 여부는 블록이 들어온 시점 기준으로 판정
+        recording = self.is_recording and not self.processing
+        self.capture_queue.put((samples.copy(), samplerate, rms, recording))
 
-    def process_audio(self, audio_chunks):
-        """음성 처리 - 타이핑 전용"""
+    def _capture_worker(self):
+        """캡처 스레드 - 장치 레이트 블록을 SAMPLE_RATE로 변환 후 녹음/발화 검출"""
+        while self.running:
+            try:
+                samples, samplerate, rms, recording = self.capture_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                if samplerate != self.resampler.in_rate:
+                    # 마이크 전환으로 장치 레이트가 바뀜
+                    self.resampler = StreamingResampler(samplerate, SAMPLE_RATE)
+                self._handle_block(self.resampler.process(samples), rms, recording)
+            except Exception as e:
+                print(f"캡처 처리 오류: {e}")
+            finally:
+                self.capture_queue.task_done()
+
+    def _handle_block(self, samples, rms, recording):
+        """변환된 블록 하나 처리 (캡처 스레드 전용)"""
+        # 연속 받아쓰기 - 발화가 끝나면 처리 큐로
+        if self.continuous_active:
+            self._endpointing = True
+            utterance = self.endpointer.process(samples, rms)
+            if utterance:
+                self.utterance_queue.put((utterance, time.perf_counter_ns()))
+            return
+        self.noise.update(rms)
+        if self._endpointing:
+            # 청취 종료 - 말하던 중이었으면 남은 발화도 처리
+            self._endpointing = False
+            utterance = self.endpointer.flush()
+            if utterance:
+                self.utterance_queue.put((utterance, time.perf_counter_ns()))
+
+        # 핫키 누르고 있을 때만 버퍼에 추가 - 누르기 직전 오디오는 프리롤로 보관
+        if not recording:
+            self._was_recording = False
+            self.pre_roll.push(samples)
+            return
+
+        if not self._was_recording:
+            # 녹음 시작 - 프리롤을 앞에 붙임 (무음이면 업로드 전에 trim_silence가 잘라냄)
+            self._was_recording = True
+            self.audio_buffer = self.pre_roll.drain()
+            self._pre_roll_samples = sum(len(c) for c in self.audio_buffer)
+        self.audio_buffer.append(samples)
+
+        # 실시간 녹음 시간 표시 (STATUS_INTERVAL 단위로 제한)
+        if self.listening_start:
+            now = time.time()
+            if now >= self._next_status_at:
+                self._next_status_at = now + STATUS_INTERVAL
+                self.ui.signals.update_status.emit(f"녹음 중... {now - self.listening_start:.1f}초")
+
+    def process_audio(self, audio_chunks, capture_end_ns=None):
+        """음성 처리 - 타이핑 전용
+
+        capture_end_ns: 녹음 종료 시각 (perf_counter_ns) - 지연 시간 트레이스 시작점
+        """
         self.processing = True
         self.ui.signals.set_processing.emit(True)
         self.ui.signals.update_status.emit("인식 중...")
 
+        self._preview_quiet_until = float("inf")
         try:
-            # 오디오 데이터 준비
-            audio = np.concatenate(audio_chunks)
-
-            # OpenAI Whisper 음성 인식
-            print("OpenAI Whisper 음성 인식 중...")
-            text = self.openai_stt.transcribe(audio, SAMPLE_RATE, self.language)
-
-            print(f"인식 결과: {text}")
-
-            if not text:
-                self.ui.signals.update_status.emit(f"{self._get_hotkey_name()}으로 녹음")
-                self.ui.signals.set_listening.emit(False)
-                return
-
-            # "엔터" 명령 처리
-            text_lower = text.lower().strip()
-            if "엔터" in text_lower and len(text_lower) < 10:
-                self.commands._press_key("enter")
-                self.ui.signals.update_response.emit("Enter ↵")
-                self.processing = False
-                self.ui.signals.set_listening.emit(False)
-                return
-
-            # 스타일 변환 후 타이핑 + 자동 엔터
-            self.ui.signals.update_status.emit("변환 중...")
-            transformed_text = self.ai.transform_style(text, self.current_style)
-
-            # UI에 변환된 텍스트 표시
-            self.ui.signals.update_response.emit(transformed_text)
-            print(f"  → 입력: {transformed_text}")
-
-            # 타이핑 + 엔터
-            self.commands._type_text(transformed_text)
-            time.sleep(0.1)
-            self.commands._press_key("enter")
-            print(f"  → 키 입력: enter")
-
-            self.ui.signals.update_status.emit(f"{self._get_hotkey_name()}으로 녹음")
+            style, auto_enter = self._dictation_profile()
+            self.pipeline.run(audio_chunks, style, capture_end_ns, auto_enter=auto_enter)
+            self.ui.signals.update_status.emit(self._idle_status())
 
         except Exception as e:
             print(f"처리 오류: {e}")
             self.ui.signals.update_response.emit("문제가 생겼어요")
             self.ui.signals.update_status.emit("오류 발생")
         finally:
+            self._preview_quiet_until = time.monotonic() + PREVIEW_QUIET_SECONDS
             self.processing = False
-            self.ui.signals.set_listening.emit(False)
+            self.ui.signals.set_listening.emit(self.continuous_active)
+            self._save_noise_calibration()
+
+    def _utterance_worker(self):
+        """연속 모드 발화 처리 - 끝난 순서대로 파이프라인 실행"""
+        while self.running:
+            try:
+                audio_chunks, end_ns = self.utterance_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            print(f"발화 감지: {sum(len(c) for c in audio_chunks) / SAMPLE_RATE:.2f}초")
+            self.process_audio(audio_chunks, end_ns)
 
     def open_settings(self):
         """설정 다이얼로그 열기"""
         if self.settings_dialog is None:
-            self.settings_dialog = SettingsDialog()
+            self.settings_dialog = SettingsDialog(device_manager=self.device_manager)
+            self.settings_dialog.microphone_changed.connect(self._on_microphone_changed)
+            self.settings_dialog.dictation_mode_changed.connect(self._on_dictation_mode_changed)
         self.settings_dialog.show()
         self.settings_dialog.activateWindow()
 
     def stop(self):
         self.running = False
+        self.device_manager.stop()
+        if self.capture_process is not None:
+            print(f"캡처 오버플로: {self.capture_process.overflows}회")
+            self.capture_process.stop()
+        self._save_noise_calibration()
+        if self.offline_queue is not None:
+            self.offline_queue.stop()
+        self.app_profiles.stop()
+        self.commands.stop()
+        for listener in self._preview_guard:
+            listener.stop()
         if self.mouse_listener:
             self.mouse_listener.stop()
         if self.keyboard_listener:
@@ -633,6 +861,9 @@ class ZzabisApp:
 
 
 def main():
+    # 패키징된 앱(PyInstaller)에서 spawn된 캡처 프로세스가 앱 전체를 다시 띄우지 않게
+    multiprocessing.freeze_support()
+
     print()
     print("=" * 50)
     print("  ZZABIS - 음성 타이핑 도우미")
@@ -0,0 +1,258 @@
+"""
+ZZABIS 오프라인 대기열 - 네트워크가 끊겼을 때 녹음을 디스크에 보관했다가 나중에 처리
+
+음성 인식 API에 닿을 수 없으면(ServiceUnavailable) 파이프라인은 녹음을 여기에
+넣고 바로 돌아온다. 오디오는 int16 차분 + zlib으로 압축해서 SQLite(WAL)에
+한 행씩 저장하므로 앱이 꺼져도 남는다. 백그라운드 스레드가 간격을 늘려 가며
+다시 시도하고, 연결이 돌아오면 오래된 것부터 처리해서 결과를 넘긴다
+(기록 저장 + 클립보드 복사는 호출하는 쪽). 그동안 받아쓰기는 막히지 않는다.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from resilience import ServiceUnavailable
+
+QUEUE_PATH = os.path.expanduser("~/.macvoice_offline.db")
+RETRY_SECONDS = 10.0  # 첫 재시도 간격
+MAX_RETRY_SECONDS = 120.0  # 재시도 간격 최대 (실패할 때마다 두 배)
+MAX_ATTEMPTS = 5  # 네트워크가 아닌 오류가 이만큼 반복되면 버림
+COMPRESS_LEVEL = 6
+
+
+def compress_audio(audio: np.ndarray) -> bytes:
+    """int16 오디오 → 차분 + zlib (무손실)
+
+    음성은 이웃 샘플끼리 비슷해서 차분 값이 작고, zlib이 원본보다 잘 줄인다.
+    int16 범위를 넘는 차분은 그대로 감싸지고(wrap) 복원할 때 다시 감싸져 돌아온다.
+    """
+    audio = np.ravel(audio)
+    if audio.dtype != np.int16:
+        audio = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+    delta = np.diff(audio, prepend=np.int16(0))
+    return zlib.compress(delta.astype('<i2', copy=False).tobytes(), COMPRESS_LEVEL)
+
+
+def decompress_audio(data: bytes) -> np.ndarray:
+    """compress_audio()의 역 - int16 오디오"""
+    delta = np.frombuffer(zlib.decompress(data), dtype='<i2')
+    return np.cumsum(delta, dtype=np.int16)
+
+
+class OfflineQueue:
+    """디스크에 남는 녹음 대기열
+
+    process: process(audio, sample_rate, language, style) -> str
+             연결이 아직 안 되면 ServiceUnavailable을 올린다
+    on_recovered: on_recovered([텍스트, ...]) - 한 번 비울 때마다 처리된 결과 (오래된 순)
+    """
+
+    def __init__(self, path: str = QUEUE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.process = None
+        self.on_recovered = None
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock:
+            # WAL - 쓰기 중 앱이 죽어도 이전 행은 그대로
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS pending_dictations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    audio BLOB NOT NULL,
+                    sample_rate INTEGER NOT NULL,
+                    language TEXT NOT NULL,
+                    style TEXT NOT NULL,
+                    attempts INTEGER DEFAULT 0,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self.conn.commit()
+
+    def put(self, audio: np.ndarray, sample_rate: int, language: str, style: str) -> int:
+        """녹음 저장 (압축 + 커밋까지, 네트워크 없음)
+
+        Returns:
+            대기 중인 녹음 수
+        """
+        data = compress_audio(audio)
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO pending_dictations (audio, sample_rate, language, style, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (data, sample_rate, language, style, time.time()))
+            self.conn.commit()
+        self._wake.set()
+        return self.pending()
+
+    def pending(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pending_dictations").fetchone()[0]
+
+    def _oldest(self) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT * FROM pending_dictations ORDER BY id LIMIT 1"
+            ).fetchone()
+
+    def _delete(self, clip_id: int):
+        with self._lock:
+            self.conn.execute("DELETE FROM pending_dictations WHERE id = ?", (clip_id,))
+            self.conn.commit()
+
+    def _record_attempt(self, clip_id: int) -> int:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE pending_dictations SET attempts = attempts + 1 WHERE id = ?", (clip_id,)
+            )
+            self.conn.commit()
+            return self.conn.execute(
+                "SELECT attempts FROM pending_dictations WHERE id = ?", (clip_id,)
+            ).fetchone()[0]
+
+    def drain(self) -> List[str]:
+        """대기 중인 녹음을 오래된 순으로 처리
+
+        Returns:
+            처리된 텍스트 (빈 결과 제외)
+
+        Raises:
+            ServiceUnavailable: 아직 연결이 안 됨 (처리된 것은 on_recovered로 먼저 넘김)
+        """
+        texts = []
+        try:
+            while True:
+                clip = self._oldest()
+                if clip is None:
+                    break
+                try:
+                    text = self.process(decompress_audio(clip["audio"]), clip["sample_rate"],
+                                        clip["language"], clip["style"])
+                except ServiceUnavailable:
+                    raise
+                except Exception as e:
+                    # 네트워크가 아닌 오류 - 몇 번까지만 다시 시도하고 버림 (대기열이 막히지 않게)
+                    attempts = self._record_attempt(clip["id"])
+                    print(f"대기열 녹음 처리 오류 ({attempts}/{MAX_ATTEMPTS}): {e}")
+                    if attempts < MAX_ATTEMPTS:
+                        break
+                    text = ""
+                self._delete(clip["id"])
+                if text:
+                    texts.append(text)
+        finally:
+            if texts and self.on_recovered:
+                self.on_recovered(texts)
+        return texts
+
+    def start(self, process: Callable, on_recovered: Callable = None):
+        """백그라운드 재시도 시작 (이전 실행에서 남은 녹음도 처리)"""
+        self.process = process
+        self.on_recovered = on_recovered
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._drain_loop, daemon=True)
+            self._thread.start()
+
+    def _drain_loop(self):
+        delay = RETRY_SECONDS
+        while not self._stop.is_set():
+            if not self.pending():
+                # 비어 있으면 put()까지 대기
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            if self._stop.wait(delay):
+                break
+            try:
+                texts = self.drain()
+                if texts:
+                    print(f"오프라인 대기열 처리: {len(texts)}개")
+                delay = RETRY_SECONDS
+            except ServiceUnavailable:
+                delay = min(delay * 2, MAX_RETRY_SECONDS)
+            except Exception as e:
+                print(f"오프라인 대기열 오류: {e}")
+                delay = min(delay * 2, MAX_RETRY_SECONDS)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self.conn.close()
+
+
+def benchmark(utterances: int = 6, seconds: float = 8.0, sample_rate: int = 16000):
+    """압축률/저장 시간, 네트워크 장애 중 받아쓰기 → 복구 후 비우기"""
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    # 음성 비슷한 신호 - 음절 단위로 켜졌다 꺼지는 배음 + 약한 잡음
+    envelope = np.clip(np.sin(2 * np.pi * 3 * t), 0, None) ** 2
+    voice = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 8))
+    audio = np.clip(0.25 * envelope * voice + 0.01 * rng.standard_normal(len(t)), -1, 1)
+    audio = (audio * 32767).astype(np.int16)
+
+    raw = audio.nbytes
+    plain = len(zlib.compress(audio.tobytes(), COMPRESS_LEVEL))
+    start = time.perf_counter()
+    packed = compress_audio(audio)
+    compress_ms = (time.perf_counter() - start) * 1000
+    assert np.array_equal(decompress_audio(packed), audio), "복원 결과가 원본과 다름"
+    print(f"{seconds:.0f}초 녹음 {raw / 1e3:.0f} KB → zlib {plain / 1e3:.0f} KB, "
+          f"차분+zlib {len(packed) / 1e3:.0f} KB ({raw / len(packed):.1f}배, {compress_ms:.1f}ms)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        queue = OfflineQueue(os.path.join(directory, "queue.db"))
+        state = {"down": True, "calls": 0}
+
+        def process(clip, sr, language, style):
+            state["calls"] += 1
+            if state["down"]:
+                raise ServiceUnavailable("bench")
+            time.sleep(0.05)  # 복구 후 인식 지연
+            return f"{style}:{len(clip) / sr:.1f}초"
+
+        queue.process = process
+        times = []
+        for i in range(utterances):
+            start = time.perf_counter()
+            try:
+                process(audio, sample_rate, "ko", "casual")
+            except ServiceUnavailable:
+                queue.put(audio, sample_rate, "ko", "casual")
+            times.append((time.perf_counter() - start) * 1000)
+        times.sort()
+        print(f"장애 중 받아쓰기 {utterances}회: 대기열 저장 p50 {times[len(times) // 2]:.1f}ms, "
+              f"최대 {times[-1]:.1f}ms, 대기 {queue.pending()}개")
+
+        # 앱 재시작 - 새 연결에서도 그대로 남아 있어야 한다
+        queue.close()
+        queue = OfflineQueue(os.path.join(directory, "queue.db"))
+        queue.process = process
+        state["down"] = False
+        start = time.perf_counter()
+        texts = queue.drain()
+        print(f"재시작 후 대기 {len(texts)}개 복원, 비우기 {(time.perf_counter() - start) * 1000:.0f}ms, "
+              f"남은 녹음 {queue.pending()}개")
+        queue.close()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,244 @@
+"""
+ZZABIS 받아쓰기 파이프라인 - 녹음된 오디오 → 음성 인식 → 스타일 변환 → 입력
+
+UI/Qt에 의존하지 않아서 ZzabisApp과 오프라인 벤치마크(benchmark.py)가
+같은 로직을 사용한다. 인식기/에이전트/입력기는 주입받는다.
+"""
+
+import threading
+import time
+import numpy as np
+
+from long_audio import ChunkedTranscriber
+from resilience import ServiceUnavailable, deadline_scope, utterance_budget
+from tracing import tracer
+
+# 붙여넣기 후 엔터까지 대기 시간 (초)
+ENTER_DELAY = 0.1
+
+
+class DictationPipeline:
+    """받아쓰기 1회 처리
+
+    stt: transcribe(audio, sample_rate, language) -> str
+         (streaming이 참이면 transcribe_stream()으로 부분 결과를 받음)
+    ai: transform_style(text, style) -> str
+        (speculative(style)이 있으면 스트리밍 중 확정된 문장부터 미리 변환)
+    commands: _type_text(text), _press_key(key), _replace_typed(old, new)
+
+    preview가 참이면 자동 엔터 대신 마지막 인식 결과를 기억하고 모든 스타일
+    변환을 미리 받아 둔다 (ai.preview_styles). restyle()로 입력된 텍스트를
+    다른 스타일로 바로 바꾸고, "엔터"라고 말하면 확정한다.
+
+    offline_queue가 있으면 음성 인식 API에 닿을 수 없을 때 녹음을 거기에 넣고
+    바로 돌아온다. 연결이 돌아오면 대기열이 recover()로 처리한다.
+
+    vocabulary가 있으면 인식 결과의 제품명/이름 오인식을 로컬에서 바로 고친다.
+    """
+
+    def __init__(self, stt, ai, commands, sample_rate: int = 16000, language: str = "ko",
+                 on_status=None, on_response=None, enter_delay: float = ENTER_DELAY,
+                 preview: bool = False, offline_queue=None, vocabulary=None):
+        self.stt = stt
+        self.ai = ai
+        self.commands = commands
+        self.sample_rate = sample_rate
+        self.language = language
+        self.on_status = on_status or (lambda text: None)
+        self.on_response = on_response or (lambda text: None)
+        self.enter_delay = enter_delay
+        self.preview = preview
+        self.offline_queue = offline_queue
+        self.vocabulary = vocabulary
+        # 긴 받아쓰기는 무음 경계에서 나눠 병렬로 인식
+        self.long_audio = ChunkedTranscriber(stt)
+
+        # 미리보기 상태 - 확정 전 마지막 인식 결과와 실제로 입력된 텍스트
+        self.last_transcript = None
+        self.last_typed = None
+        self._preview_lock = threading.Lock()
+        self._preview_thread = None
+
+    def run(self, audio_chunks, style: str, capture_end_ns=None, auto_enter: bool = True) -> str:
+        """
+        오디오 청크 처리
+
+        Args:
+            audio_chunks: 녹음된 오디오 블록 리스트 (int16, 캡처 형식 그대로)
+            style: 스타일 모드 코드
+            capture_end_ns: 녹음 종료 시각 (perf_counter_ns) - 트레이스 시작점
+            auto_enter: 입력 후 엔터 (앱 프로필에서 끌 수 있음)
+
+        Returns:
+            결과 ("typed", "enter", "empty", "queued", "error")
+        """
+        tracer.begin("dictation", start_ns=capture_end_ns)
+        outcome = "error"
+        try:
+            # 오디오 데이터 준비
+            with tracer.span("concatenate"):
+                audio = np.concatenate(audio_chunks)
+
+            # 받아쓰기 마감 시간 - STT/LLM 호출과 재시도가 이 안에서 끝나야 한다
+            with deadline_scope(utterance_budget(len(audio) / self.sample_rate)):
+                # 음성 인식
+                print("OpenAI Whisper 음성 인식 중...")
+                speculative = None
+                try:
+                    if self.long_audio.is_long(audio, self.sample_rate):
+                        text = self.long_audio.transcribe(audio, self.sample_rate, self.language)
+                    elif getattr(self.stt, "streaming", False) and hasattr(self.ai, "speculative"):
+                        speculative = self.ai.speculative(style)
+                        text = ""
+                        for partial in self.stt.transcribe_stream(audio, self.sample_rate, self.language):
+                            text = partial
+                            speculative.update(self._correct(partial))
+                    else:
+                        text = self.stt.transcribe(audio, self.sample_rate, self.language)
+                except ServiceUnavailable as e:
+                    if speculative:
+                        speculative.cancel()
+                    if self.offline_queue is None:
+                        raise
+                    # 네트워크 장애 - 녹음은 디스크에 두고 바로 다음 받아쓰기로
+                    print(f"음성 인식 불가 ({e}) - 오프라인 대기열에 저장")
+                    with tracer.span("offline_queue"):
+                        pending = self.offline_queue.put(audio, self.sample_rate, self.language, style)
+                    self.on_response(f"오프라인 - 연결되면 처리해요 (대기 {pending}개)")
+                    outcome = "queued"
+                    return outcome
+
+                with tracer.span("vocabulary"):
+                    text = self._correct(text)
+                print(f"인식 결과: {text}")
+
+                if not text:
+                    if speculative:
+                        speculative.cancel()
+                    outcome = "empty"
+                    return outcome
+
+                # "엔터" 명령 처리
+                text_lower = text.lower().strip()
+                if "엔터" in text_lower and len(text_lower) < 10:
+                    if speculative:
+                        speculative.cancel()
+                    self.commands._press_key("enter")
+                    self.on_response("Enter ↵")
+                    self.clear_preview()
+                    outcome = "enter"
+                    return outcome
+
+                # 스타일 변환 후 타이핑 + 자동 엔터
+                self.on_status("변환 중...")
+                if speculative:
+                    transformed_text = speculative.finish(text)
+                else:
+                    transformed_text = self.ai.transform_style(text, style)
+
+                # UI에 변환된 텍스트 표시
+                self.on_response(transformed_text)
+                print(f"  → 입력: {transformed_text}")
+
+                if self.preview:
+                    # 미리보기 - 엔터 없이 입력만 하고 나머지 스타일을 백그라운드로 준비
+                    self.commands._type_text(transformed_text)
+                    with self._preview_lock:
+                        self.last_transcript = text
+                        self.last_typed = transformed_text
+                    self._start_preview(text)
+                    outcome = "typed"
+                    return outcome
+
+                # 타이핑 + 엔터
+                self.commands._type_text(transformed_text)
+                if auto_enter:
+                    time.sleep(self.enter_delay)
+                    self.commands._press_key("enter")
+                    print("  → 키 입력: enter")
+                outcome = "typed"
+                return outcome
+        finally:
+            tracer.end(outcome=outcome, style=style)
+
+    def recover(self, audio: np.ndarray, sample_rate: int, language: str, style: str) -> str:
+        """
+        오프라인 대기열의 녹음 처리 - 인식 + 스타일 변환만 (입력하지 않음)
+
+        Raises:
+            ServiceUnavailable: 아직 연결이 안 됨 (대기열에 그대로 남음)
+        """
+        tracer.begin("recover")
+        outcome = "error"
+        try:
+            with deadline_scope(utterance_budget(len(audio) / sample_rate)):
+                if self.long_audio.is_long(audio, sample_rate):
+                    text = self.long_audio.transcribe(audio, sample_rate, language)
+                else:
+                    text = self.stt.transcribe(audio, sample_rate, language)
+                text = self._correct(text)
+                if not text:
+                    outcome = "empty"
+                    return ""
+                transformed_text = self.ai.transform_style(text, style)
+            outcome = "recovered"
+            return transformed_text
+        finally:
+            tracer.end(outcome=outcome, style=style)
+
+    def _correct(self, text: str) -> str:
+        """사용자 어휘 교정 (어휘가 없으면 그대로)"""
+        if self.vocabulary is None:
+            return text
+        return self.vocabulary.correct(text)
+
+    def _start_preview(self, text: str):
+        if not hasattr(self.ai, "preview_styles"):
+            return
+        self._preview_thread = threading.Thread(target=self.ai.preview_styles, args=(text,), daemon=True)
+        self._preview_thread.start()
+
+    def wait_preview(self, timeout=None):
+        """백그라운드 미리보기 요청이 끝날 때까지 대기 (벤치마크용)"""
+        if self._preview_thread is not None:
+            self._preview_thread.join(timeout)
+
+    def clear_preview(self):
+        """미리보기 상태 버리기 - 앱 전환/사용자 입력 뒤에는 마지막 입력을 지울 수 없음"""
+        with self._preview_lock:
+            self.last_transcript = None
+            self.last_typed = None
+
+    def restyle(self, style: str, before_replace=None):
+        """
+        마지막 입력을 다른 스타일로 교체 (미리보기 캐시에 있으면 네트워크 없음)
+
+        before_replace: 키 입력으로 교체하기 직전에 부름 (입력하던 앱을 다시 앞으로 등)
+
+        Returns:
+            새로 입력된 텍스트 (바꿀 입력이 없거나 변환 중에 새 입력이 있었으면 None)
+        """
+        with self._preview_lock:
+            text = self.last_transcript
+            typed = self.last_typed
+        if text is None:
+            return None
+        tracer.begin("restyle")
+        outcome = "error"
+        try:
+            # 캐시에 없으면 네트워크 요청 - 잠금 없이 (새 받아쓰기/앱 전환이 기다리지 않게)
+            transformed_text = self.ai.transform_style(text, style)
+            with self._preview_lock:
+                if self.last_transcript is not text or self.last_typed != typed:
+                    # 그사이 새로 입력했거나 미리보기가 버려짐 - 지금 화면의 글은 건드리지 않음
+                    outcome = "stale"
+                    return None
+                if transformed_text != typed:
+                    if before_replace is not None:
+                        before_replace()
+                    self.commands._replace_typed(typed, transformed_text)
+                    self.last_typed = transformed_text
+            outcome = "typed"
+            return transformed_text
+        finally:
+            tracer.end(outcome=outcome, style=style)
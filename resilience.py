@@ -0,0 +1,324 @@
+"""
+ZZABIS 외부 호출 안정성 - 발화 단위 마감 시간, 지터 재시도, 서킷 브레이커
+
+SDK 기본값(요청당 10분 타임아웃 + 자동 재시도 2회)이면 서버가 느려질 때 받아쓰기
+한 번이 수십 초씩 멈춘다. 받아쓰기마다 마감 시간(Deadline)을 잡고, 각 호출은
+남은 시간 안에서만 타임아웃/재시도한다. 재시도 간격은 full jitter 지수 백오프.
+같은 제공자에서 연속으로 실패하면 서킷 브레이커가 열려 한동안 바로 실패하고,
+호출하는 쪽은 로컬 엔진으로 넘기거나(STT) 스타일 변환을 건너뛴다(LLM).
+
+스레드 풀로 넘기는 작업은 bind()로 감싸면 같은 마감 시간을 이어받는다.
+폴백도 없이 제공자에 닿을 수 없으면 인식기는 ServiceUnavailable을 올리고,
+파이프라인은 녹음을 오프라인 대기열(offline_queue.py)에 넣는다.
+"""
+
+import contextlib
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+UTTERANCE_SECONDS = 15.0  # 받아쓰기 한 번의 기본 마감 시간
+PER_AUDIO_SECOND = 0.2  # 오디오 1초당 추가 시간 (긴 받아쓰기)
+MIN_ATTEMPT_SECONDS = 0.3  # 남은 시간이 이보다 적으면 시도하지 않음
+
+_local = threading.local()
+
+
+class DeadlineExceeded(Exception):
+    """마감 시간 안에 호출을 마칠 수 없음"""
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 호출하지 않음"""
+
+
+class ServiceUnavailable(Exception):
+    """제공자에 닿을 수 없음 (네트워크/서킷) - 호출하는 쪽이 나중에 다시 시도할 수 있다"""
+
+
+class Deadline:
+    """절대 마감 시각"""
+
+    __slots__ = ("expires",)
+
+    def __init__(self, seconds: float):
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+
+def utterance_budget(audio_seconds: float) -> float:
+    """받아쓰기 마감 시간 (초)"""
+    return UTTERANCE_SECONDS + PER_AUDIO_SECOND * audio_seconds
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: float):
+    """현재 스레드의 마감 시간 설정
+
+    with deadline_scope(utterance_budget(audio_seconds)):
+        ...
+    """
+    previous = getattr(_local, "deadline", None)
+    _local.deadline = Deadline(seconds)
+    try:
+        yield _local.deadline
+    finally:
+        _local.deadline = previous
+
+
+def current_deadline() -> Optional[Deadline]:
+    return getattr(_local, "deadline", None)
+
+
+def bind(fn: Callable) -> Callable:
+    """현재 마감 시간을 다른 스레드(풀 작업)에서도 쓰도록 감쌈"""
+    deadline = current_deadline()
+    if deadline is None:
+        return fn
+
+    def bound(*args, **kwargs):
+        previous = getattr(_local, "deadline", None)
+        _local.deadline = deadline
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.deadline = previous
+    return bound
+
+
+def is_retryable(error: BaseException) -> bool:
+    """일시적 오류인지 (타임아웃, 연결 오류, 429, 5xx)
+
+    openai 예외(status_code)와 urllib 예외(code, reason) 모두 이름/속성으로 판단해서
+    이 모듈은 SDK를 import하지 않는다.
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(error, "code", None)
+    if isinstance(status, int):
+        return status in (408, 409, 429) or status >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    reason = getattr(error, "reason", None)
+    if isinstance(reason, BaseException):
+        return is_retryable(reason)
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+class CircuitBreaker:
+    """연속 실패 시 열리는 서킷 브레이커
+
+    closed: 정상 호출. 일시적 오류가 failure_threshold번 연속이면 open.
+    open: reset_timeout 동안 호출하지 않음 (allow()가 False).
+    half_open: 그 뒤 한 번만 시험 호출 - 성공하면 closed, 실패하면 다시 open.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False  # half_open 시험 호출 진행 중
+        self.trips = 0  # 열린 횟수
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                print(f"{self.name} 서킷 닫힘 (복구)")
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or (self._opened_at is None and self._failures >= self.failure_threshold):
+                if self._opened_at is None:
+                    self.trips += 1
+                    print(f"{self.name} 서킷 열림 ({self._failures}회 연속 실패)")
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+
+def call_with_retry(fn: Callable[[float], object], breaker: Optional[CircuitBreaker] = None,
+                    timeout: float = 10.0, attempts: int = 3, base_delay: float = 0.25,
+                    max_delay: float = 2.0, deadline: Optional[Deadline] = None, rng=random):
+    """
+    마감 시간 안에서 재시도하며 호출
+
+    Args:
+        fn: fn(timeout) - 이번 시도에 쓸 타임아웃(초)을 받아 요청
+        breaker: 서킷 브레이커 (열려 있으면 CircuitOpenError)
+        timeout: 시도당 최대 타임아웃 (남은 마감 시간이 더 짧으면 그만큼)
+        attempts: 최대 시도 횟수
+        deadline: 없으면 현재 스레드의 마감 시간 (그것도 없으면 시도당 timeout만)
+
+    Raises:
+        CircuitOpenError, DeadlineExceeded, 또는 마지막 오류
+    """
+    deadline = deadline or current_deadline()
+    last_error = None
+    for attempt in range(attempts):
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(breaker.name)
+        remaining = deadline.remaining() if deadline else timeout
+        if remaining < MIN_ATTEMPT_SECONDS:
+            break
+        try:
+            result = fn(min(timeout, remaining))
+        except Exception as e:
+            if not is_retryable(e):
+                # 서버는 응답함 (인증/요청 오류) - 브레이커는 정상으로 본다
+                if breaker is not None:
+                    breaker.record_success()
+                raise
+            if breaker is not None:
+                breaker.record_failure()
+            last_error = e
+            if attempt == attempts - 1:
+                break
+            delay = rng.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if deadline and deadline.remaining() - delay < MIN_ATTEMPT_SECONDS:
+                break
+            time.sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+    if last_error is None:
+        raise DeadlineExceeded("마감 시간 초과")
+    raise last_error
+
+
+class _FaultyServer:
+    """장애 주입 로컬 HTTP 서버 (벤치마크용)
+
+    mode: "ok" (latency초 후 200), "flaky" (error_rate 확률로 500),
+          "hang" (hang초 동안 응답 없음), "down" (연결 직후 끊음)
+    """
+
+    def __init__(self, latency: float = 0.2, error_rate: float = 0.3, hang: float = 8.0, seed: int = 0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.mode = "ok"
+        self.latency = latency
+        self.error_rate = error_rate
+        self.hang = hang
+        self.random = random.Random(seed)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                mode = server.mode
+                if mode == "down":
+                    self.connection.close()
+                    return
+                if mode == "hang":
+                    time.sleep(server.hang)
+                time.sleep(server.latency)
+                if mode == "flaky" and server.random.random() < server.error_rate:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def benchmark(utterances: int = 12, budget: float = 3.0):
+    """장애 상황별 받아쓰기 한 번의 지연/성공률 (정책 없음 vs 마감+재시도+브레이커)
+
+    "정책 없음"은 SDK 기본처럼 긴 타임아웃 + 지연 없는 재시도 2회.
+    실패하면 폴백(로컬 엔진/변환 생략)으로 넘어간다고 보고, 폴백까지 걸린 시간을 잰다.
+    """
+    import io
+    import urllib.request
+
+    server = _FaultyServer()
+
+    def request(timeout):
+        with urllib.request.urlopen(server.url, timeout=timeout) as response:
+            return response.read()
+
+    def baseline():
+        for attempt in range(3):
+            try:
+                return request(30.0)
+            except Exception as e:
+                if attempt == 2 or not is_retryable(e):
+                    raise
+
+    print(f"받아쓰기 {utterances}회, 마감 {budget:.1f}초, 정상 응답 {server.latency * 1000:.0f}ms")
+    print(f"{'장애':<8}{'정책':<10}{'p50':>9}{'최대':>9}{'성공':>7}{'폴백':>6}{'서킷':>6}")
+    for mode in ("ok", "flaky", "hang", "down"):
+        server.mode = mode
+        for label in ("없음", "마감+재시도"):
+            if label == "없음" and mode == "hang":
+                utterance_count = 2  # 한 번에 수십 초 - 횟수를 줄여서 잰다
+            else:
+                utterance_count = utterances
+            breaker = CircuitBreaker(f"bench-{mode}", failure_threshold=3, reset_timeout=60.0)
+            times, ok, fallback = [], 0, 0
+            for _ in range(utterance_count):
+                start = time.perf_counter()
+                try:
+                    if label == "없음":
+                        baseline()
+                    else:
+                        # 서킷 열림/닫힘 로그는 표에 섞이지 않게 숨김
+                        with deadline_scope(budget), contextlib.redirect_stdout(io.StringIO()):
+                            call_with_retry(request, breaker=breaker, timeout=1.0)
+                    ok += 1
+                except Exception:
+                    fallback += 1
+                times.append(time.perf_counter() - start)
+            times.sort()
+            trips = breaker.trips if label != "없음" else 0
+            print(f"{mode:<8}{label:<10}{times[len(times) // 2] * 1000:>7.0f}ms{times[-1] * 1000:>7.0f}ms"
+                  f"{ok:>6}/{utterance_count}{fallback:>6}{trips:>6}")
+    server.close()
+
+
+if __name__ == "__main__":
+    benchmark()
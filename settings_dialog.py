@@ -12,9 +12,11 @@ from PyQt6.QtGui import QKeyEvent
 from config import (
     get_microphone, set_microphone, get_screen, set_screen,
     get_hotkey, set_hotkey, get_style_mode, set_style_mode, STYLE_MODES,
-    get_openai_api_key, set_openai_api_key
+    get_openai_api_key, set_openai_api_key, get_dictation_mode, set_dictation_mode
 )
-import sounddevice as sd
+from audio_devices import AudioDeviceManager
+from tracing import tracer
+from prompts import prompt_stats
 
 
 class SettingsDialog(QDialog):
@@ -24,12 +26,17 @@ class SettingsDialog(QDialog):
     microphone_changed = pyqtSignal(object)
     screen_changed = pyqtSignal(int)
     hotkey_changed = pyqtSignal(dict)
+    dictation_mode_changed = pyqtSignal(str)
+    devices_loaded = pyqtSignal(list)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, device_manager=None):
         super().__init__(parent)
+        # 장치 목록은 관리자 캐시에서 읽고, 조회는 백그라운드 스레드에서
+        self.device_manager = device_manager or AudioDeviceManager()
+        self.devices_loaded.connect(self._populate_microphones)
         self.setWindowTitle("ZZABIS 설정")
         self.setMinimumSize(420, 580)
-        self.setMaximumSize(500, 700)
+        self.setMaximumSize(500, 820)
         self.setWindowFlags(Qt.WindowType.WindowStaysOnTopHint)
 
         self.is_capturing = False
@@ -141,6 +148,14 @@ class SettingsDialog(QDialog):
         hotkey_btns.addWidget(self.mouse_btn)
 
         hotkey_section.addLayout(hotkey_btns)
+
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("누르고 있는 동안 녹음", "push_to_talk")
+        self.mode_combo.addItem("연속 받아쓰기 (핫키로 켜기/끄기)", "continuous")
+        if get_dictation_mode() == "continuous":
+            self.mode_combo.setCurrentIndex(1)
+        self.mode_combo.currentIndexChanged.connect(self._on_mode_changed)
+        hotkey_section.addWidget(self.mode_combo)
         layout.addLayout(hotkey_section)
 
         # === 마이크 설정 ===
@@ -227,6 +242,21 @@ class SettingsDialog(QDialog):
         api_section.addWidget(api_hint)
         layout.addLayout(api_section)
 
+        # === 지연 시간 통계 ===
+        latency_section = self._create_section("지연 시간 (p50 / p95)")
+        self.latency_label = QLabel()
+        self.latency_label.setStyleSheet("""
+            color: #b0b0c0;
+            font-size: 11px;
+            font-family: 'Menlo', 'Monaco', monospace;
+            padding: 8px 10px;
+            background: #252540;
+            border-radius: 6px;
+        """)
+        latency_section.addWidget(self.latency_label)
+        layout.addLayout(latency_section)
+        self._refresh_latency()
+
         # 스페이서
         layout.addStretch()
 
@@ -250,6 +280,30 @@ class SettingsDialog(QDialog):
         close_btn.clicked.connect(self.close)
         layout.addWidget(close_btn)
 
+    def showEvent(self, event):
+        """다이얼로그 열 때마다 최신 지연 시간 통계/장치 목록 반영"""
+        self._refresh_latency()
+        self.device_manager.refresh_async(self.devices_loaded.emit)
+        super().showEvent(event)
+
+    def _refresh_latency(self):
+        """최근 받아쓰기 트레이스의 단계별 p50/p95 표시"""
+        rows = tracer.percentiles()
+        if not rows:
+            self.latency_label.setText("아직 기록 없음")
+            return
+
+        lines = [
+            f"{stage:<14}{p50:>8.0f} / {p95:>6.0f} ms"
+            for stage, p50, p95, _count in rows
+        ]
+        lines.append(f"(최근 {rows[-1][3]}회)")
+
+        cache_rows = prompt_stats.rows()
+        if cache_rows:
+            lines.append("프롬프트 캐시: " + ", ".join(f"{style} {ratio:.0%}" for style, _n, ratio in cache_rows))
+        self.latency_label.setText("\n".join(lines))
+
     def _create_section(self, title: str) -> QVBoxLayout:
         """섹션 레이아웃 생성"""
         section = QVBoxLayout()
@@ -265,19 +319,27 @@ class SettingsDialog(QDialog):
         return section
 
     def _load_microphones(self):
-        """마이크 목록 로드"""
-        self.mic_combo.clear()
-        self.mic_combo.addItem("시스템 기본 마이크", None)
+        """마이크 목록 로드 - 캐시가 없으면 백그라운드 조회 후 채움"""
+        devices = self.device_manager.cached_devices()
+        if devices is None:
+            self.mic_combo.clear()
+            self.mic_combo.addItem("시스템 기본 마이크", None)
+            self.device_manager.refresh_async(self.devices_loaded.emit)
+            return
+        self._populate_microphones(devices)
 
-        devices = sd.query_devices()
+    def _populate_microphones(self, devices):
+        """마이크 콤보박스 채우기 (목록만 바뀌는 것이므로 변경 시그널은 막음)"""
         saved_mic = get_microphone()
+        self.mic_combo.blockSignals(True)
+        self.mic_combo.clear()
+        self.mic_combo.addItem("시스템 기본 마이크", None)
 
-        for i, dev in enumerate(devices):
-            if dev['max_input_channels'] > 0:
-                name = dev['name']
-                self.mic_combo.addItem(name, i)
-                if saved_mic == i:
-                    self.mic_combo.setCurrentIndex(self.mic_combo.count() - 1)
+        for dev in devices:
+            self.mic_combo.addItem(dev.name, dev.index)
+            if saved_mic == dev.index:
+                self.mic_combo.setCurrentIndex(self.mic_combo.count() - 1)
+        self.mic_combo.blockSignals(False)
 
     def _load_screens(self):
         """화면 목록 로드"""
@@ -302,6 +364,11 @@ class SettingsDialog(QDialog):
             set_screen(screen_idx)
             self.screen_changed.emit(screen_idx)
 
+    def _on_mode_changed(self, index):
+        mode = self.mode_combo.currentData()
+        set_dictation_mode(mode)
+        self.dictation_mode_changed.emit(mode)
+
     def _on_style_changed(self, index):
         style = self.style_combo.currentData()
         set_style_mode(style)
@@ -0,0 +1,75 @@
+"""
+ZZABIS 추측 스타일 변환 - 스트리밍 인식 중 확정된 문장부터 미리 변환
+
+AIAgent.speculative()가 세션을 만든다. 변환 함수와 스레드 풀을 주입받아서
+OpenAI 없이 오프라인 벤치마크(benchmark.py)에서도 같은 로직을 쓴다.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from tracing import tracer
+
+# 문장 경계 - 문장부호 뒤 공백 (1.5 같은 숫자는 나누지 않음)
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…。])\s+')
+
+
+def split_sentences(text: str) -> List[str]:
+    """텍스트를 문장 단위로 분리"""
+    return [s for s in SENTENCE_BOUNDARY.split(text.strip()) if s]
+
+
+class SpeculativeTransform:
+    """부분 인식 결과에서 확정된 문장을 미리 스타일 변환
+
+    스트리밍 인식 중 update()로 지금까지의 텍스트를 넣으면, 뒤에 다음 문장이
+    시작된 문장(더 이상 바뀌지 않을 문장)부터 변환을 시작한다. 나중 결과에서
+    이미 보낸 문장이 달라지면 그 문장만 취소하고 다시 변환한다. finish()는
+    최종 텍스트의 문장들을 재사용/변환해서 합치므로, 끝난 뒤 기다리는 시간은
+    대부분 마지막 문장 하나의 변환 시간이다.
+    """
+
+    def __init__(self, transform: Callable[[str, str], str], style: str, executor: ThreadPoolExecutor):
+        self.transform = transform
+        self.style = style
+        self.executor = executor
+        self._jobs = []  # 문장 순서대로 (문장, future)
+        self.redone = 0  # 앞 문장이 바뀌어 다시 변환한 횟수
+
+    def update(self, partial_text: str):
+        """부분 인식 결과 반영 - 마지막 문장(아직 이어질 수 있음)을 뺀 나머지 변환 시작"""
+        segments = split_sentences(partial_text)
+        for i, segment in enumerate(segments[:-1]):
+            self._submit(i, segment)
+
+    def finish(self, final_text: str) -> str:
+        """최종 텍스트 변환 결과 (이미 끝난 문장은 재사용)"""
+        segments = split_sentences(final_text)
+        for i, segment in enumerate(segments):
+            self._submit(i, segment)
+        for _segment, future in self._jobs[len(segments):]:
+            future.cancel()
+        del self._jobs[len(segments):]
+
+        with tracer.span("style_request"):
+            results = [future.result() for _segment, future in self._jobs]
+        return " ".join(r for r in results if r)
+
+    def cancel(self):
+        """변환 결과가 필요 없어짐 (빈 결과, 명령어 등)"""
+        for _segment, future in self._jobs:
+            future.cancel()
+        self._jobs = []
+
+    def _submit(self, index: int, segment: str):
+        if index < len(self._jobs):
+            previous, future = self._jobs[index]
+            if previous == segment:
+                return
+            # 뒤 문맥으로 앞 문장 인식이 바뀜 - 이전 변환 버리고 다시
+            future.cancel()
+            self.redone += 1
+            self._jobs[index] = (segment, self.executor.submit(self.transform, segment, self.style))
+        else:
+            self._jobs.append((segment, self.executor.submit(self.transform, segment, self.style)))
@@ -1,13 +1,35 @@
 """
 Gemini 기반 음성 인식
+
+짧은 녹음은 오디오를 요청 본문에 바로 넣어(inline) 한 번의 왕복으로 끝낸다.
+요청 크기 한도(20MB)에 걸리는 긴 녹음만 Files API로 올리고, 올린 파일은
+응답을 받은 뒤 백그라운드에서 지운다 (계정에 파일이 쌓이지 않게).
 """
 
-import io
-import wave
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from google import genai
+from google.genai import types
+from audio_encoding import WavPayload, encode_wav
 from config import get_api_key
+from resilience import ServiceUnavailable, is_retryable
+from tracing import tracer
+
+# inline 오디오는 base64(4/3배)로 요청 본문에 들어간다 - 본문 한도 20MB에서 프롬프트/JSON 몫을 빼고
+REQUEST_MAX_BYTES = 20_000_000
+REQUEST_OVERHEAD_BYTES = 1_000_000
+# 이 크기(WAV 바이트) 이하는 inline 전송 - 인코딩 후 19MB, 16kHz 16-bit 모노 기준 약 7분
+INLINE_MAX_BYTES = (REQUEST_MAX_BYTES - REQUEST_OVERHEAD_BYTES) // 4 * 3
+
+LANGUAGE_NAMES = {"ko": "한국어", "en": "English", "ja": "日本語"}
+
+PROMPT = """이 오디오 파일에서 사람이 말하는 음성을 {language}로 받아쓰기 해주세요.
+
+중요 규칙:
+1. 음성이 없거나 무음이면 정확히 "SILENCE"만 출력
+2. 음성이 있으면 받아쓴 텍스트만 출력 (따옴표 없이)
+3. 다른 설명이나 주석 없이 결과만 출력"""
 
 
 class GeminiSpeechRecognizer:
@@ -20,55 +42,60 @@ class GeminiSpeechRecognizer:
 
         self.client = genai.Client(api_key=api_key)
         self.model = model
+        self.inline_max_bytes = INLINE_MAX_BYTES
+        self._cleanup = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gemini-cleanup")
+
+    def _delete_file(self, name: str):
+        """업로드한 오디오 파일 삭제 (백그라운드)"""
+        try:
+            self.client.files.delete(name=name)
+        except Exception as e:
+            print(f"Gemini 파일 삭제 오류 ({name}): {e}")
+
+    def _audio_part(self, wav: memoryview):
+        """
+        요청에 넣을 오디오
+
+        Returns:
+            (오디오 파트, 업로드된 파일 이름 - inline이면 None)
+        """
+        if len(wav) <= self.inline_max_bytes:
+            # inline 파트는 bytes만 받는다 (요청 본문에 base64로 들어감 - 한도는 인코딩 크기 기준)
+            return types.Part.from_bytes(data=bytes(wav), mime_type="audio/wav"), None
+
+        with tracer.span("stt_upload"):
+            audio_file = self.client.files.upload(
+                file=WavPayload(wav),
+                config={"mime_type": "audio/wav"}
+            )
+        return audio_file, audio_file.name
 
     def transcribe(self, audio_data: np.ndarray, sample_rate: int = 16000, language: str = "ko") -> str:
         """
         오디오 데이터를 텍스트로 변환
 
         Args:
-            audio_data: numpy array of audio samples (float32, -1 to 1)
+            audio_data: numpy array of audio samples (int16, or float32 -1 to 1)
             sample_rate: 샘플링 레이트 (기본 16000)
             language: 언어 코드 (기본 ko)
 
         Returns:
             인식된 텍스트
         """
+        uploaded = None
         try:
-            # float32 -> int16 변환
-            audio_int16 = (audio_data * 32767).astype(np.int16)
-
-            # WAV 파일로 변환
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(sample_rate)
-                wav_file.writeframes(audio_int16.tobytes())
-
-            wav_buffer.seek(0)
-            audio_bytes = wav_buffer.read()
+            with tracer.span("wav_encode"):
+                wav = encode_wav(audio_data, sample_rate)
 
-            # Gemini에 오디오 전송
-            lang_map = {"ko": "한국어", "en": "English", "ja": "日本語"}
-            lang_name = lang_map.get(language, "한국어")
+            # Gemini에 오디오 전송 (짧으면 inline, 길면 업로드)
+            prompt = PROMPT.format(language=LANGUAGE_NAMES.get(language, "한국어"))
+            audio_part, uploaded = self._audio_part(wav)
 
-            prompt = f"""이 오디오 파일에서 사람이 말하는 음성을 {lang_name}로 받아쓰기 해주세요.
-
-중요 규칙:
-1. 음성이 없거나 무음이면 정확히 "SILENCE"만 출력
-2. 음성이 있으면 받아쓴 텍스트만 출력 (따옴표 없이)
-3. 다른 설명이나 주석 없이 결과만 출력"""
-
-            # 파일 업로드
-            audio_file = self.client.files.upload(
-                file=io.BytesIO(audio_bytes),
-                config={"mime_type": "audio/wav"}
-            )
-
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=[prompt, audio_file]
-            )
+            with tracer.span("stt_request"):
+                response = self.client.models.generate_content(
+                    model=self.model,
+                    contents=[prompt, audio_part]
+                )
 
             text = response.text.strip()
             # 따옴표 제거
@@ -82,7 +109,12 @@ class GeminiSpeechRecognizer:
 
         except Exception as e:
             print(f"Gemini 음성 인식 오류: {e}")
+            if is_retryable(e):
+                raise ServiceUnavailable("Gemini STT 연결 실패") from e
             return ""
+        finally:
+            if uploaded:
+                self._cleanup.submit(self._delete_file, uploaded)
 
 
 if __name__ == "__main__":
@@ -101,6 +133,10 @@ if __name__ == "__main__":
     audio = audio.flatten()
     print(f"녹음 완료: {len(audio)} 샘플")
 
+    import time
+
     recognizer = GeminiSpeechRecognizer()
+    start = time.perf_counter()
     text = recognizer.transcribe(audio, sample_rate, "ko")
-    print(f"인식 결과: {text}")
+    mode = "inline" if len(encode_wav(audio, sample_rate)) <= recognizer.inline_max_bytes else "업로드"
+    print(f"인식 결과: {text} ({mode}, {(time.perf_counter() - start) * 1000:.0f}ms)")
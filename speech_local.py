@@ -0,0 +1,92 @@
+"""
+ZZABIS 로컬 음성 인식 - openai-whisper (선택 사항)
+
+OpenAI STT가 계속 실패해서 서킷 브레이커가 열렸을 때 넘어가는 폴백 엔진.
+패키지나 내려받아 둔 모델이 없으면 available()이 False라서 폴백 없이 동작한다
+(장애 중에 모델을 내려받지 않는다). 모델은 시작할 때 warm()으로 백그라운드에서
+불러 두고, 다 불러오기 전(ready가 False)에는 폴백으로 쓰지 않는다 - 발화 시간
+제한 안에서 모델 로딩을 기다리지 않게.
+"""
+
+import importlib.util
+import os
+import threading
+
+import numpy as np
+
+from tracing import tracer
+
+MODEL_SIZE = "base"  # 폴백용 - 빠른 모델 (macvoice.py는 large)
+
+# 모델 이름 → whisper가 내려받는 파일 이름 (나머지는 "<이름>.pt")
+_MODEL_FILES = {"large": "large-v3.pt", "turbo": "large-v3-turbo.pt"}
+
+
+def model_path(model_size: str = MODEL_SIZE) -> str:
+    """whisper 기본 캐시 위치의 모델 파일 (~/.cache/whisper)"""
+    cache = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "whisper")
+    return os.path.join(cache, _MODEL_FILES.get(model_size, f"{model_size}.pt"))
+
+
+class LocalSpeechRecognizer:
+    """로컬 Whisper 음성 인식"""
+
+    def __init__(self, model_size: str = MODEL_SIZE, vocabulary=None):
+        self.model_size = model_size
+        self.vocabulary = vocabulary  # whisper_prompt → initial_prompt
+        self.model = None
+        self.streaming = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available(model_size: str = MODEL_SIZE) -> bool:
+        """패키지가 있고 모델이 이미 내려받아져 있음"""
+        return importlib.util.find_spec("whisper") is not None and os.path.exists(model_path(model_size))
+
+    @property
+    def ready(self) -> bool:
+        """모델을 다 불러옴 - 폴백으로 쓸 수 있음"""
+        return self.model is not None
+
+    def warm(self):
+        """백그라운드에서 모델 미리 불러오기"""
+        if self.model is None:
+            threading.Thread(target=self._load, daemon=True).start()
+
+    def _load(self):
+        with self._lock:
+            if self.model is None:
+                import whisper
+                print(f"로컬 Whisper 모델 로딩: {self.model_size}")
+                path = model_path(self.model_size)
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"로컬 Whisper 모델 없음: {path}")
+                self.model = whisper.load_model(path)
+        return self.model
+
+    def transcribe(self, audio_data: np.ndarray, sample_rate: int = 16000, language: str = "ko") -> str:
+        """
+        오디오 데이터를 텍스트로 변환
+
+        Args:
+            audio_data: numpy array of audio samples (int16, or float32 -1 to 1)
+            sample_rate: 샘플링 레이트 (16000만 지원 - 캡처가 이미 변환함)
+            language: 언어 코드 (기본 ko)
+
+        Returns:
+            인식된 텍스트
+        """
+        try:
+            model = self._load()
+            # 캡처는 int16 - float가 필요한 건 로컬 모델뿐이라 여기서만 변환
+            if audio_data.dtype == np.int16:
+                audio = audio_data.astype(np.float32) / 32768.0
+            else:
+                audio = audio_data.astype(np.float32, copy=False)
+            prompt = self.vocabulary.whisper_prompt if self.vocabulary is not None else None
+            with tracer.span("stt_local"):
+                result = model.transcribe(audio, language=language, fp16=False, initial_prompt=prompt or None)
+            return result["text"].strip()
+        except Exception as e:
+            print(f"로컬 음성 인식 오류: {e}")
+            return ""
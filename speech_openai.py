@@ -2,64 +2,158 @@
 OpenAI Whisper API 기반 음성 인식
 """
 
-import io
-import wave
+from typing import Iterator
+
 import numpy as np
 from openai import OpenAI
-from config import get_openai_api_key
+from audio_encoding import WavPayload, encode_wav
+from config import get_openai_api_key, get_stt_streaming
+from resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceeded, ServiceUnavailable, call_with_retry, is_retryable
+)
+from tracing import tracer
+
+# 모델 (whisper-1은 스트리밍을 지원하지 않음)
+MODEL = "whisper-1"
+STREAMING_MODEL = "gpt-4o-mini-transcribe"
+
+# 시도당 타임아웃 (받아쓰기 마감 시간이 더 짧으면 그만큼)
+STT_TIMEOUT = 10.0
 
 
 class OpenAISpeechRecognizer:
     """OpenAI Whisper를 사용한 음성 인식"""
 
-    def __init__(self):
+    def __init__(self, fallback=None, vocabulary=None):
+        """
+        Args:
+            fallback: 서킷이 열렸거나 재시도가 다 실패했을 때 쓸 인식기 (로컬 엔진)
+                      없으면 네트워크 장애는 ServiceUnavailable로 올려 보낸다
+            vocabulary: 사용자 어휘 (whisper_prompt를 인식 프롬프트로 보냄)
+        """
         api_key = get_openai_api_key()
         if not api_key:
             raise ValueError("OpenAI API 키가 설정되지 않았습니다")
 
-        self.client = OpenAI(api_key=api_key)
+        # 재시도/타임아웃은 resilience가 받아쓰기 마감 시간 안에서 직접 한다
+        self.client = OpenAI(api_key=api_key, max_retries=0)
+        self.breaker = CircuitBreaker("OpenAI STT")
+        self.fallback = fallback
+        self.vocabulary = vocabulary
+        # 스트리밍이면 파이프라인이 transcribe_stream()으로 부분 결과를 받는다
+        self.streaming = get_stt_streaming()
+
+    def _prompt_args(self) -> dict:
+        """어휘가 있으면 prompt 인자 (제품명/이름 인식 유도)"""
+        if self.vocabulary is not None and self.vocabulary.whisper_prompt:
+            return {"prompt": self.vocabulary.whisper_prompt}
+        return {}
+
+    def _encode_wav(self, audio_data: np.ndarray, sample_rate: int) -> WavPayload:
+        """float32 오디오 → WAV 파일 객체 (인코딩된 버퍼를 복사 없이 읽음)"""
+        with tracer.span("wav_encode"):
+            return WavPayload(encode_wav(audio_data, sample_rate))
 
     def transcribe(self, audio_data: np.ndarray, sample_rate: int = 16000, language: str = "ko") -> str:
         """
         오디오 데이터를 텍스트로 변환
 
         Args:
-            audio_data: numpy array of audio samples (float32, -1 to 1)
+            audio_data: numpy array of audio samples (int16, or float32 -1 to 1)
             sample_rate: 샘플링 레이트 (기본 16000)
             language: 언어 코드 (기본 ko)
 
         Returns:
             인식된 텍스트
-        """
-        try:
-            # float32 -> int16 변환
-            audio_int16 = (audio_data * 32767).astype(np.int16)
 
-            # WAV 파일로 변환
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(sample_rate)
-                wav_file.writeframes(audio_int16.tobytes())
-
-            wav_buffer.seek(0)
-            wav_buffer.name = "audio.wav"  # OpenAI API requires filename
+        Raises:
+            ServiceUnavailable: 폴백 없이 API에 닿을 수 없음 (나중에 다시 시도)
+        """
+        wav_buffer = self._encode_wav(audio_data, sample_rate)
 
-            # OpenAI Whisper API 호출
-            response = self.client.audio.transcriptions.create(
-                model="whisper-1",
+        def request(timeout):
+            wav_buffer.seek(0)  # 재시도마다 처음부터 업로드
+            return self.client.audio.transcriptions.create(
+                model=MODEL,
                 file=wav_buffer,
                 language=language,
-                response_format="text"
+                response_format="text",
+                timeout=timeout,
+                **self._prompt_args()
             )
 
+        try:
+            # OpenAI Whisper API 호출
+            with tracer.span("stt_request"):
+                response = call_with_retry(request, breaker=self.breaker, timeout=STT_TIMEOUT)
+
             text = response.strip()
             return text
 
+        except CircuitOpenError:
+            return self._fallback(audio_data, sample_rate, language, "서킷 열림", unavailable=True)
         except Exception as e:
             print(f"OpenAI 음성 인식 오류: {e}")
+            return self._fallback(audio_data, sample_rate, language, "요청 실패", unavailable=_is_outage(e))
+
+    def _fallback(self, audio_data: np.ndarray, sample_rate: int, language: str, reason: str,
+                  unavailable: bool = False) -> str:
+        """폴백 인식기로 넘김 (없거나 아직 모델 로딩 중이면 네트워크 장애는 ServiceUnavailable, 나머지는 빈 결과)"""
+        if self.fallback is None or not getattr(self.fallback, "ready", True):
+            if self.fallback is not None:
+                print(f"로컬 음성 인식 준비 중 - 폴백 건너뜀 ({reason})")
+            if unavailable:
+                raise ServiceUnavailable(f"OpenAI STT {reason}")
             return ""
+        print(f"로컬 음성 인식으로 전환 ({reason})")
+        return self.fallback.transcribe(audio_data, sample_rate, language)
+
+    def transcribe_stream(self, audio_data: np.ndarray, sample_rate: int = 16000,
+                          language: str = "ko") -> Iterator[str]:
+        """
+        스트리밍 인식 - 지금까지 인식된 전체 텍스트를 조각이 올 때마다 반환
+
+        마지막으로 반환한 값이 최종 결과다 (오류 시 그때까지의 텍스트, 없으면 "").
+        """
+        text = ""
+        wav_buffer = self._encode_wav(audio_data, sample_rate)
+
+        def request(timeout):
+            wav_buffer.seek(0)
+            return self.client.audio.transcriptions.create(
+                model=STREAMING_MODEL,
+                file=wav_buffer,
+                language=language,
+                stream=True,
+                timeout=timeout,
+                **self._prompt_args()
+            )
+
+        stream = None
+        try:
+            with tracer.span("stt_request"):
+                # 스트림 열기까지만 재시도 - 조각을 받기 시작한 뒤에는 다시 보내지 않는다
+                stream = call_with_retry(request, breaker=self.breaker, timeout=STT_TIMEOUT)
+                for event in stream:
+                    if event.type == "transcript.text.delta":
+                        text += event.delta
+                        yield text
+                    elif event.type == "transcript.text.done":
+                        text = event.text
+        except CircuitOpenError:
+            text = self._fallback(audio_data, sample_rate, language, "서킷 열림", unavailable=True)
+        except Exception as e:
+            print(f"OpenAI 스트리밍 인식 오류: {e}")
+            if stream is not None and is_retryable(e):
+                self.breaker.record_failure()  # 스트림 도중 끊김
+            if not text:
+                text = self._fallback(audio_data, sample_rate, language, "요청 실패", unavailable=_is_outage(e))
+        yield text.strip()
+
+
+def _is_outage(error: Exception) -> bool:
+    """다시 보내면 될 수 있는 실패인지 (연결/타임아웃/5xx, 마감 시간 초과)"""
+    return isinstance(error, DeadlineExceeded) or is_retryable(error)
 
 
 if __name__ == "__main__":
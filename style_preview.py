@@ -0,0 +1,78 @@
+"""
+ZZABIS 스타일 미리보기 - 마지막 인식 결과의 모든 스타일 변환을 캐시
+
+다른 스타일로 바꿔 보려고 다시 말하면 STT 왕복이 한 번 더 든다. 미리보기
+모드는 마지막 인식 결과를 기억해 두고 LLM 한 번(JSON 응답)으로 스타일 10개를
+모두 만들어 변환 캐시에 넣는다. 그 뒤 스타일 버튼은 네트워크 없이 입력된
+텍스트를 바로 바꾼다.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from prompts import PROMPT_VERSION
+
+CACHE_SIZE = 256  # (스타일, 원문) 항목 수
+
+
+class TransformCache:
+    """스타일 변환 결과 LRU 캐시 - 키에 프롬프트 버전을 넣어 템플릿이 바뀌면 자연히 무효화"""
+
+    def __init__(self, size: int = CACHE_SIZE, version: int = PROMPT_VERSION):
+        self.size = size
+        self.version = version
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, style: str, text: str) -> tuple:
+        return (self.version, style, text.strip())
+
+    def get(self, style: str, text: str) -> Optional[str]:
+        key = self._key(style, text)
+        with self._lock:
+            result = self._items.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, style: str, text: str, result: str, overwrite: bool = True):
+        key = self._key(style, text)
+        with self._lock:
+            if not overwrite and key in self._items:
+                return
+            self._items[key] = result
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def missing(self, text: str, styles: Iterable[str]) -> list:
+        """캐시에 없는 스타일 (적중/미스 통계에는 넣지 않음)"""
+        with self._lock:
+            return [style for style in styles if self._key(style, text) not in self._items]
+
+    def __len__(self):
+        return len(self._items)
+
+
+def parse_preview(content: str, styles: Iterable[str]) -> Dict[str, str]:
+    """미리보기 JSON 응답 → {스타일: 텍스트} (모르는 키/빈 값은 버림)"""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError) as e:
+        print(f"미리보기 응답 파싱 오류: {e}")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    results = {}
+    for style in styles:
+        value = data.get(style)
+        if isinstance(value, str) and value.strip():
+            results[style] = value.strip()
+    return results
@@ -0,0 +1,131 @@
+"""
+ZZABIS 스타일 변환 요청 계획 - 입력 길이에 따라 LLM 생략, 모델 선택, max_tokens 결정
+
+- 숫자, 한 단어, "엔터" 같은 짧은 입력은 LLM을 부르지 않고 그대로 쓴다.
+- 긴 입력은 더 빠르고 싼 모델로 보낸다.
+- max_tokens는 입력 토큰 수 × 스타일별 출력/입력 비율로 잡고, 비율은
+  실제 응답(completion_tokens)으로 계속 학습해 설정 파일에 저장한다.
+"""
+
+import math
+import re
+import threading
+from typing import Optional
+
+from config import get_style_length_ratios, set_style_length_ratios
+
+# 모델 계층: (이 입력 토큰 수 이상이면, 모델)
+MODEL_TIERS = [
+    (0, "gpt-4o-mini"),
+    (200, "gpt-4.1-nano"),  # 긴 입력 (한 문단 이상) - 더 빠르고 쌈
+]
+
+# 1M 토큰당 가격 (USD): (입력, 캐시된 입력, 출력)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+}
+
+# LLM 생략 대상
+TRIVIAL_MAX_CHARS = 4  # 공백 없는 한 단어가 이 길이 이하
+TRIVIAL_WORDS = {"엔터", "enter", "네", "응", "예", "아니", "아니요", "ㅇㅇ", "ok", "오케이"}
+_NUMBERISH = re.compile(r'^[\d\s.,:;%+\-/()~!?원시분초]*$')
+
+# max_tokens = 입력 토큰 × 비율 × 여유 + 여분
+DEFAULT_RATIO = 1.5
+DEFAULT_RATIOS = {"normal": 1.1, "cold": 0.9, "humor": 2.0, "romantic": 1.8}
+HEADROOM = 1.5
+MIN_MAX_TOKENS = 32
+MAX_MAX_TOKENS = 2000
+MAX_BATCH_TOKENS = 8000  # 미리보기 (스타일 10개 한 번에)
+JSON_OVERHEAD = 8  # 미리보기 스타일당 키/따옴표 토큰
+RATIO_ALPHA = 0.2  # 학습 속도 (지수 이동 평균)
+SAVE_EVERY = 10  # 이 횟수마다 설정 파일에 저장
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사 - 한글 음절은 1토큰, 나머지는 4글자당 1토큰 (o200k 기준 대략)"""
+    hangul = sum(1 for ch in text if '가' <= ch <= '힣')
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def is_trivial(text: str) -> bool:
+    """LLM을 부를 필요가 없는 입력 (숫자, 짧은 한 단어, 명령어)"""
+    stripped = text.strip().rstrip(".!?")
+    if not stripped:
+        return True
+    if stripped.lower() in TRIVIAL_WORDS:
+        return True
+    if _NUMBERISH.match(stripped):
+        return True
+    return " " not in stripped and len(stripped) <= TRIVIAL_MAX_CHARS
+
+
+class RequestPlan:
+    """요청 한 번의 계획"""
+
+    __slots__ = ("skip", "model", "max_tokens", "input_tokens")
+
+    def __init__(self, skip: bool, model: Optional[str], max_tokens: int, input_tokens: int):
+        self.skip = skip
+        self.model = model
+        self.max_tokens = max_tokens
+        self.input_tokens = input_tokens
+
+
+class TieringPolicy:
+    """입력 길이 기반 요청 계획 + 스타일별 출력/입력 비율 학습"""
+
+    def __init__(self, ratios: Optional[dict] = None, tiers=MODEL_TIERS, persist: bool = True):
+        self.tiers = tiers
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._ratios = dict(DEFAULT_RATIOS)
+        self._ratios.update(ratios if ratios is not None else (get_style_length_ratios() if persist else {}))
+        self._updates = 0
+
+    def ratio(self, style: str) -> float:
+        return self._ratios.get(style, DEFAULT_RATIO)
+
+    def plan(self, text: str, style: str) -> RequestPlan:
+        tokens = estimate_tokens(text)
+        if is_trivial(text):
+            return RequestPlan(True, None, 0, tokens)
+
+        model = self.tiers[0][1]
+        for min_tokens, tier_model in self.tiers:
+            if tokens >= min_tokens:
+                model = tier_model
+
+        max_tokens = math.ceil(tokens * self.ratio(style) * HEADROOM) + MIN_MAX_TOKENS
+        return RequestPlan(False, model, min(MAX_MAX_TOKENS, max_tokens), tokens)
+
+    def batch_max_tokens(self, input_tokens: int, styles) -> int:
+        """여러 스타일을 한 JSON 응답으로 받을 때의 max_tokens"""
+        total = sum(math.ceil(input_tokens * self.ratio(style) * HEADROOM) + JSON_OVERHEAD for style in styles)
+        return min(MAX_BATCH_TOKENS, total + MIN_MAX_TOKENS)
+
+    def learn(self, style: str, input_tokens: int, output_tokens: int, truncated: bool = False):
+        """실제 출력 길이로 비율 갱신 (잘렸으면 비율을 크게 올림)"""
+        if input_tokens <= 0:
+            return
+        observed = output_tokens / input_tokens
+        with self._lock:
+            current = self.ratio(style)
+            if truncated:
+                updated = max(current, observed) * 1.5
+            else:
+                updated = current + RATIO_ALPHA * (observed - current)
+            self._ratios[style] = round(updated, 3)
+            self._updates += 1
+            save = self.persist and self._updates % SAVE_EVERY == 0
+            ratios = dict(self._ratios)
+        if save:
+            set_style_length_ratios(ratios)
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """요청 비용 (USD)"""
+    price_in, price_cached, price_out = MODEL_PRICES.get(model, MODEL_PRICES[MODEL_TIERS[0][1]])
+    return ((input_tokens - cached_tokens) * price_in + cached_tokens * price_cached
+            + output_tokens * price_out) / 1e6
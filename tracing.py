@@ -0,0 +1,221 @@
+"""
+ZZABIS 지연 시간 추적 - 핫키 뗌부터 텍스트 입력까지 단계별 소요 시간 기록
+
+한 번의 받아쓰기가 하나의 트레이스이고, 각 단계(concatenate, wav_encode,
+stt_request, style_request, paste, enter ...)가 스팬이다. 완료된 트레이스는
+링 버퍼에 보관되고, 설정 시 로컬 JSONL 파일에 추가 기록된다.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from config import get_trace_export_path
+
+
+class Trace:
+    """받아쓰기 1회 분량의 트레이스"""
+
+    __slots__ = ("trace_id", "name", "start_ns", "wall_start", "end_ns", "spans", "attrs", "thread_id")
+
+    def __init__(self, trace_id: int, name: str, start_ns: int):
+        self.trace_id = trace_id
+        self.name = name
+        self.start_ns = start_ns
+        self.wall_start = time.time() - (time.perf_counter_ns() - start_ns) / 1e9
+        self.end_ns = None
+        self.spans = []  # (name, start_ns, duration_ns)
+        self.attrs = {}
+        self.thread_id = threading.get_ident()
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+    def stage_ms(self) -> Dict[str, float]:
+        """단계별 소요 시간 (같은 이름은 합산)"""
+        stages = {}
+        for name, _start, duration in self.spans:
+            stages[name] = stages.get(name, 0.0) + duration / 1e6
+        return stages
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.trace_id,
+            "name": self.name,
+            "wall_time": self.wall_start,
+            "total_ms": round(self.duration_ms, 3),
+            "spans": [
+                {"name": name, "offset_ms": round((start - self.start_ns) / 1e6, 3),
+                 "duration_ms": round(duration / 1e6, 3)}
+                for name, start, duration in self.spans
+            ],
+            "attrs": self.attrs,
+        }
+
+
+class _Span:
+    """스팬 컨텍스트 매니저 - 현재 트레이스가 없으면 아무것도 안 함"""
+
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace: Optional[Trace], name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.trace is not None:
+            self.trace.spans.append((self.name, self.start, time.perf_counter_ns() - self.start))
+        return False
+
+
+class Tracer:
+    """트레이스 수집기 - 스레드별 현재 트레이스 + 완료된 트레이스 링 버퍼"""
+
+    def __init__(self, capacity: int = 200, export_path: Optional[str] = None):
+        """export_path: 완료된 트레이스를 추가 기록할 JSONL 경로 (None이면 기록 안 함)"""
+        self.traces = deque(maxlen=capacity)
+        self.export_path = export_path
+        self._local = threading.local()
+        self._next_id = 1
+
+    def begin(self, name: str = "dictation", start_ns: Optional[int] = None) -> Trace:
+        """현재 스레드에서 새 트레이스 시작 (start_ns: perf_counter_ns 기준 시작 시각)"""
+        trace = Trace(self._next_id, name, start_ns if start_ns is not None else time.perf_counter_ns())
+        self._next_id += 1
+        self._local.trace = trace
+        return trace
+
+    def current(self) -> Optional[Trace]:
+        return getattr(self._local, "trace", None)
+
+    def span(self, name: str) -> _Span:
+        """현재 트레이스에 단계 기록
+
+        with tracer.span("stt_request"):
+            ...
+        """
+        return _Span(getattr(self._local, "trace", None), name)
+
+    def end(self, **attrs) -> Optional[Trace]:
+        """현재 트레이스 종료 후 링 버퍼에 저장"""
+        trace = getattr(self._local, "trace", None)
+        if trace is None:
+            return None
+        self._local.trace = None
+        trace.end_ns = time.perf_counter_ns()
+        trace.attrs.update(attrs)
+        self.traces.append(trace)
+
+        # 경로는 시작할 때 한 번 읽어 둔다 - 측정 중인 경로에서 설정 파일을 다시 읽지 않음
+        if self.export_path:
+            self._append_jsonl(trace, self.export_path)
+        return trace
+
+    def _append_jsonl(self, trace: Trace, path: str):
+        try:
+            with open(os.path.expanduser(path), "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"트레이스 기록 오류: {e}")
+
+    def percentiles(self) -> List[Tuple[str, float, float, int]]:
+        """단계별 (이름, p50, p95, 샘플 수) - 첫 등장 순서, 마지막은 total"""
+        samples = {}
+        totals = []
+        for trace in list(self.traces):
+            for stage, ms in trace.stage_ms().items():
+                samples.setdefault(stage, []).append(ms)
+            totals.append(trace.duration_ms)
+
+        rows = []
+        for stage, values in samples.items():
+            rows.append((stage, _percentile(values, 50), _percentile(values, 95), len(values)))
+        if totals:
+            rows.append(("total", _percentile(totals, 50), _percentile(totals, 95), len(totals)))
+        return rows
+
+    def export_chrome_trace(self, path: str, traces: Optional[List[dict]] = None):
+        """Chrome 트레이스 형식(chrome://tracing, Perfetto)으로 저장"""
+        if traces is None:
+            traces = [t.to_dict() for t in self.traces]
+        write_chrome_trace(traces, path)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """최근접 순위 백분위수"""
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, rank - 1)]
+
+
+def write_chrome_trace(traces: List[dict], path: str):
+    """to_dict() 형식의 트레이스 목록을 Chrome 트레이스 이벤트 JSON으로 변환"""
+    events = []
+    for trace in traces:
+        base_us = trace["wall_time"] * 1e6
+        tid = trace["id"]
+        events.append({
+            "name": trace["name"], "ph": "X", "pid": 1, "tid": tid,
+            "ts": base_us, "dur": trace["total_ms"] * 1000, "args": trace.get("attrs", {}),
+        })
+        for span in trace["spans"]:
+            events.append({
+                "name": span["name"], "ph": "X", "pid": 1, "tid": tid,
+                "ts": base_us + span["offset_ms"] * 1000, "dur": span["duration_ms"] * 1000,
+            })
+
+    with open(os.path.expanduser(path), "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+def _configured_export_path() -> Optional[str]:
+    """설정된 트레이스 기록 경로 (설정 파일을 못 읽으면 기록 안 함)"""
+    try:
+        return get_trace_export_path()
+    except Exception as e:
+        print(f"트레이스 기록 경로 읽기 오류: {e}")
+        return None
+
+
+# 싱글톤 인스턴스
+tracer = Tracer(export_path=_configured_export_path())
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) == 3:
+        # JSONL → Chrome 트레이스 변환: python tracing.py traces.jsonl out.json
+        with open(os.path.expanduser(sys.argv[1]), encoding="utf-8") as f:
+            loaded = [json.loads(line) for line in f if line.strip()]
+        write_chrome_trace(loaded, sys.argv[2])
+        print(f"{len(loaded)}개 트레이스 → {sys.argv[2]}")
+        sys.exit(0)
+
+    # 스팬 오버헤드 측정
+    bench = Tracer()
+    n = 100000
+    bench.begin("bench")
+    start = time.perf_counter()
+    for _ in range(n):
+        with bench.span("noop"):
+            pass
+    per_span = (time.perf_counter() - start) / n * 1e6
+    bench.end()
+
+    start = time.perf_counter()
+    for _ in range(n):
+        with bench.span("noop"):
+            pass
+    idle = (time.perf_counter() - start) / n * 1e6
+    print(f"스팬 오버헤드: {per_span:.2f} µs (트레이스 없음: {idle:.2f} µs)")
@@ -10,13 +10,17 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import (
     Qt, QTimer, QPropertyAnimation, QEasingCurve,
-    pyqtSignal, QObject, QPoint, QPropertyAnimation
+    pyqtSignal, QObject, QPoint, QPointF, QPropertyAnimation
 )
 from PyQt6.QtGui import (
     QPainter, QColor, QLinearGradient, QPen, QBrush,
-    QFont, QPainterPath, QRadialGradient
+    QFont, QPainterPath, QRadialGradient, QPixmap, QImage
 )
 from config import get_style_mode, set_style_mode, STYLE_MODES
+from audio_meter import LevelMeter
+
+# 레벨 미터 샘플링 주기 (ms) - 오디오 콜백 주기와 무관하게 UI 프레임 단위로 읽음
+LEVEL_POLL_MS = 33
 
 
 class SignalEmitter(QObject):
@@ -29,6 +33,7 @@ class SignalEmitter(QObject):
     set_processing = pyqtSignal(bool)
     update_console = pyqtSignal(str)
     style_changed = pyqtSignal(str)  # 스타일 모드 변경
+    select_style = pyqtSignal(str)  # 앱 전환 - 버튼 표시만 바꿈 (style_changed 없음)
 
 
 class StyleButton(QPushButton):
@@ -77,6 +82,18 @@ class StyleButton(QPushButton):
 class VoiceOrb(QWidget):
     """ZZABIS 스타일 빨간색 구체 - 신비로운 3D 효과"""
 
+    # 스프라이트 기준 크기 (최대 크기로 렌더링 후 축소 합성)
+    GLOW_BASE = 55
+    CORE_REF = 40
+    INNER_REF = 22
+    PARTICLE_REF = 8
+    SPRITE_RADIUS = {
+        "glow": GLOW_BASE + 24,
+        "core": CORE_REF + 15,
+        "inner": INNER_REF,
+        "particle": PARTICLE_REF,
+    }
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedSize(150, 150)
@@ -89,6 +106,11 @@ class VoiceOrb(QWidget):
         self.energy_rings = []
         self.particles = []
 
+        # 정적 레이어 캐시: (layer, state, dpr) -> QPixmap
+        self.use_sprite_cache = True
+        self._sprites = {}
+        self._sprite_dpr = None
+
         # 빨간색/주황색 기반 색상
         self.colors = {
             "idle": (220, 60, 60),       # 어두운 빨강
@@ -131,31 +153,159 @@ class VoiceOrb(QWidget):
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if self.use_sprite_cache:
+            self._paint_cached(painter)
+        else:
+            self._paint_uncached(painter)
+        painter.end()
+
+    # === 스프라이트 캐시 ===
+
+    def _sprite(self, layer: str, dpr: float) -> QPixmap:
+        """상태/DPR별로 미리 렌더링한 정적 레이어 가져오기"""
+        if dpr != self._sprite_dpr:
+            # DPI 변경 시 캐시 무효화
+            self._sprites.clear()
+            self._sprite_dpr = dpr
+
+        key = (layer, self.state, dpr)
+        pixmap = self._sprites.get(key)
+        if pixmap is None:
+            pixmap = self._render_sprite(layer, self.colors[self.state], dpr)
+            self._sprites[key] = pixmap
+        return pixmap
+
+    def _render_sprite(self, layer: str, color: tuple, dpr: float) -> QPixmap:
+        """정적 레이어를 QPixmap에 한 번만 렌더링 (중심 기준 논리 좌표)"""
+        r, g, b = color
+        radius = self.SPRITE_RADIUS[layer]
+        size = radius * 2
+
+        pixmap = QPixmap(math.ceil(size * dpr), math.ceil(size * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        p = QPainter(pixmap)
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+        p.setPen(Qt.PenStyle.NoPen)
+        c = radius
+
+        if layer == "glow":
+            # 외부 에너지 필드 - 기본 크기, 최대 알파로 렌더링
+            for i in range(5):
+                ring_size = self.GLOW_BASE + i * 6
+                alpha = 40 - i * 7
+                gradient = QRadialGradient(c, c, ring_size)
+                gradient.setColorAt(0, QColor(r, g, b, 0))
+                gradient.setColorAt(0.5, QColor(r, g, b, alpha // 2))
+                gradient.setColorAt(0.8, QColor(r, g, b, alpha))
+                gradient.setColorAt(1, QColor(r, g, b, 0))
+                p.setBrush(gradient)
+                p.drawEllipse(QPointF(c, c), ring_size, ring_size)
+
+        elif layer == "core":
+            # 외부 글로우 + 구체 본체 + 테두리 + 하이라이트
+            core_size = self.CORE_REF
+            outer_glow = QRadialGradient(c, c, core_size + 15)
+            outer_glow.setColorAt(0, QColor(r, g, b, 100))
+            outer_glow.setColorAt(0.5, QColor(r, g, b, 50))
+            outer_glow.setColorAt(1, QColor(r, g, b, 0))
+            p.setBrush(outer_glow)
+            p.drawEllipse(QPointF(c, c), core_size + 15, core_size + 15)
+
+            sphere_gradient = QRadialGradient(c - core_size * 0.35, c - core_size * 0.35, core_size * 1.8)
+            sphere_gradient.setColorAt(0, QColor(255, 255, 255, 220))
+            sphere_gradient.setColorAt(0.15, QColor(255, 200, 180, 200))
+            sphere_gradient.setColorAt(0.3, QColor(r, g, b, 255))
+            sphere_gradient.setColorAt(0.6, QColor(int(r * 0.7), int(g * 0.5), int(b * 0.5), 255))
+            sphere_gradient.setColorAt(1, QColor(int(r * 0.3), int(g * 0.2), int(b * 0.2), 200))
+            p.setBrush(sphere_gradient)
+            pen = QPen(QColor(255, 150, 100, 80))
+            pen.setWidth(1)
+            p.setPen(pen)
+            p.drawEllipse(QPointF(c, c), core_size, core_size)
+
+            highlight_size = core_size * 0.35
+            hx = hy = c - core_size * 0.4
+            highlight = QRadialGradient(hx, hy, highlight_size)
+            highlight.setColorAt(0, QColor(255, 255, 255, 180))
+            highlight.setColorAt(0.5, QColor(255, 255, 255, 50))
+            highlight.setColorAt(1, QColor(255, 255, 255, 0))
+            p.setPen(Qt.PenStyle.NoPen)
+            p.setBrush(highlight)
+            p.drawEllipse(QPointF(hx, hy), highlight_size, highlight_size)
+
+        elif layer == "inner":
+            inner_size = self.INNER_REF
+            inner_gradient = QRadialGradient(c, c, inner_size)
+            inner_gradient.setColorAt(0, QColor(255, 255, 255, 255))
+            inner_gradient.setColorAt(0.3, QColor(255, 200, 150, 200))
+            inner_gradient.setColorAt(0.7, QColor(r, g, b, 100))
+            inner_gradient.setColorAt(1, QColor(r, g, b, 0))
+            p.setBrush(inner_gradient)
+            p.drawEllipse(QPointF(c, c), inner_size, inner_size)
+
+        elif layer == "particle":
+            # 원본과 동일하게 그라디언트 반경의 절반만 그림
+            size = self.PARTICLE_REF
+            particle_gradient = QRadialGradient(c, c, size * 2)
+            particle_gradient.setColorAt(0, QColor(255, 200, 150, 200))
+            particle_gradient.setColorAt(0.5, QColor(r, g, b, 150))
+            particle_gradient.setColorAt(1, QColor(r, g, b, 0))
+            p.setBrush(particle_gradient)
+            p.drawEllipse(QPointF(c, c), size, size)
+
+        p.end()
+        return pixmap
+
+    def _blit(self, painter: QPainter, pixmap: QPixmap, x: float, y: float, scale: float):
+        """캐시된 스프라이트를 (x, y) 중심으로 스케일하여 합성"""
+        half = pixmap.width() / pixmap.devicePixelRatio() / 2
+        painter.save()
+        painter.translate(x, y)
+        painter.scale(scale, scale)
+        painter.drawPixmap(QPointF(-half, -half), pixmap)
+        painter.restore()
+
+    def _paint_cached(self, painter: QPainter):
+        """캐시된 스프라이트 합성 + 동적 링/파티클만 직접 그리기"""
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        dpr = painter.device().devicePixelRatioF()
 
         cx, cy = self.width() / 2, self.height() / 2
         r, g, b = self.colors[self.state]
         pulse = (math.sin(self.pulse_phase) + 1) / 2
         is_active = self.state in ["listening", "speaking", "processing"]
 
-        # === 1. 외부 에너지 필드 (신비로운 글로우) ===
-        for i in range(5):
-            ring_size = 55 + i * 6 + pulse * 8 + self.audio_level * 15
-            alpha = int((40 - i * 7) * (0.6 + self.audio_level * 0.4))
+        # === 1. 외부 에너지 필드 ===
+        glow_outer = self.GLOW_BASE + 24
+        grow = pulse * 8 + self.audio_level * 15
+        painter.setOpacity(0.6 + self.audio_level * 0.4)
+        self._blit(painter, self._sprite("glow", dpr), cx, cy, (glow_outer + grow) / glow_outer)
+        painter.setOpacity(1.0)
 
-            gradient = QRadialGradient(cx, cy, ring_size)
-            gradient.setColorAt(0, QColor(r, g, b, 0))
-            gradient.setColorAt(0.5, QColor(r, g, b, alpha // 2))
-            gradient.setColorAt(0.8, QColor(r, g, b, alpha))
-            gradient.setColorAt(1, QColor(r, g, b, 0))
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self._paint_rings(painter, cx, cy, r, g, b, is_active)
 
-            painter.setBrush(gradient)
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.drawEllipse(
-                int(cx - ring_size), int(cy - ring_size),
-                int(ring_size * 2), int(ring_size * 2)
-            )
+        # === 4. 궤도 파티클들 ===
+        particle = self._sprite("particle", dpr)
+        for p in self.particles:
+            px = cx + math.cos(p['angle']) * (p['dist'] + self.audio_level * 15)
+            py = cy + math.sin(p['angle']) * (p['dist'] + self.audio_level * 15) * 0.6
+            size = p['size'] * (1 + self.audio_level)
+            self._blit(painter, particle, px, py, size / self.PARTICLE_REF)
+
+        # === 5. 메인 구체 + 7. 하이라이트 ===
+        core_size = 26 + pulse * 4 + self.audio_level * 10
+        self._blit(painter, self._sprite("core", dpr), cx, cy, core_size / self.CORE_REF)
 
+        # === 6. 내부 코어 빛 ===
+        inner_pulse = (math.sin(self.pulse_phase * 2) + 1) / 2
+        inner_size = 8 + inner_pulse * 6 + self.audio_level * 8
+        self._blit(painter, self._sprite("inner", dpr), cx, cy, inner_size / self.INNER_REF)
+
+    def _paint_rings(self, painter: QPainter, cx: float, cy: float, r: int, g: int, b: int, is_active: bool):
+        """회전 에너지 링 + 파동 링 (매 프레임 변하는 외곽선)"""
         # === 2. 회전하는 에너지 링들 ===
         if is_active:
             for i in range(3):
@@ -193,6 +343,35 @@ class VoiceOrb(QWidget):
                     int(wave_size * 2), int(wave_size * 2)
                 )
 
+    def _paint_uncached(self, painter: QPainter):
+        """매 프레임 그라디언트를 새로 만드는 기존 렌더링 (벤치마크 비교용)"""
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        cx, cy = self.width() / 2, self.height() / 2
+        r, g, b = self.colors[self.state]
+        pulse = (math.sin(self.pulse_phase) + 1) / 2
+        is_active = self.state in ["listening", "speaking", "processing"]
+
+        # === 1. 외부 에너지 필드 (신비로운 글로우) ===
+        for i in range(5):
+            ring_size = 55 + i * 6 + pulse * 8 + self.audio_level * 15
+            alpha = int((40 - i * 7) * (0.6 + self.audio_level * 0.4))
+
+            gradient = QRadialGradient(cx, cy, ring_size)
+            gradient.setColorAt(0, QColor(r, g, b, 0))
+            gradient.setColorAt(0.5, QColor(r, g, b, alpha // 2))
+            gradient.setColorAt(0.8, QColor(r, g, b, alpha))
+            gradient.setColorAt(1, QColor(r, g, b, 0))
+
+            painter.setBrush(gradient)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.drawEllipse(
+                int(cx - ring_size), int(cy - ring_size),
+                int(ring_size * 2), int(ring_size * 2)
+            )
+
+        self._paint_rings(painter, cx, cy, r, g, b, is_active)
+
         # === 4. 궤도 파티클들 ===
         for p in self.particles:
             px = cx + math.cos(p['angle']) * (p['dist'] + self.audio_level * 15)
@@ -342,17 +521,27 @@ class MacVoiceUI(QWidget):
         self.drag_pos = None
         self.current_style = get_style_mode()
         self.style_buttons = {}
+        self.level_meter = LevelMeter()
+        self._level_seq = 0
         self.init_ui()
         self.connect_signals()
 
+        # 오디오 콜백이 기록한 최신 레벨을 UI 주기로 샘플링
+        self.level_timer = QTimer()
+        self.level_timer.timeout.connect(self._poll_level)
+        self.level_timer.start(LEVEL_POLL_MS)
+
     def init_ui(self):
         self.setWindowTitle("ZZABIS")
         self.setFixedSize(520, 300)  # 더 컴팩트하게
+        # 포커스를 가져가지 않는 창 - 스타일 버튼을 눌러도 입력 대상 앱이 그대로 앞에 남음
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint |
-            Qt.WindowType.WindowStaysOnTopHint
+            Qt.WindowType.WindowStaysOnTopHint |
+            Qt.WindowType.WindowDoesNotAcceptFocus
         )
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 12, 0, 12)
@@ -583,6 +772,13 @@ class MacVoiceUI(QWidget):
             self.signals.style_changed.emit(code)
             self.status_label.setText(f"{STYLE_MODES.get(code, code)} 모드")
 
+    def select_style(self, code: str):
+        """버튼 선택 표시만 변경 (앱 프로필 적용 - 설정/신호 없음)"""
+        if code != self.current_style and code in self.style_buttons:
+            self.style_buttons[self.current_style].set_selected(False)
+            self.current_style = code
+            self.style_buttons[code].set_selected(True)
+
     def get_current_style(self) -> str:
         return self.current_style
 
@@ -594,6 +790,7 @@ class MacVoiceUI(QWidget):
         self.signals.set_listening.connect(self.on_listening)
         self.signals.set_processing.connect(self.on_processing)
         self.signals.update_console.connect(self.set_console)
+        self.signals.select_style.connect(self.select_style)
 
     def position_window(self, screen_index: int = 0):
         """창 위치 설정 (모니터 선택 가능)"""
@@ -640,6 +837,13 @@ class MacVoiceUI(QWidget):
         self.orb.set_state("speaking")
         QTimer.singleShot(2000, lambda: self.orb.set_state("idle") if self.orb.state == "speaking" else None)
 
+    def _poll_level(self):
+        """레벨 미터 슬롯 읽기 - 새 값이 있을 때만 반영"""
+        seq, rms, _peak = self.level_meter.read()
+        if seq != self._level_seq:
+            self._level_seq = seq
+            self.on_level(rms)
+
     def on_level(self, level: float):
         self.waveform.set_level(level)
         self.orb.set_audio_level(level)
@@ -709,6 +913,38 @@ class MacVoiceUI(QWidget):
         self.drag_pos = None
 
 
+def benchmark_orb(frames: int = 300, dpr: float = 2.0):
+    """오프스크린 QImage에 VoiceOrb를 그려 프레임 시간 비교 (캐시 전/후)"""
+    import time
+    orb = VoiceOrb()
+    orb.timer.stop()
+    orb.set_state("listening")
+    orb.audio_level = 0.5
+
+    image = QImage(int(orb.width() * dpr), int(orb.height() * dpr), QImage.Format.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(dpr)
+
+    results = {}
+    for label, cached in (("uncached", False), ("cached", True)):
+        orb.use_sprite_cache = cached
+        orb._sprites.clear()
+        start = time.perf_counter()
+        for _ in range(frames):
+            orb.animate()
+            image.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(image)
+            if cached:
+                orb._paint_cached(painter)
+            else:
+                orb._paint_uncached(painter)
+            painter.end()
+        results[label] = (time.perf_counter() - start) / frames * 1000
+        print(f"{label:>9}: {results[label]:.3f} ms/frame")
+
+    print(f"  speedup: {results['uncached'] / results['cached']:.1f}x")
+    return results
+
+
 def create_ui():
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
@@ -718,6 +954,11 @@ def create_ui():
 
 
 if __name__ == "__main__":
+    if "--bench-orb" in sys.argv:
+        bench_app = QApplication(sys.argv)
+        benchmark_orb()
+        sys.exit(0)
+
     app, window = create_ui()
     window.set_status("대기 중")
     window.orb.set_state("listening")
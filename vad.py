@@ -0,0 +1,366 @@
+"""
+ZZABIS 음성 구간 검출 (VAD) - 잡음 바닥 추정, 연속 받아쓰기용 엔드포인터, 앞뒤 무음 제거
+
+오디오 콜백 블록 단위로 레벨을 받아서 발화 시작/끝을 판정한다.
+잡음 바닥을 계속 추정해서 임계값을 자동으로 맞추고, 발화 끝에는 행오버
+(짧은 쉼은 발화에 포함)를 두며, 최소/최대 발화 길이를 지킨다.
+"""
+
+import math
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+
+from audio_meter import compute_levels
+from config import DEFAULT_NOISE_FLOOR, SPEECH_START_RATIO, SPEECH_STOP_RATIO, MIN_SPEECH_THRESHOLD
+
+
+class NoiseFloorEstimator:
+    """최근 블록 레벨의 하위 백분위수로 잡음 바닥 추정
+
+    발화가 섞여 있어도 하위 백분위수는 잡음 쪽에 머물기 때문에 발화/비발화
+    판정 없이 모든 블록을 넣으면 된다. 캘리브레이션 값(또는 기본값)은 몇 개의
+    샘플로만 들어가서, 실제 환경이 다르면 몇 초 안에 밀려난다.
+    """
+
+    SEED_SAMPLES = 3
+
+    def __init__(self, initial: float = DEFAULT_NOISE_FLOOR, window: int = 150,
+                 percentile: float = 10.0, update_every: int = 5):
+        """
+        Args:
+            initial: 초기 잡음 바닥 RMS (마이크별 캘리브레이션 값)
+            window: 추적할 최근 블록 수 (100ms 블록 기준 150 = 15초)
+            percentile: 잡음 바닥으로 쓸 하위 백분위수
+            update_every: 백분위수 재계산 주기 (블록 수)
+        """
+        self.percentile = percentile
+        self.update_every = update_every
+        self._levels = np.zeros(window, dtype=np.float32)
+        self.seed(initial)
+
+    def seed(self, floor: float):
+        """캘리브레이션 값으로 초기화"""
+        self._levels[:self.SEED_SAMPLES] = floor
+        self._index = self.SEED_SAMPLES
+        self._filled = self.SEED_SAMPLES
+        self.floor = floor
+
+    def update(self, level: float) -> float:
+        """블록 레벨 하나 추가 후 현재 잡음 바닥 반환"""
+        window = len(self._levels)
+        self._levels[self._index] = level
+        self._index = (self._index + 1) % window
+        if self._filled < window:
+            self._filled += 1
+        if self._index % self.update_every == 0:
+            self.floor = float(np.percentile(self._levels[:self._filled], self.percentile))
+        return self.floor
+
+
+class PreRollBuffer:
+    """최근 N초 오디오 블록 링 - 녹음/발화 시작 전 구간을 앞에 붙이기 위해 보관"""
+
+    def __init__(self, sample_rate: int = 16000, duration: float = 0.3):
+        self.max_samples = int(duration * sample_rate)
+        self._chunks = deque()
+        self._length = 0
+
+    def push(self, chunk: np.ndarray):
+        """블록 추가 (소유권을 넘김) - 오래된 블록은 max_samples를 넘는 만큼만 남김"""
+        if self.max_samples <= 0:
+            return
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        while self._chunks and self._length - len(self._chunks[0]) >= self.max_samples:
+            self._length -= len(self._chunks.popleft())
+
+    def drain(self) -> List[np.ndarray]:
+        """보관 중인 블록을 정확히 max_samples 길이로 꺼내고 비움"""
+        chunks = list(self._chunks)
+        excess = self._length - self.max_samples
+        if chunks and excess > 0:
+            chunks[0] = chunks[0][excess:]
+        self.clear()
+        return chunks
+
+    def clear(self):
+        self._chunks.clear()
+        self._length = 0
+
+    def __len__(self) -> int:
+        """보관 중인 샘플 수 (max_samples 초과분 포함)"""
+        return self._length
+
+
+class Endpointer:
+    """블록 단위 발화 엔드포인터
+
+    process()에 블록을 순서대로 넣으면 발화가 끝난 시점에 그 발화의 블록
+    리스트를 돌려준다. 그 외에는 None.
+    """
+
+    def __init__(self, sample_rate: int = 16000,
+                 hangover: float = 0.6,
+                 min_utterance: float = 0.3,
+                 max_utterance: float = 20.0,
+                 pre_roll: float = 0.2,
+                 start_ratio: float = SPEECH_START_RATIO,
+                 stop_ratio: float = SPEECH_STOP_RATIO,
+                 min_threshold: float = MIN_SPEECH_THRESHOLD,
+                 noise: Optional[NoiseFloorEstimator] = None):
+        """
+        Args:
+            sample_rate: 샘플링 레이트
+            hangover: 이 시간(초) 동안 조용하면 발화 종료
+            min_utterance: 이보다 짧은 발화(유성 구간 기준)는 버림
+            max_utterance: 이보다 길면 강제로 잘라서 내보냄
+            pre_roll: 발화 시작 전 포함할 오디오 길이 (첫 음절 보호)
+            start_ratio: 잡음 바닥 대비 발화 시작 배율
+            stop_ratio: 잡음 바닥 대비 발화 유지 배율 (히스테리시스)
+            min_threshold: 임계값 하한 (완전 무음 환경에서 과민 반응 방지)
+            noise: 잡음 바닥 추정기 (process()가 매 블록 갱신, 다른 곳과 공유 가능)
+        """
+        self.sample_rate = sample_rate
+        self.hangover_samples = int(hangover * sample_rate)
+        self.min_samples = int(min_utterance * sample_rate)
+        self.max_samples = int(max_utterance * sample_rate)
+        self.start_ratio = start_ratio
+        self.stop_ratio = stop_ratio
+        self.min_threshold = min_threshold
+        self.noise = noise or NoiseFloorEstimator()
+
+        self.in_speech = False
+        self.pre_roll = PreRollBuffer(sample_rate, pre_roll)
+        self._buffer = []
+        self._buffer_len = 0
+        self._silence_len = 0
+
+    @property
+    def noise_floor(self) -> float:
+        return self.noise.floor
+
+    @property
+    def start_threshold(self) -> float:
+        return max(self.min_threshold, self.noise_floor * self.start_ratio)
+
+    @property
+    def stop_threshold(self) -> float:
+        return max(self.min_threshold * self.stop_ratio / self.start_ratio, self.noise_floor * self.stop_ratio)
+
+    def reset(self):
+        """진행 중인 발화 버리고 초기 상태로"""
+        self.in_speech = False
+        self.pre_roll.clear()
+        self._buffer = []
+        self._buffer_len = 0
+        self._silence_len = 0
+
+    def process(self, chunk: np.ndarray, level: Optional[float] = None) -> Optional[List[np.ndarray]]:
+        """
+        블록 하나 처리
+
+        Args:
+            chunk: 오디오 블록 (호출자가 소유권을 넘김 - 복사본이어야 함)
+            level: 미리 계산한 RMS (없으면 계산)
+
+        Returns:
+            발화가 끝났으면 블록 리스트, 아니면 None
+        """
+        if level is None:
+            level = compute_levels(chunk)[0]
+        n = len(chunk)
+        self.noise.update(level)
+
+        if not self.in_speech:
+            if level > self.start_threshold:
+                self.in_speech = True
+                self._buffer = self.pre_roll.drain()
+                self._buffer_len = sum(len(c) for c in self._buffer)
+                self._silence_len = 0
+                self._append(chunk, n)
+                return None
+
+            # 비발화 구간 - 프리롤 유지
+            self.pre_roll.push(chunk)
+            return None
+
+        self._append(chunk, n)
+        if level > self.stop_threshold:
+            self._silence_len = 0
+        else:
+            self._silence_len += n
+
+        if self._silence_len >= self.hangover_samples:
+            self.in_speech = False
+            return self._finish()
+
+        if self._buffer_len >= self.max_samples:
+            # 너무 긴 발화는 잘라서 내보내고 계속 발화 상태 유지
+            return self._finish()
+
+        return None
+
+    def flush(self) -> Optional[List[np.ndarray]]:
+        """진행 중인 발화를 즉시 끝내고 반환 (청취 종료 시, 프리롤도 비움)"""
+        utterance = self._finish() if self.in_speech else None
+        self.reset()
+        return utterance
+
+    def _append(self, chunk: np.ndarray, n: int):
+        self._buffer.append(chunk)
+        self._buffer_len += n
+
+    def _finish(self) -> Optional[List[np.ndarray]]:
+        utterance = self._buffer
+        voiced = self._buffer_len - self._silence_len
+        self._buffer = []
+        self._buffer_len = 0
+        self._silence_len = 0
+        if voiced < self.min_samples:
+            return None
+        return utterance
+
+
+def trim_silence(chunks: List[np.ndarray], threshold: float, sample_rate: int = 16000,
+                 margin: float = 0.2) -> List[np.ndarray]:
+    """
+    앞뒤 무음 블록 제거 (업로드 크기 절감)
+
+    Args:
+        chunks: 오디오 블록 리스트
+        threshold: 이 RMS를 넘는 블록을 음성으로 간주
+        margin: 음성 앞뒤로 남길 여유 (초)
+
+    Returns:
+        잘라낸 블록 리스트 (음성이 전혀 없으면 빈 리스트)
+    """
+    voiced = [i for i, chunk in enumerate(chunks) if compute_levels(chunk)[0] > threshold]
+    if not voiced:
+        return []
+
+    block_len = max(1, max(len(chunk) for chunk in chunks))  # 프리롤 첫 블록은 짧을 수 있음
+    margin_blocks = math.ceil(margin * sample_rate / block_len)
+    first = max(0, voiced[0] - margin_blocks)
+    last = min(len(chunks), voiced[-1] + 1 + margin_blocks)
+    return chunks[first:last]
+
+
+def benchmark_cpu(seconds: float = 600.0, sample_rate: int = 16000, block: float = 0.1):
+    """상시 청취 CPU 예산 측정 - 오디오 1초당 레벨 계산 + 엔드포인팅 CPU 시간"""
+    import time
+
+    rng = np.random.default_rng(0)
+    block_size = int(sample_rate * block)
+    blocks = int(seconds / block)
+
+    # 잡음 위에 3초마다 1초짜리 발화
+    noise = (0.003 * rng.standard_normal(block_size)).astype(np.float32)
+    t = np.arange(block_size) / sample_rate
+    voice = (0.1 * np.sin(2 * np.pi * 200 * t)).astype(np.float32) + noise
+
+    endpointer = Endpointer(sample_rate)
+    utterances = 0
+    start = time.process_time()
+    for i in range(blocks):
+        src = voice if (i % 30) < 10 else noise
+        chunk = src.copy()
+        rms, _peak = compute_levels(chunk)
+        if endpointer.process(chunk, rms) is not None:
+            utterances += 1
+    cpu = time.process_time() - start
+
+    print(f"오디오 {seconds:.0f}초 / 발화 {utterances}개")
+    print(f"CPU {cpu * 1000:.1f} ms → 오디오 1초당 {cpu / seconds * 1000:.3f} ms "
+          f"({cpu / seconds * 100:.3f}% of one core)")
+
+
+def noisy_fixture(noise_rms: float, seconds: float = 60.0, sample_rate: int = 16000,
+                  block: float = 0.1, seed: int = 0):
+    """잡음 위에 5초마다 1.5초 발화가 있는 블록 스트림 + 실제 발화 수"""
+    rng = np.random.default_rng(seed)
+    block_size = int(sample_rate * block)
+    blocks = []
+    t = np.arange(block_size) / sample_rate
+    for i in range(int(seconds / block)):
+        chunk = noise_rms * rng.standard_normal(block_size)
+        if (i % 50) < 15:
+            chunk += 0.2 * np.sin(2 * np.pi * (150 + 50 * rng.random()) * t)
+        blocks.append(chunk.astype(np.float32))
+    return blocks, int(seconds / 5)
+
+
+def evaluate_noisy(noise_levels=(0.001, 0.01, 0.03), sample_rate: int = 16000):
+    """고정 임계값(0.008) 대비 적응형 잡음 바닥의 오검출/업로드 크기 비교"""
+    print(f"{'noise':>7} | {'발화':>4} | {'고정: 검출/업로드초':>18} | {'적응형: 검출/업로드초':>20} | {'PTT 6초 → 트리밍':>16}")
+    for noise_rms in noise_levels:
+        blocks, truth = noisy_fixture(noise_rms, sample_rate=sample_rate)
+        row = []
+        for endpointer in (
+            Endpointer(sample_rate, min_threshold=0.008, start_ratio=1e-9, stop_ratio=1e-9),
+            Endpointer(sample_rate, noise=NoiseFloorEstimator(initial=DEFAULT_NOISE_FLOOR)),
+        ):
+            detected, uploaded = 0, 0
+            for chunk in blocks:
+                utterance = endpointer.process(chunk.copy())
+                if utterance:
+                    detected += 1
+                    uploaded += sum(len(c) for c in utterance)
+            tail = endpointer.flush()
+            if tail:
+                detected += 1
+                uploaded += sum(len(c) for c in tail)
+            row.append(f"{detected:>5} / {uploaded / sample_rate:>6.1f}")
+
+        # PTT: 발화 앞뒤로 무음이 붙은 6초 녹음을 적응형 임계값으로 트리밍
+        noise = NoiseFloorEstimator()
+        for chunk in blocks[20:50]:
+            noise.update(compute_levels(chunk)[0])
+        clip = blocks[40:100]
+        threshold = max(MIN_SPEECH_THRESHOLD, noise.floor * SPEECH_STOP_RATIO)
+        trimmed = trim_silence(clip, threshold, sample_rate)
+        trimmed_sec = sum(len(c) for c in trimmed) / sample_rate
+        print(f"{noise_rms:>7.3f} | {truth:>4} | {row[0]:>18} | {row[1]:>20} | {trimmed_sec:>13.1f}초")
+
+
+def evaluate_pre_roll(pre_rolls=(0.0, 0.3), delays=(-0.05, 0.05, 0.15, 0.25), sample_rate: int = 16000):
+    """핫키가 발화 시작보다 늦게 눌렸을 때 잘리는 첫 음절 길이와 업로드 길이
+
+    5초 지점에서 시작하는 1.5초 발화를 발화 시작 + delay에 누르고 끝난 뒤
+    0.3초에 뗀다. 누른 시점이 포함된 블록부터 녹음되고(콜백 블록 단위),
+    프리롤을 앞에 붙인 뒤 trim_silence로 앞뒤 무음을 잘라낸다.
+    """
+    blocks, _truth = noisy_fixture(0.003, seconds=10.0, sample_rate=sample_rate)
+    block_sec = len(blocks[0]) / sample_rate
+    onset, release = 5.0, 6.8
+    threshold = max(MIN_SPEECH_THRESHOLD, 0.003 * SPEECH_STOP_RATIO)
+
+    print(f"{'프리롤':>6} | " + " | ".join(f"누름 {d * 1000:+4.0f}ms" for d in delays) + "   (잘린 ms / 업로드초)")
+    for pre_roll in pre_rolls:
+        cells = []
+        for delay in delays:
+            ring = PreRollBuffer(sample_rate, pre_roll)
+            recorded = []
+            start = None
+            for i, chunk in enumerate(blocks):
+                block_end = (i + 1) * block_sec
+                if block_end <= onset + delay:
+                    ring.push(chunk)
+                elif block_end - block_sec < release:
+                    if start is None:
+                        recorded = ring.drain()
+                        start = i * block_sec - sum(len(c) for c in recorded) / sample_rate
+                    recorded.append(chunk)
+            clipped = max(0.0, start - onset) * 1000
+            uploaded = sum(len(c) for c in trim_silence(recorded, threshold, sample_rate)) / sample_rate
+            cells.append(f"{clipped:>5.0f} / {uploaded:.1f}")
+        print(f"{pre_roll * 1000:>4.0f}ms | " + " | ".join(f"{c:>13}" for c in cells))
+
+
+if __name__ == "__main__":
+    evaluate_noisy()
+    print()
+    evaluate_pre_roll()
+    print()
+    benchmark_cpu()
@@ -0,0 +1,551 @@
+"""
+ZZABIS 사용자 어휘 - 제품명/사람 이름을 Whisper 프롬프트로 알려 주고, 인식 결과의
+비슷한 오인식을 로컬에서 바로 고침
+
+LLM 맞춤법 수정(_correct_spelling_only)에 맡기면 왕복 한 번이 더 들고 결과도
+들쭉날쭉하다. 어휘는 두 가지로 쓴다.
+
+1. Whisper `prompt` - 길이 제한(토큰 예산) 안에서 용어를 나열해 인식을 유도
+2. 인식 후 교정 - 한글을 자모로 풀어 SymSpell(삭제 사전)로 편집 거리 안의
+   용어를 찾아 바꾼다. 용어 목록은 한 번 컴파일하고, 조회는 사전 조회 몇 번.
+
+"짜비스가" → "자비스가"처럼 뒤에 붙은 조사(정해진 목록)는 그대로 두고 용어 부분만
+바꾼다. 모든 인식 결과에 도는 교정이라 흔한 낱말("노선이", "레이스")을 건드리지
+않도록, 자모 6개 미만인 용어("노션", "지라")는 정확히 일치할 때만 보고, 거리 안에 들어와도
+인식기가 실제로 헷갈리는 자모(된소리/거센소리, ㅐ/ㅔ, 받침 ㄴ/ㅇ 등)끼리 바뀐
+경우만 고친다 ("클로즈"의 ㅈ/ㄷ은 아님).
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WHISPER_PROMPT_LIMIT = 224  # Whisper 프롬프트 한도 - 넘으면 앞부분(최근 추가 용어)부터 잘림
+PROMPT_MAX_TOKENS = 200  # whisper_tokens() 기준 예산 (영어 추정치 오차만큼 여유)
+MAX_TERM_WORDS = 3  # 띄어 쓴 용어(여러 단어) 최대 길이
+VOCAB_MIN_FUZZY_LENGTH = 6  # 어휘 교정은 자모 6개 이상인 용어만 유사 일치 (짧은 용어는 흔한 낱말과 겹침)
+PREFIX_LENGTH = 7  # 삭제 사전은 키 앞부분만 (긴 키의 삭제 조합 폭증 방지, SymSpell prefix)
+MEMO_SIZE = 4096  # 조회 결과 메모 (자주 말하는 단어는 다시 계산하지 않음)
+
+_TOKEN = re.compile(r'\S+')
+_EDGE = re.compile(r'^(\W*)(.*?)(\W*)$', re.S)
+
+# 한글 음절 → 첫가끝 자모 (str.translate 한 번으로 분해, 공백 제거)
+_JAMO_TABLE = {0xAC00 + i: chr(0x1100 + i // 588) + chr(0x1161 + i % 588 // 28)
+               + (chr(0x11A7 + i % 28) if i % 28 else "")
+               for i in range(11172)}
+_JAMO_TABLE.update({ord(" "): None, ord("\t"): None})
+
+# 용어 뒤에 붙을 수 있는 조사 (긴 것부터 - "님한테"를 "한테"보다 먼저)
+PARTICLES = tuple(sorted({
+    "이", "가", "은", "는", "을", "를", "의", "에", "께", "도", "만", "랑", "와", "과", "로", "나", "요",
+    "에서", "에게", "한테", "께서", "이랑", "하고", "으로", "이나", "까지", "부터", "보다", "처럼",
+    "님", "님이", "님은", "님을", "님의", "님께", "님도", "님한테", "님이랑", "씨", "씨가", "씨는",
+    "씨를", "씨한테", "씨에게", "에서는", "에서도", "으로는", "한테는", "에게는",
+}, key=len, reverse=True))
+
+# 인식기가 실제로 헷갈리는 자모 짝 - 교정은 이 짝끼리 바뀐 것만 1로 센다
+_CONFUSABLE_GROUPS = [
+    "ᄀᄁᄏ", "ᄃᄄᄐ", "ᄇᄈᄑ", "ᄌᄍᄎ", "ᄉᄊ",  # 예사/된/거센소리
+    "ᅢᅦ", "ᅤᅨ", "ᅫᅬᅰ", "ᅥᅩ", "ᅮᅳ", "ᅵᅴ", "ᅧᅭ",  # 모음
+    "ᆫᆼᆷ", "ᆨᆩᆿ", "ᆮᆺᆻᆽᆾᇀ", "ᆸᇁ",  # 받침 (소리가 같거나 비슷)
+]
+_CONFUSABLE = {(a, b) for group in _CONFUSABLE_GROUPS for a in group for b in group if a != b}
+_WEAK = set("ᆯᇂᄋ")  # 빠지거나 끼어들기 쉬운 자모 (받침 ㄹ/ㅎ, 초성 ㅇ)
+
+
+def to_jamo(text: str) -> str:
+    """한글은 자모로 풀고, 나머지는 소문자로 (비교용 키)"""
+    return text.lower().translate(_JAMO_TABLE)
+
+
+def max_distance(key_length: int) -> int:
+    """용어 키(자모) 길이별 허용 편집 거리 - 짧은 용어는 정확히 일치할 때만"""
+    if key_length <= 4:
+        return 0
+    if key_length <= 8:
+        return 1
+    return 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """제한 있는 편집 거리 (인접 전치 포함) - limit을 넘으면 limit + 1
+
+    대각선에서 limit 안쪽 칸만 계산한다 (바깥은 어차피 limit을 넘음).
+    """
+    la, lb = len(a), len(b)
+    if abs(la - lb) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    big = limit + 1
+    previous2 = None
+    previous = [j if j <= limit else big for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        current = [big] * (lb + 1)
+        current[0] = i if i <= limit else big
+        row_min = current[0]
+        ai = a[i - 1]
+        for j in range(max(1, i - limit), min(lb, i + limit) + 1):
+            bj = b[j - 1]
+            value = previous[j - 1] + (ai != bj)
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if previous2 is not None and j > 1 and ai == b[j - 2] and a[i - 2] == bj and previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            current[j] = value if value < big else big
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return big
+        previous2, previous = previous, current
+    return previous[lb] if previous[lb] <= limit else big
+
+
+def whisper_tokens(text: str) -> int:
+    """Whisper(바이트 단위 BPE) 토큰 수 상한 근사
+
+    ASCII가 아닌 글자는 UTF-8 바이트마다 1토큰 (한글 음절 3토큰 - 바이트 BPE에서
+    넘을 수 없는 상한), ASCII는 2글자당 1토큰으로 센다.
+    """
+    ascii_chars = sum(1 for ch in text if ch < '\x80')
+    return len(text.encode("utf-8")) - ascii_chars + (ascii_chars + 1) // 2
+
+
+def confusion_distance(heard: str, key: str, limit: int) -> int:
+    """인식 오류로 볼 수 있는 편집 거리 - 헷갈리는 짝이 아닌 치환/약하지 않은 자모 삽입·삭제는 2
+
+    한글 자모가 아닌 글자(영어)끼리 치환은 1. limit을 넘으면 limit + 1.
+    """
+    def substitution(a, b):
+        if a == b:
+            return 0
+        if (a, b) in _CONFUSABLE or not ('\u1100' <= a <= '\u11ff' or '\u1100' <= b <= '\u11ff'):
+            return 1
+        return 2
+
+    def indel(ch):
+        return 1 if ch in _WEAK or not '\u1100' <= ch <= '\u11ff' else 2
+
+    la, lb = len(heard), len(key)
+    big = limit + 1
+    previous = [0] * (lb + 1)
+    for j in range(1, lb + 1):
+        previous[j] = min(big, previous[j - 1] + indel(key[j - 1]))
+    for i in range(1, la + 1):
+        current = [min(big, previous[0] + indel(heard[i - 1]))] + [big] * lb
+        for j in range(1, lb + 1):
+            current[j] = min(big, previous[j - 1] + substitution(heard[i - 1], key[j - 1]),
+                             previous[j] + indel(heard[i - 1]), current[j - 1] + indel(key[j - 1]))
+        if min(current) > limit:
+            return big
+        previous = current
+    return previous[lb]
+
+
+def _deletes(key: str, distance: int) -> set:
+    """key에서 글자를 distance개까지 지운 문자열 전부 (key 포함)"""
+    result = {key}
+    frontier = {key}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        result |= frontier
+    return result
+
+
+class FuzzyIndex:
+    """자모 SymSpell 색인 - 용어 목록을 한 번 컴파일, 편집 거리 안의 용어 조회
+
+    바뀌면 새로 만든다 (조회 중 잠금 없음). 명령어 매칭(command_match.py)도 쓴다.
+    min_fuzzy_length: 자모가 이보다 적은 용어는 정확히 일치할 때만
+    """
+
+    min_fuzzy_length = 5
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self.terms: List[str] = []
+        self._keys: List[str] = []
+        self._index: Dict[str, List[int]] = defaultdict(list)  # 삭제 문자열 → 용어 번호
+        seen = set()
+        for term in terms:
+            term = term.strip()
+            key = to_jamo(term)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            number = len(self.terms)
+            self.terms.append(term)
+            self._keys.append(key)
+            for deleted in _deletes(key[:PREFIX_LENGTH], self.allowed_distance(len(key))):
+                self._index[deleted].append(number)
+        self._index = dict(self._index)
+        self.max_words = min(MAX_TERM_WORDS, max((len(t.split()) for t in self.terms), default=1))
+        lengths = [len(k) for k in self._keys]
+        self._min_length = min(lengths, default=0)
+        self._max_length = max(lengths, default=0)
+        self._memo = {}
+
+    def __len__(self):
+        return len(self.terms)
+
+    def allowed_distance(self, key_length: int) -> int:
+        """용어 키 길이별 허용 편집 거리"""
+        return max_distance(key_length) if key_length >= self.min_fuzzy_length else 0
+
+    def lookup(self, text: str) -> Optional[Tuple[str, int]]:
+        """가장 가까운 용어 (용어, 편집 거리) - 허용 거리 안에 없으면 None"""
+        query = to_jamo(text)
+        n = len(query)
+        if n < self._min_length - 2 or n > self._max_length + 2:
+            return None
+        try:
+            return self._memo[query]
+        except KeyError:
+            pass
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        found = self._memo[query] = self._search(query)
+        return found
+
+    def _search(self, query: str) -> Optional[Tuple[str, int]]:
+        n = len(query)
+        # 긴 용어(거리 2)에 닿을 수 있는 길이면 삭제도 2글자까지
+        candidates = set()
+        index = self._index
+        for deleted in _deletes(query[:PREFIX_LENGTH], 2 if n >= 7 else 1):
+            candidates.update(index.get(deleted, ()))
+        best = None
+        best_distance = 3
+        for number in candidates:
+            key = self._keys[number]
+            if key == query:
+                return self.terms[number], 0
+            limit = min(self.allowed_distance(len(key)), best_distance - 1)
+            if abs(len(key) - n) > limit:
+                continue
+            distance = edit_distance(query, key, limit)
+            if distance <= limit:
+                best, best_distance = number, distance
+        if best is None:
+            return None
+        return self.terms[best], best_distance
+
+
+class Vocabulary(FuzzyIndex):
+    """컴파일된 사용자 어휘 - 인식 프롬프트 + 인식 결과 교정"""
+
+    min_fuzzy_length = VOCAB_MIN_FUZZY_LENGTH
+
+    def __init__(self, terms: Iterable[str] = ()):
+        super().__init__(terms)
+        self.whisper_prompt = self._build_prompt()
+
+    def _build_prompt(self, max_tokens: int = PROMPT_MAX_TOKENS) -> str:
+        """Whisper prompt - 앞쪽(최근 추가) 용어부터 토큰 예산까지 (whisper_tokens 기준)"""
+        words = []
+        used = 0
+        for term in self.terms:
+            cost = whisper_tokens(term) + 1  # 구분자 ", "
+            if used + cost > max_tokens:
+                break
+            words.append(term)
+            used += cost
+        return ", ".join(words)
+
+    def correct(self, text: str) -> str:
+        """인식 결과의 용어 오인식 교정 (조사/문장 부호는 유지)"""
+        if not self.terms or not text:
+            return text
+        tokens = [(m.start(), m.end(), _EDGE.match(m.group())) for m in _TOKEN.finditer(text)]
+        pieces = []
+        position = 0
+        i = 0
+        while i < len(tokens):
+            match = self._match_at(tokens, i)
+            if match is None:
+                i += 1
+                continue
+            words, term, suffix = match
+            start, _end, first = tokens[i]
+            _start, end, last = tokens[i + words - 1]
+            replacement = first.group(1) + term + suffix + last.group(3)
+            pieces.append(text[position:start])
+            pieces.append(replacement)
+            position = end
+            i += words
+        if not pieces:
+            return text
+        pieces.append(text[position:])
+        return "".join(pieces)
+
+    def _match_at(self, tokens, i: int) -> Optional[Tuple[int, str, str]]:
+        """tokens[i]에서 시작하는 용어 (단어 수, 용어, 뒤에 붙은 조사) - 바꿀 게 없으면 None"""
+        best = None
+        for words in range(min(self.max_words, len(tokens) - i), 0, -1):
+            parts = [tokens[i + k][2] for k in range(words)]
+            # 중간 단어에 문장 부호가 붙어 있으면 한 용어로 보지 않음
+            if any(p.group(3) for p in parts[:-1]) or any(p.group(1) for p in parts[1:]):
+                continue
+            core = "".join(p.group(2) for p in parts)
+            original = " ".join(p.group(2) for p in parts)
+            last = parts[-1].group(2)
+            # 조사는 마지막 단어 끝의 정해진 조사만 ("노션 말고"의 "말고", "피그말리온"의 "리온"은 아님)
+            suffixes = [""] + [p for p in PARTICLES if len(p) < len(last) - 1 and last.endswith(p)]
+            for suffix in suffixes:
+                stem = core[:len(core) - len(suffix)] if suffix else core
+                found = self.lookup(stem)
+                if found is None:
+                    continue
+                term, distance = found
+                # 띄어 쓴 단어를 붙여 한 단어 용어로 볼 때("깃 허브")는 조사 없이 딱 맞을 때만
+                if suffix and words > term.count(" ") + 1:
+                    continue
+                # 거리 안이어도 인식기가 헷갈릴 만한 차이만 ("클로즈" → "클로드"는 아님)
+                if distance:
+                    key = to_jamo(term)
+                    limit = self.allowed_distance(len(key))
+                    if confusion_distance(to_jamo(stem), key, limit) > limit:
+                        continue
+                if best is None or distance < best[0]:
+                    best = (distance, words, term, suffix, original[:len(original) - len(suffix)] if suffix else original)
+                if distance == 0:
+                    break
+            if best is not None and best[0] == 0:
+                break
+        if best is None:
+            return None
+        _distance, words, term, suffix, stem = best
+        if stem == term:
+            return None  # 이미 맞음
+        return words, term, suffix
+
+
+def load_vocabulary(db) -> Vocabulary:
+    """저장된 용어로 어휘 컴파일 (db: get_vocabulary_terms()를 가진 JarvisDB)"""
+    return Vocabulary(db.get_vocabulary_terms())
+
+
+# === 벤치마크 ===
+
+_BENCH_TERMS = [
+    "자비스", "짜비스", "클로드", "노션", "피그마", "슬랙", "지라", "컨플루언스", "깃허브", "쿠버네티스",
+    "포스트그레스", "레디스", "카프카", "텐서플로", "파이토치", "랭체인", "버셀", "넷리파이",
+    "김민준", "이서연", "박지호", "최수아", "정예준", "강하은", "조도윤", "윤서윤", "장시우", "임지안",
+    "한유진", "오승현", "서다은", "신재원", "권나연", "황준서", "안채원", "송민재", "류하린", "홍지성",
+    "GitHub", "Kubernetes", "PostgreSQL", "TensorFlow", "Vercel", "OpenAI", "Anthropic", "Figma",
+    "Notion", "Confluence", "Grafana", "Prometheus", "Terraform", "Datadog",
+    "오로라 프로젝트", "블루 웨일", "데일리 스크럼", "스프린트 리뷰",
+]
+
+_BENCH_TEMPLATES = [
+    "{}{} 내일 회의에 들어와요",
+    "오늘 {}{} 업데이트 확인해 주세요",
+    "{}{} 관련해서 정리해서 공유드릴게요.",
+    "어제 {}{} 이야기한 거 기억나요?",
+]
+_PARTICLES = ["", "가", "는", "에서", "한테", "랑", "도", "님한테"]
+
+_CONTROL_SENTENCES = [
+    "오늘 점심은 김치찌개 어때요", "회의 자료를 정리해서 보내 드릴게요", "지금 바로 출발할게요",
+    "내일 오전에 다시 이야기해요", "이번 주 금요일까지 마무리할 수 있을 것 같아요",
+    "문서 검토 부탁드립니다", "커피 한잔 하실래요", "배포는 다음 주로 미루죠",
+    "테스트가 전부 통과했어요", "버그 리포트 확인했습니다", "고객 미팅은 세시에 있어요",
+    "주말 잘 보내세요", "그 부분은 제가 확인해 볼게요", "일정이 조금 바뀌었어요",
+    "자료 감사합니다", "발표 준비는 다 됐나요", "서버가 조금 느린 것 같아요",
+    "새로운 기능 아이디어가 있어요", "디자인 시안 나왔어요", "로그인 오류가 계속 나요",
+    "사진 보내 주세요", "노트북 충전기 있어요?", "지하철이 늦게 와서 조금 늦어요",
+    "슬라이드 두 장만 더 만들게요", "이 코드 리뷰 좀 해 주세요", "깃 브랜치 정리했어요",
+    "데이터베이스 백업 확인해요", "클라우드 비용이 늘었어요", "노션 말고 문서 도구 뭐 써요",
+    "자비로운 마음으로 봐주세요", "정예인 씨에게 전달할게요", "임시 저장해 두었어요",
+]
+
+# 용어와 한두 자모 차이인 흔한 낱말 - 교정이 건드리면 안 됨
+_NEAR_MISS_CONTROLS = [
+    "버스 노선이 바뀌었어요", "레이스 커튼 달았어요", "클로즈 해주세요", "피그말리온 효과래요",
+    "슬랙스 입고 왔어요", "카프리 가고 싶어요", "지구 반대편이에요", "노선도 좀 보여 주세요",
+    "레디 액션", "버섯 볶음 먹을래요", "자비 좀 베풀어요", "오승훈 팀장님이 오셨어요",
+    "서다인 씨에게 전달할게요", "박지효 님한테 물어볼게요", "랭킹 확인했어요", "카프카 소설 읽었어요",
+]
+
+# 인식기가 흔히 헷갈리는 자모 (된소리/모음/받침)
+_CONFUSIONS = {
+    "ᄌ": "ᄍ", "ᄍ": "ᄌ", "ᄀ": "ᄁ", "ᄃ": "ᄐ", "ᄇ": "ᄑ", "ᄉ": "ᄊ",
+    "ᅢ": "ᅦ", "ᅦ": "ᅢ", "ᅥ": "ᅩ", "ᅩ": "ᅥ", "ᅮ": "ᅳ", "ᅵ": "ᅴ", "ᅧ": "ᅭ",
+    "ᆫ": "ᆼ", "ᆼ": "ᆫ", "ᆯ": "",
+}
+
+
+def _from_jamo(jamo: str) -> str:
+    """첫가끝 자모 → 한글 음절 (벤치마크 오인식 만들기용)"""
+    out = []
+    i = 0
+    while i < len(jamo):
+        ch = jamo[i]
+        if 0x1100 <= ord(ch) <= 0x1112 and i + 1 < len(jamo) and 0x1161 <= ord(jamo[i + 1]) <= 0x1175:
+            code = (ord(ch) - 0x1100) * 588 + (ord(jamo[i + 1]) - 0x1161) * 28
+            i += 2
+            if i < len(jamo) and 0x11A8 <= ord(jamo[i]) <= 0x11C2:
+                code += ord(jamo[i]) - 0x11A7
+                i += 1
+            out.append(chr(0xAC00 + code))
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _misrecognize(term: str, rng) -> str:
+    """용어 하나를 허용 거리 안에서 한 군데 틀리게"""
+    if not any('가' <= ch <= '힣' for ch in term):
+        # 영어 - 대소문자 무시 + 글자 하나 바꾸기/빼기
+        word = list(term.lower())
+        i = rng.randrange(1, len(word))
+        if rng.random() < 0.5:
+            word[i] = "aeiou"[rng.randrange(5)] if word[i] not in "aeiou" else "t"
+        else:
+            del word[i]
+        return "".join(word)
+    jamo = "".join(to_jamo(w) + " " for w in term.split()).rstrip()
+    spots = [i for i, ch in enumerate(jamo) if ch in _CONFUSIONS]
+    if not spots:
+        return term
+    # 긴 용어(거리 2 허용)는 30%를 두 군데 틀리게
+    errors = 2 if max_distance(len(to_jamo(term))) == 2 and len(spots) > 1 and rng.random() < 0.3 else 1
+    for i in sorted(rng.sample(spots, errors), reverse=True):
+        jamo = jamo[:i] + _CONFUSIONS[jamo[i]] + jamo[i + 1:]
+    return _from_jamo(jamo)
+
+
+def _bench_names(count: int, rng) -> List[str]:
+    """가상의 동료 이름 (성 + 이름 두 음절)"""
+    surnames = "김이박최정강조윤장임한오서신권황안송류홍"
+    given = "민서지하도예시우준현수아연은채유윤재원나진성태호"
+    names = set()
+    while len(names) < count:
+        names.add(rng.choice(surnames) + rng.choice(given) + rng.choice(given))
+    return sorted(names)
+
+
+def check_prompt_budget():
+    """한글만으로 된 최악의 어휘에서도 Whisper 프롬프트가 한도 안인지 (넘으면 AssertionError)"""
+    worst = [
+        ["쀍"] * 300,  # 한 음절 용어 - 구분자 비중이 가장 큼
+        ["컨플루언스 프로메테우스 쿠버네티스"] * 50,  # 여러 단어 긴 용어
+        [chr(0xAC00 + i * 37) * (i % 6 + 1) for i in range(300)],  # 길이가 섞인 용어
+        ["Kubernetes", "자비스", "PostgreSQL 클러스터"] * 100,
+    ]
+    for terms in worst:
+        prompt = Vocabulary(terms).whisper_prompt
+        tokens = whisper_tokens(prompt)
+        assert prompt.startswith(terms[0]), "가장 최근 용어가 프롬프트에 없음"
+        assert tokens <= WHISPER_PROMPT_LIMIT, f"Whisper 프롬프트 {tokens}토큰 > {WHISPER_PROMPT_LIMIT}"
+        # 바이트 BPE 토큰 수는 UTF-8 바이트 수를 넘지 않음 - 한글 부분은 실제 상한
+        hangul = sum(1 for ch in prompt if '가' <= ch <= '힣')
+        assert hangul * 3 <= tokens
+    print(f"Whisper 프롬프트 예산: 최악의 어휘 {len(worst)}종 모두 {WHISPER_PROMPT_LIMIT}토큰 이하")
+
+
+def benchmark(rounds: int = 2000, seed: int = 0, extra_names: int = 0):
+    """오인식 교정 정확도 (용어 문장/일반 문장)와 문장당 지연, 전수 비교 대비
+
+    extra_names: 가상의 동료 이름을 더해 어휘를 키움 (이름끼리 헷갈리는 경우 포함)
+    """
+    import random
+    import time
+
+    rng = random.Random(seed)
+    terms = _BENCH_TERMS + _bench_names(extra_names, rng)
+    start = time.perf_counter()
+    vocabulary = Vocabulary(terms)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    known = {to_jamo(t) for t in terms}
+    cases = []
+    ambiguous = 0  # 오인식이 다른 용어와 똑같아진 경우 ("자비스" → "짜비스") - 고칠 수 없음
+    for _ in range(rounds):
+        term = rng.choice(terms)
+        particle = rng.choice(_PARTICLES) if any('가' <= ch <= '힣' for ch in term) else ""
+        template = rng.choice(_BENCH_TEMPLATES)
+        heard = _misrecognize(term, rng) if vocabulary.allowed_distance(len(to_jamo(term))) else term
+        if heard != term and to_jamo(heard) in known:
+            ambiguous += 1
+            continue
+        cases.append((template.format(heard, particle), template.format(term, particle)))
+
+    fixed = already = 0
+    times = []
+    for heard, expected in cases:
+        vocabulary._memo.clear()  # 처음 보는 문장으로 잼
+        begin = time.perf_counter()
+        result = vocabulary.correct(heard)
+        times.append(time.perf_counter() - begin)
+        if heard == expected:
+            already += 1
+        elif result == expected:
+            fixed += 1
+    wrong_before = len(cases) - already
+
+    false_changes = [s for s in _CONTROL_SENTENCES if vocabulary.correct(s) != s]
+    near_misses = [(s, vocabulary.correct(s)) for s in _NEAR_MISS_CONTROLS if vocabulary.correct(s) != s]
+    for s in _CONTROL_SENTENCES + _NEAR_MISS_CONTROLS:
+        vocabulary._memo.clear()
+        begin = time.perf_counter()
+        vocabulary.correct(s)
+        times.append(time.perf_counter() - begin)
+    times.sort()
+
+    # 메모가 찬 상태 (같은 단어를 다시 말할 때)
+    warm = []
+    for heard, _expected in cases:
+        begin = time.perf_counter()
+        vocabulary.correct(heard)
+        warm.append(time.perf_counter() - begin)
+    warm.sort()
+
+    # 같은 판정을 전체 용어와 하나씩 비교해서 했을 때 (BK-tree/SymSpell 없는 하한)
+    words = [w for heard, _ in cases[:200] for w in heard.split()]
+    begin = time.perf_counter()
+    for word in words:
+        key = to_jamo(word)
+        min((edit_distance(key, k, vocabulary.allowed_distance(len(k))), t)
+            for k, t in zip(vocabulary._keys, vocabulary.terms))
+    brute_us = (time.perf_counter() - begin) / len(words) * 1e6
+    begin = time.perf_counter()
+    for word in words:
+        vocabulary._search(to_jamo(word))
+    index_us = (time.perf_counter() - begin) / len(words) * 1e6
+
+    print(f"\n어휘 {len(vocabulary)}개 컴파일 {compile_ms:.1f}ms, 삭제 사전 {len(vocabulary._index):,}개")
+    print(f"Whisper 프롬프트 ({whisper_tokens(vocabulary.whisper_prompt)}토큰 상한 추정): {vocabulary.whisper_prompt[:60]}...")
+    print(f"용어 문장 {len(cases)}개 중 오인식 {wrong_before}개 → 교정 {fixed}개 ({fixed / max(1, wrong_before):.1%}), "
+          f"다른 용어와 같아져 제외 {ambiguous}개")
+    print(f"일반 문장 {len(_CONTROL_SENTENCES)}개 중 잘못 바뀜 {len(false_changes)}개"
+          + (f": {false_changes}" if false_changes else ""))
+    print(f"비슷한 낱말 문장 {len(_NEAR_MISS_CONTROLS)}개 중 잘못 바뀜 {len(near_misses)}개"
+          + (f": {near_misses}" if near_misses else ""))
+    print(f"문장당 교정: p50 {times[len(times) // 2] * 1e6:.0f} µs, p99 {times[int(len(times) * 0.99)] * 1e6:.0f} µs "
+          f"(메모 적중 시 p50 {warm[len(warm) // 2] * 1e6:.0f} µs)")
+    print(f"단어당 조회: 삭제 사전 {index_us:.1f} µs vs 전수 비교 {brute_us:.1f} µs ({brute_us / index_us:.0f}배)")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 2 and sys.argv[1] in ("--add", "--remove"):
+        from database import get_db
+        db = get_db()
+        for term in sys.argv[2:]:
+            if sys.argv[1] == "--add":
+                db.add_vocabulary_term(term)
+            else:
+                db.delete_vocabulary_term(term)
+    if len(sys.argv) > 1 and sys.argv[1] in ("--add", "--remove", "--list"):
+        from database import get_db
+        print(", ".join(get_db().get_vocabulary_terms()) or "(어휘 없음)")
+        sys.exit(0)
+
+    check_prompt_budget()
+    benchmark()
+    benchmark(extra_names=500)